@@ -0,0 +1,127 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserStateCache:
+    """Cache por processo do estado de autenticação (ativo, hash da senha) dos usuários.
+
+    As entradas expiram após AUTH_USER_STATE_CACHE_TIMEOUT segundos e são
+    invalidadas quando o usuário é salvo (desativação, change_password) ou
+    excluído. Como o cache é por processo, uma alteração feita em outro
+    worker só é vista após o TTL.
+    """
+    max_entries = 10000
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > self.clock():
+            return entry[0]
+        return None
+
+    def _query(self, user_id):
+        return User.objects.filter(pk=user_id).values_list('is_active', 'password')
+
+    def get(self, user_id):
+        """Retorna (is_active, hash da senha) ou None se o usuário não existir"""
+        return self._cached(user_id) or self._store(user_id, self._query(user_id).first())
+
+    async def aget(self, user_id):
+        return self._cached(user_id) or self._store(user_id, await self._query(user_id).afirst())
+
+    def _store(self, user_id, row):
+        if row is None:
+            return None
+
+        now = self.clock()
+        state = (row[0], get_md5_hash_password(row[1]))
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {key: value for key, value in self._entries.items() if value[1] > now}
+            self._entries[user_id] = (state, now + settings.AUTH_USER_STATE_CACHE_TIMEOUT)
+        return state
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+user_states = UserStateCache()
+
+
+def lightweight_user(user_id):
+    """Instância de User só com id e is_active carregados; os demais campos são adiados"""
+    return User.from_db('default', ['id', 'is_active'], [user_id, True])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Autenticação JWT que não consulta a tabela de usuários a cada requisição.
+
+    O usuário é montado a partir das claims do token, e o estado ativo/inativo
+    (e o hash da senha, com CHECK_REVOKE_TOKEN) vem de ``user_states``. Views
+    que precisam dos demais campos do usuário devem carregá-lo explicitamente.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        return self.check_state(validated_token, user_id, user_states.get(user_id))
+
+    async def aauthenticate(self, request):
+        """Versão assíncrona de authenticate para as views ASGI"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user_id = self.get_user_id(validated_token)
+        user = self.check_state(validated_token, user_id, await user_states.aget(user_id))
+        return user, validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_state(self, validated_token, user_id, state):
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        is_active, password_hash = state
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return lightweight_user(user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_state(sender, instance, **kwargs):
+    user_states.invalidate(instance.pk)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class BlacklistCache:
+    """Conjunto em memória (por processo) dos jti na blacklist ainda não expirados.
+
+    A sincronização é incremental pelo id de BlacklistedToken: cada consulta
+    lê apenas as linhas novas, então o custo não cresce com o tamanho das
+    tabelas. Ids pulados (transações ainda não confirmadas quando um id
+    maior já estava visível) são consultados de novo por gap_timeout segundos. Com TOKEN_BLACKLIST_SYNC_INTERVAL = 0 toda verificação sincroniza
+    antes de responder; valores maiores evitam a query ao custo de aceitar,
+    nesse intervalo, um token colocado na blacklist por outro processo.
+    """
+    gap_timeout = 60
+    # Intervalo (segundos) para descartar da memória os tokens já expirados
+    expiry_sweep_interval = 60
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._expires = {}
+        self._last_id = None
+        self._gaps = {}
+        self._synced_at = None
+        self._swept_at = clock()
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        interval = settings.TOKEN_BLACKLIST_SYNC_INTERVAL
+        if self._synced_at is None or self.clock() - self._synced_at >= interval:
+            self.sync()
+        return jti in self._expires
+
+    def __len__(self):
+        return len(self._expires)
+
+    def sync(self):
+        """Carrega os tokens colocados na blacklist desde a última sincronização"""
+        now = timezone.now()
+        with self._lock:
+            clock = self.clock()
+            rows = BlacklistedToken.objects.all()
+            if self._last_id is None:
+                rows = rows.filter(token__expires_at__gt=now)
+            else:
+                new_rows = Q(id__gt=self._last_id)
+                if self._gaps:
+                    new_rows |= Q(id__in=list(self._gaps))
+                rows = rows.filter(new_rows)
+
+            previous_last_id = self._last_id
+            seen = set()
+            for pk, jti, expires_at in rows.values_list('id', 'token__jti', 'token__expires_at').order_by('id'):
+                seen.add(pk)
+                if expires_at > now:
+                    self._expires[jti] = expires_at
+                self._gaps.pop(pk, None)
+            if seen:
+                self._last_id = max(self._last_id or 0, max(seen))
+            elif self._last_id is None:
+                self._last_id = 0
+
+            if previous_last_id is not None:
+                for pk in range(previous_last_id + 1, self._last_id):
+                    if pk not in seen:
+                        self._gaps[pk] = clock
+            self._gaps = {pk: since for pk, since in self._gaps.items() if clock - since < self.gap_timeout}
+            self._synced_at = clock
+            if self._synced_at - self._swept_at >= self.expiry_sweep_interval:
+                self._drop_expired(now)
+                self._swept_at = self._synced_at
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def clear(self):
+        with self._lock:
+            self._expires = {}
+            self._last_id = None
+            self._gaps = {}
+            self._synced_at = None
+
+    def _drop_expired(self, now):
+        # Tokens expirados já são rejeitados pela claim exp
+        expired = [jti for jti, expires_at in self._expires.items() if expires_at <= now]
+        for jti in expired:
+            del self._expires[jti]
+
+
+blacklisted_jtis = BlacklistCache()
+
+
+def prune_expired_tokens(batch_size=1000, now=None):
+    """Exclui em lotes os tokens expirados (e suas entradas na blacklist); retorna o total excluído"""
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        batch = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted
+        # As entradas da blacklist são excluídas em cascata
+        _, per_model = OutstandingToken.objects.filter(id__in=batch).delete()
+        deleted += per_model.get(OutstandingToken._meta.label, 0)
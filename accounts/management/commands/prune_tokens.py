@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from accounts.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Remove em lotes os refresh tokens expirados e suas entradas na blacklist'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de tokens excluídos por lote',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Tokens expirados removidos: {deleted}"))
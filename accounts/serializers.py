@@ -1,21 +1,24 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from supertask.timing import TimedRepresentationMixin
 from .models import UserProfile
+from .tokens import RefreshToken
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ['avatar', 'bio']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     profile = UserProfileSerializer(source='userprofile', read_only=True)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'profile']
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
     
@@ -47,4 +50,8 @@ class ChangePasswordSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError({"new_password": "Password fields didn't match."})
-        return attrs
\ No newline at end of file
+        return attrs
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh com a verificação da blacklist feita em memória"""
+    token_class = RefreshToken
@@ -1,10 +1,20 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .authentication import user_states
+from .blacklist import blacklisted_jtis
 from .models import UserProfile
+from .tokens import RefreshToken
 
 
 class UserModelTest(TestCase):
@@ -231,4 +241,171 @@ class ChangePasswordTest(APITestCase):
         
         response = self.client.post(self.change_password_url, data)
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class StatelessJWTAuthenticationTest(APITestCase):
+    """Testes para a autenticação JWT sem consulta ao usuário por requisição"""
+
+    def setUp(self):
+        user_states.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.tasks_url = reverse('task-list-create')
+        self.authenticate(self.user)
+
+    def authenticate(self, user):
+        access = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # Consultas que carregam o usuário (a dos validadores do GET condicional só usa auth_user.id)
+        return response, [query['sql'] for query in queries if '"auth_user"."password"' in query['sql']]
+
+    def test_user_is_not_loaded_on_every_request(self):
+        """Testa se o estado do usuário é consultado uma vez e depois vem do cache"""
+        response, queries = self.user_queries(self.tasks_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries(self.tasks_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_deactivation_invalidates_cache(self):
+        """Testa se um usuário desativado é rejeitado mesmo dentro do TTL"""
+        self.client.get(self.tasks_url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.tasks_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_state_expires_after_timeout(self):
+        """Testa se alterações sem signal (QuerySet.update) são vistas após o TTL"""
+        self.client.get(self.tasks_url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.client.get(self.tasks_url).status_code, status.HTTP_200_OK)
+        with self.settings(AUTH_USER_STATE_CACHE_TIMEOUT=0):
+            user_states.invalidate(self.user.pk)
+            response = self.client.get(self.tasks_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        """Testa se o token de um usuário excluído é rejeitado"""
+        self.client.get(self.tasks_url)
+        self.user.delete()
+
+        response = self.client.get(self.tasks_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_change_password_revokes_tokens(self):
+        """Testa se, com CHECK_REVOKE_TOKEN, a troca de senha invalida os tokens antigos"""
+        # api_settings do simplejwt é importado por nome nos módulos; altera o objeto compartilhado
+        with patch('rest_framework_simplejwt.tokens.api_settings.CHECK_REVOKE_TOKEN', True):
+            self.authenticate(self.user)
+            self.assertEqual(self.client.get(self.tasks_url).status_code, status.HTTP_200_OK)
+
+            response = self.client.post(reverse('change_password'), {
+                'old_password': 'testpass123',
+                'new_password': 'newpass123',
+                'new_password_confirm': 'newpass123'
+            })
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get(self.tasks_url)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+            self.user.refresh_from_db()
+            self.authenticate(self.user)
+            self.assertEqual(self.client.get(self.tasks_url).status_code, status.HTTP_200_OK)
+
+    def test_user_info_loads_full_user(self):
+        """Testa se os endpoints de usuário carregam os dados completos em uma query"""
+        self.client.get(self.tasks_url)
+
+        response, queries = self.user_queries(reverse('user_info'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'testuser')
+        self.assertIn('profile', response.data)
+        self.assertEqual(len(queries), 1)
+
+
+class RefreshTokenBlacklistTest(APITestCase):
+    """Testes para a blacklist de refresh tokens em memória e a limpeza de tokens expirados"""
+
+    def setUp(self):
+        blacklisted_jtis.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.refresh_url = reverse('token_refresh')
+
+    def refresh(self, token):
+        return self.client.post(self.refresh_url, {'refresh': str(token)})
+
+    def test_rotated_token_is_rejected(self):
+        """Testa se o refresh token antigo é rejeitado após a rotação"""
+        token = RefreshToken.for_user(self.user)
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, status.HTTP_200_OK)
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_blacklists_token(self):
+        """Testa se o logout coloca o refresh token na blacklist"""
+        token = RefreshToken.for_user(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('logout'), {'refresh': str(token)})
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklist_from_other_process_is_synced(self):
+        """Testa se tokens colocados na blacklist por outro processo são lidos do banco"""
+        token = RefreshToken.for_user(self.user)
+        self.assertNotIn(token['jti'], blacklisted_jtis)
+
+        # Simula outro worker: grava direto no banco, sem passar pelo cache deste processo
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.create(token=outstanding)
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_check_does_not_query_by_jti(self):
+        """Testa se a verificação lê só as linhas novas da blacklist, não busca por jti"""
+        for _ in range(5):
+            RefreshToken.for_user(self.user).blacklist()
+        token = RefreshToken.for_user(self.user)
+        self.assertNotIn(token['jti'], blacklisted_jtis)
+        self.assertEqual(len(blacklisted_jtis), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertNotIn(token['jti'], blacklisted_jtis)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(token['jti'], queries[0]['sql'])
+        self.assertIn('"id" >', queries[0]['sql'])
+
+    def test_prune_expired_tokens(self):
+        """Testa a remoção em lotes dos tokens expirados e de suas entradas na blacklist"""
+        for _ in range(5):
+            RefreshToken.for_user(self.user).blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(days=1))
+        valid = RefreshToken.for_user(self.user)
+        valid.blacklist()
+
+        out = StringIO()
+        call_command('prune_tokens', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Tokens expirados removidos: 5', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [valid['jti']])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
@@ -0,0 +1,20 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import blacklisted_jtis
+
+
+class RefreshToken(BaseRefreshToken):
+    """RefreshToken que consulta a blacklist em memória em vez de uma query por jti"""
+
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in blacklisted_jtis:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklisted_jtis.add(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return result
@@ -1,11 +1,19 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from .serializers import RegisterSerializer, UserSerializer, ChangePasswordSerializer
 from .models import UserProfile
+from .tokens import RefreshToken
+
+def current_user(request):
+    """Carrega o usuário autenticado completo, com o perfil, em uma única query.
+
+    A autenticação JWT devolve um usuário leve (só id e is_active); views que
+    serializam ou alteram o usuário precisam dos demais campos.
+    """
+    return User.objects.select_related('userprofile').get(pk=request.user.pk)
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -71,7 +79,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return current_user(self.request)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -80,7 +88,7 @@ def change_password(request):
     serializer = ChangePasswordSerializer(data=request.data)
     
     if serializer.is_valid():
-        user = request.user
+        user = current_user(request)
         
         if not user.check_password(serializer.validated_data['old_password']):
             return Response({
@@ -98,5 +106,5 @@ def change_password(request):
 @permission_classes([permissions.IsAuthenticated])
 def user_info(request):
     """Endpoint para obter informações do usuário logado"""
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(current_user(request))
     return Response(serializer.data)
\ No newline at end of file
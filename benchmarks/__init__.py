@@ -0,0 +1,53 @@
+"""Benchmarks da SuperTask API.
+
+Cada módulo é executável com ``python -m benchmarks.<nome>`` a partir da raiz
+do projeto. Os benchmarks criam um banco de testes descartável a partir de
+``DATABASE_URL`` (SQLite em memória por padrão, ``test_<nome>`` no PostgreSQL).
+"""
+import os
+import statistics
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'supertask.settings')
+    import django
+    django.setup()
+
+
+def create_database(keepdb=False):
+    """Cria o banco de testes e retorna o nome original para destroy_database"""
+    from django.db import connection
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    return old_name
+
+
+def destroy_database(old_name, keepdb=False):
+    from django.db import connection
+    connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def timed(func, repeat):
+    """Executa func repeat vezes e retorna as latências em milissegundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+    }
@@ -0,0 +1,327 @@
+"""Suíte de carga da API: latência (p50/p95/p99), RPS e consultas por endpoint.
+
+Uso:
+    # Em processo, com um banco de testes descartável populado por benchmarks.data
+    python -m benchmarks.api_suite --users 10 --tasks 20000 --requests 200 --json resultados.json
+
+    # Compara com uma execução anterior (ex.: de outro commit)
+    python -m benchmarks.api_suite --json novo.json --compare resultados.json
+
+    # Contra um servidor em execução, com os dados de python -m benchmarks.data
+    python -m benchmarks.api_suite --base-url http://127.0.0.1:8000 --concurrency 8 --requests 1000
+
+Os cenários cobrem login, a listagem de tarefas com cada filtro e ordenação,
+a paginação por cursor, a criação, o toggle-status, a listagem de categorias e
+as estatísticas do dashboard. Nos dois modos as requisições passam pela API
+(login por /api/auth/login/, ids descobertos pelas listagens) e as consultas
+por requisição vêm do cabeçalho Server-Timing do RequestMetricsMiddleware.
+
+Em processo, as requisições são sequenciais (o RPS é o de um worker); com
+--base-url, são distribuídas em --concurrency threads com conexões keep-alive.
+O JSON gravado traz o commit, o banco e os parâmetros da execução; --compare
+aponta os endpoints cujo p95 ou número de consultas piorou.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+import http.client
+import itertools
+import json
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+from benchmarks import create_database, destroy_database, setup_django, summarize
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+LIST_SCENARIOS = [
+    ('tasks: list', {}),
+    ('tasks: priority=high', {'priority': 'high'}),
+    ('tasks: status=pending', {'status': 'pending'}),
+    ('tasks: category', {'category': '{category}'}),
+    ('tasks: due_date=today', {'due_date': 'today'}),
+    ('tasks: due_date=overdue', {'due_date': 'overdue'}),
+    ('tasks: ordering=due_date', {'ordering': 'due_date'}),
+    ('tasks: ordering=priority', {'ordering': 'priority'}),
+    ('tasks: ordering=-created_at', {'ordering': '-created_at'}),
+    ('tasks: pagination=cursor', {'pagination': 'cursor'}),
+    ('tasks: q', {'q': 'task'}),
+]
+
+
+class InProcessClient:
+    """Requisições pelo APIClient do DRF, sem servidor"""
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+
+    def request(self, method, path, body=None, token=None):
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        response = getattr(self.client, method.lower())(path, body, format='json', **extra)
+        return response.status_code, response.get('Server-Timing', ''), response.content
+
+
+class HTTPClient:
+    """Requisições HTTP a um servidor em execução, com uma conexão keep-alive por thread"""
+
+    def __init__(self, base_url):
+        url = urlparse(base_url)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.local = threading.local()
+
+    def connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            self.local.connection = self.connection_class(self.netloc, timeout=60)
+        return self.local.connection
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Accept': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection = self.connection()
+            connection.request(method, self.prefix + path, payload, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            # Conexão fechada pelo servidor (ex.: max_requests do gunicorn): reabre na próxima
+            self.local.connection = None
+            raise
+        return response.status, response.getheader('Server-Timing', ''), content
+
+
+def login(client, username, password):
+    status, _, content = client.request('POST', '/api/auth/login/', {'username': username, 'password': password})
+    if status != 200:
+        raise SystemExit(f'Login de {username} falhou ({status}): {content[:200]!r}')
+    return json.loads(content)['access']
+
+
+def discover(client, token):
+    """Ids de uma categoria e das tarefas do usuário, lidos pela própria API"""
+    _, _, content = client.request('GET', '/api/categories/', token=token)
+    categories = json.loads(content)['results']
+    _, _, content = client.request('GET', '/api/tasks/?fields=id', token=token)
+    tasks = [item['id'] for item in json.loads(content)['results']]
+    if not tasks:
+        raise SystemExit('O usuário não tem tarefas; popule o banco com python -m benchmarks.data')
+    return {'category': categories[0]['id'] if categories else '', 'tasks': tasks}
+
+
+def build_scenarios(args, sessions):
+    """Cenários como (nome, função que faz uma requisição e retorna status, Server-Timing)"""
+    cycle = itertools.cycle(sessions)
+    lock = threading.Lock()
+
+    def next_session():
+        with lock:
+            return next(cycle)
+
+    def get(path_template, params):
+        def run(client):
+            session = next_session()
+            query = {key: value.format(**session) for key, value in params.items()}
+            path = path_template + (f'?{urlencode(query)}' if query else '')
+            return client.request('GET', path, token=session['token'])
+        return run
+
+    def login_request(client):
+        session = next_session()
+        return client.request('POST', '/api/auth/login/', {'username': session['username'], 'password': args.password})
+
+    counter = itertools.count()
+
+    def create(client):
+        session = next_session()
+        body = {'title': f'Load test task {next(counter)}', 'priority': 'medium'}
+        return client.request('POST', '/api/tasks/', body, token=session['token'])
+
+    def toggle(client):
+        session = next_session()
+        with lock:
+            pk = session['tasks'][next(counter) % len(session['tasks'])]
+        return client.request('PATCH', f'/api/tasks/{pk}/toggle-status/', token=session['token'])
+
+    scenarios = [('auth: login', login_request)]
+    scenarios += [(name, get('/api/tasks/', params)) for name, params in LIST_SCENARIOS]
+    scenarios += [
+        ('tasks: create', create),
+        ('tasks: toggle-status', toggle),
+        ('categories: list', get('/api/categories/', {})),
+        ('dashboard: stats', get('/api/dashboard/stats/', {})),
+    ]
+    if args.only:
+        scenarios = [(name, run) for name, run in scenarios if any(part in name for part in args.only)]
+    return scenarios
+
+
+def measure(client, run, requests, concurrency, warmup):
+    for _ in range(warmup):
+        run(client)
+
+    samples, queries, statuses, errors = [], [], {}, 0
+    record_lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            status, timing, _ = run(client)
+        except (http.client.HTTPException, OSError):
+            with record_lock:
+                errors += 1
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        match = SERVER_TIMING_QUERIES.search(timing)
+        with record_lock:
+            samples.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status >= 400:
+                errors += 1
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(one, range(requests)))
+    else:
+        for number in range(requests):
+            one(number)
+    wall = time.perf_counter() - started
+
+    result = summarize(samples) if samples else {}
+    result.update({
+        'requests': requests,
+        'errors': errors,
+        'status': {str(code): count for code, count in sorted(statuses.items())},
+        'rps': round(len(samples) / wall, 1) if wall else 0,
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    })
+    return result
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout
+        return commit + ('-dirty' if dirty.strip() else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """Imprime as variações por endpoint e retorna os que pioraram além de threshold (%)"""
+    regressions = []
+    print(f"\nComparação com {baseline['meta'].get('commit') or 'a execução anterior'}:")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before or 'p95_ms' not in result or 'p95_ms' not in before:
+            continue
+        change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        more_queries = (
+            result['queries_max'] is not None and before['queries_max'] is not None
+            and result['queries_max'] > before['queries_max']
+        )
+        flag = ''
+        if change > threshold or more_queries:
+            regressions.append(name)
+            flag = '  <-- regressão'
+        print(
+            f"  {name:<30} p95 {before['p95_ms']:>8}ms -> {result['p95_ms']:>8}ms ({change:+.1f}%)  "
+            f"queries {before['queries_max']} -> {result['queries_max']}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Servidor em execução (padrão: em processo, com banco descartável)')
+    parser.add_argument('--users', type=int, default=10, help='Usuários criados (em processo) ou usados')
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=20_000, help='Total de tarefas criadas (em processo)')
+    parser.add_argument('--password', default='bench-password')
+    parser.add_argument('--requests', type=int, default=200, help='Requisições medidas por cenário')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1, help='Threads (apenas com --base-url)')
+    parser.add_argument('--only', nargs='+', help='Roda só os cenários cujo nome contém um destes textos')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Piora de p95 (%%) considerada regressão')
+    args = parser.parse_args()
+
+    meta = {
+        'commit': git_commit(),
+        'date': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'args': {key: value for key, value in vars(args).items() if key not in ('json', 'compare', 'password')},
+    }
+
+    old_name = None
+    if args.base_url:
+        client = HTTPClient(args.base_url)
+        meta['target'] = args.base_url
+    else:
+        setup_django()
+        import django
+        from django.db import connection
+        from django.test.utils import override_settings, setup_test_environment
+        from benchmarks.data import seed
+
+        setup_test_environment()
+        # As linhas de log por requisição do RequestMetricsMiddleware poluiriam o relatório
+        override_settings(REQUEST_LOG_SAMPLE_RATE=0, REQUEST_LOG_SLOW_MS=0).enable()
+        old_name = create_database()
+        seed(users=args.users, categories=args.categories, tasks=args.tasks, password=args.password)
+        client = InProcessClient()
+        args.concurrency = 1
+        meta.update({'target': 'in-process', 'database': connection.vendor, 'django': django.get_version()})
+
+    try:
+        sessions = []
+        for index in range(args.users):
+            username = f'bench_user_{index}'
+            token = login(client, username, args.password)
+            sessions.append({'username': username, 'token': token, **discover(client, token)})
+
+        results = {}
+        for name, run in build_scenarios(args, sessions):
+            result = measure(client, run, args.requests, args.concurrency, args.warmup)
+            results[name] = result
+            print(
+                f"{name:<30} p50={result.get('p50_ms')}ms p95={result.get('p95_ms')}ms "
+                f"p99={result.get('p99_ms')}ms rps={result['rps']} queries={result['queries_mean']} "
+                f"errors={result['errors']}"
+            )
+    finally:
+        if old_name is not None:
+            destroy_database(old_name)
+
+    output = {'meta': meta, 'results': results}
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(output, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), output, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} cenário(s) com regressão: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
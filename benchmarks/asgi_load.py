@@ -0,0 +1,188 @@
+"""Carga concorrente nos endpoints de I/O servidos por WSGI (workers síncronos) vs. ASGI (uvicorn).
+
+Uso:
+    python -m benchmarks.asgi_load --workers 2 --concurrency 32 --duration 15
+
+Cria um banco SQLite temporário com dados sintéticos, sobe um servidor local
+da citação diária que responde com atraso (--upstream-delay) e, para cada
+modo, inicia o gunicorn como em produção (gunicorn.conf.py), com --workers
+processos:
+
+- wsgi: ``SERVER_MODE=wsgi`` com workers síncronos (``GUNICORN_WORKER_CLASS=sync``)
+- asgi: ``SERVER_MODE=asgi`` (``supertask.asgi`` com workers uvicorn)
+
+As requisições alternam entre /api/tasks/, /api/dashboard/stats/,
+/api/dashboard/quote/ e /health/. Com QUOTE_CACHE_TIMEOUT curto a citação
+expira durante a carga e é atualizada contra o upstream lento. O gerador de
+carga roda na mesma máquina; compare os modos entre si, não com produção.
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from benchmarks import setup_django, summarize
+
+ENDPOINTS = ['/api/tasks/', '/api/dashboard/stats/', '/api/dashboard/quote/', '/health/']
+
+SERVERS = {
+    'wsgi': {'SERVER_MODE': 'wsgi', 'GUNICORN_WORKER_CLASS': 'sync'},
+    'asgi': {'SERVER_MODE': 'asgi'},
+}
+
+
+def slow_upstream(delay):
+    """Servidor local no lugar do quotable.io que demora delay segundos para responder"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps([{'content': 'Benchmark quote', 'author': 'Benchmark'}]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('O servidor encerrou durante a inicialização')
+        try:
+            urllib.request.urlopen(base_url + '/health/', timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('O servidor não respondeu a tempo')
+
+
+def run_load(base_url, token, concurrency, duration):
+    """Dispara requisições em concurrency threads por duration segundos"""
+    samples = {endpoint: [] for endpoint in ENDPOINTS}
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client(index):
+        position = index
+        while time.monotonic() < deadline:
+            endpoint = ENDPOINTS[position % len(ENDPOINTS)]
+            position += 1
+            request = urllib.request.Request(base_url + endpoint, headers={'Authorization': f'Bearer {token}'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+            except OSError as exc:
+                errors.append(str(exc))
+                continue
+            samples[endpoint].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--upstream-delay', type=float, default=1.0, help='Atraso do upstream da citação (s)')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    upstream = slow_upstream(args.upstream_delay)
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='supertask.settings',
+        DATABASE_URL=f'sqlite:///{workdir.name}/bench.sqlite3',
+        QUOTE_API_URL=f'http://127.0.0.1:{upstream.server_port}/quotes/random',
+        QUOTE_CACHE_TIMEOUT='1',
+        QUOTE_REQUEST_TIMEOUT=str(args.upstream_delay * 2),
+    )
+    os.environ.update(env)
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from benchmarks.data import seed
+
+    call_command('migrate', verbosity=0)
+    user = seed(users=1, categories=5, tasks=args.tasks)[0]
+    token = str(RefreshToken.for_user(user).access_token)
+
+    results = {}
+    try:
+        for mode in args.modes:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            command = [
+                sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+                '--workers', str(args.workers),
+                '--bind', f'127.0.0.1:{port}',
+                '--log-level', 'warning',
+                '--timeout', '120',
+            ]
+            process = subprocess.Popen(command, env={**env, **SERVERS[mode]})
+            try:
+                wait_until_ready(base_url, process)
+                samples, errors, elapsed = run_load(base_url, token, args.concurrency, args.duration)
+            finally:
+                process.terminate()
+                process.wait(10)
+
+            total = sum(len(values) for values in samples.values())
+            results[mode] = {
+                'requests_per_second': round(total / elapsed, 1),
+                'errors': len(errors),
+                'all': summarize([value for values in samples.values() for value in values]),
+                'endpoints': {endpoint: summarize(values) for endpoint, values in samples.items() if values},
+            }
+            overall = results[mode]['all']
+            print(
+                f"{mode:<5} {results[mode]['requests_per_second']:8.1f} req/s  "
+                f"p50={overall['p50_ms']}ms  p95={overall['p95_ms']}ms  p99={overall['p99_ms']}ms  "
+                f"errors={len(errors)}"
+            )
+            for endpoint, summary in results[mode]['endpoints'].items():
+                print(f"      {endpoint:<24} p50={summary['p50_ms']}ms  p99={summary['p99_ms']}ms")
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        upstream.shutdown()
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Operações em lote (/api/tasks/bulk/) vs. uma requisição por tarefa.
+
+Uso:
+    python -m benchmarks.bulk_tasks --operations 1000
+
+Cria, atualiza e exclui N tarefas pelos endpoints individuais (POST/PATCH/
+DELETE) e depois pelo endpoint em lote, reportando tempo total e operações
+por segundo de cada caminho.
+"""
+import argparse
+import json
+import time
+
+from benchmarks import create_database, destroy_database, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=1000)
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+    from tasks.models import Category, Task
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        user = User.objects.create_user(username='bench_bulk')
+        Category.objects.create(name='Work', user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        count = args.operations
+        results = {}
+
+        def measure(label, func):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            results[label] = {'seconds': round(elapsed, 3), 'ops_per_second': round(count / elapsed, 1)}
+            print(f"{label:<18} {elapsed:8.3f}s  {count / elapsed:10.1f} ops/s")
+
+        def per_item_create():
+            for i in range(count):
+                client.post('/api/tasks/', {'title': f'Task {i}', 'category_name': 'work'}, format='json')
+
+        def per_item_update():
+            for pk in Task.objects.filter(user=user).values_list('pk', flat=True):
+                client.patch(f'/api/tasks/{pk}/', {'status': 'completed'}, format='json')
+
+        def per_item_delete():
+            for pk in Task.objects.filter(user=user).values_list('pk', flat=True):
+                client.delete(f'/api/tasks/{pk}/')
+
+        def bulk(build):
+            def run():
+                response = client.post('/api/tasks/bulk/', {'operations': build()}, format='json')
+                assert response.data['errors'] == 0, response.data
+            return run
+
+        measure('per-item create', per_item_create)
+        measure('per-item update', per_item_update)
+        measure('per-item delete', per_item_delete)
+
+        measure('bulk create', bulk(lambda: [
+            {'op': 'create', 'data': {'title': f'Task {i}', 'category_name': 'work'}} for i in range(count)
+        ]))
+        measure('bulk update', bulk(lambda: [
+            {'op': 'update', 'id': pk, 'data': {'status': 'completed'}}
+            for pk in Task.objects.filter(user=user).values_list('pk', flat=True)
+        ]))
+        measure('bulk delete', bulk(lambda: [
+            {'op': 'delete', 'id': pk} for pk in Task.objects.filter(user=user).values_list('pk', flat=True)
+        ]))
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
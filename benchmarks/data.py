@@ -0,0 +1,121 @@
+"""Gerador de dados sintéticos para os benchmarks.
+
+Também pode popular o banco configurado (DATABASE_URL), para testes de carga
+contra um servidor em execução (``benchmarks.api_suite --base-url``):
+
+    python -m benchmarks.data --users 10 --categories 5 --tasks 100000 --password bench-password
+"""
+import argparse
+from contextlib import contextmanager
+from datetime import timedelta
+import random
+
+from benchmarks import setup_django
+
+USERNAME_PREFIX = 'bench_user_'
+
+
+@contextmanager
+def explicit_created_at():
+    """Permite definir created_at nos objetos (auto_now_add sobrescreveria o valor)"""
+    from tasks.models import Task
+    field = Task._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed(users=10, categories=5, tasks=1000, batch_size=10000, seed=42, password=None):
+    """Cria usuários, categorias e tarefas distribuídos de forma reproduzível.
+
+    ``tasks`` é o total de tarefas, dividido igualmente entre os usuários.
+    Retorna a lista de usuários criados.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from accounts.models import UserProfile
+    from tasks.models import Task, Category
+
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = timezone.localdate()
+
+    # O hash da senha (PBKDF2) é calculado uma única vez para todos os usuários
+    hashed = make_password(password)
+    created_users = User.objects.bulk_create(
+        User(username=f'{USERNAME_PREFIX}{index}', password=hashed) for index in range(users)
+    )
+    # O bulk_create não dispara o post_save que cria o perfil
+    UserProfile.objects.bulk_create(UserProfile(user=user) for user in created_users)
+    Category.objects.bulk_create(
+        Category(name=f'Category {number}', user=user)
+        for user in created_users
+        for number in range(categories)
+    )
+
+    category_ids = {user.pk: [] for user in created_users}
+    for pk, user_id in Category.objects.filter(user__in=created_users).values_list('id', 'user_id'):
+        category_ids[user_id].append(pk)
+
+    per_user = tasks // max(users, 1)
+    batch = []
+    with explicit_created_at():
+        for user in created_users:
+            for number in range(per_user):
+                status = rng.choice(statuses)
+                created_at = now - timedelta(minutes=rng.randrange(0, 60 * 24 * 365 * 2))
+                batch.append(Task(
+                    title=f'Task {number} for {user.username}',
+                    description='Lorem ipsum dolor sit amet. ' * rng.randrange(0, 20),
+                    priority=rng.choice(priorities),
+                    status=status,
+                    due_date=today + timedelta(days=rng.randrange(-60, 60)) if rng.random() < 0.7 else None,
+                    category_id=rng.choice(category_ids[user.pk]) if category_ids[user.pk] and rng.random() < 0.8 else None,
+                    user=user,
+                    created_at=created_at,
+                    completed_at=created_at if status == 'completed' else None,
+                ))
+                if len(batch) >= batch_size:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+        if batch:
+            Task.objects.bulk_create(batch)
+
+    return created_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=100_000, help='Total de tarefas, divididas entre os usuários')
+    parser.add_argument('--password', default='bench-password')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='Remove antes os usuários bench_user_*')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+
+    existing = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    if args.reset:
+        existing.delete()
+    elif existing.exists():
+        parser.error(f'Já existem usuários {USERNAME_PREFIX}*; use --reset para recriá-los')
+
+    users = seed(
+        users=args.users, categories=args.categories, tasks=args.tasks,
+        seed=args.seed, password=args.password,
+    )
+    tasks = args.tasks // max(args.users, 1) * len(users)
+    print(f"{len(users)} usuários ({USERNAME_PREFIX}0 a {USERNAME_PREFIX}{len(users) - 1}), "
+          f"{args.categories} categorias cada e {tasks} tarefas criados")
+
+
+if __name__ == '__main__':
+    main()
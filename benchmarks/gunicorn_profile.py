@@ -0,0 +1,113 @@
+"""Vazão do servidor com o gunicorn padrão (um worker síncrono) vs. o perfil de gunicorn.conf.py.
+
+Uso:
+    python -m benchmarks.gunicorn_profile --concurrency 32 --duration 15
+
+Sobe o gunicorn em cada configuração sobre o mesmo banco SQLite temporário e
+dispara a mesma carga de benchmarks.asgi_load (/api/tasks/, estatísticas,
+citação com upstream lento e /health/):
+
+- default: ``gunicorn supertask.wsgi:application`` sem configuração, como o
+  start.sh fazia antes do perfil (1 worker síncrono);
+- gthread: gunicorn.conf.py com SERVER_MODE=wsgi;
+- uvicorn: gunicorn.conf.py com SERVER_MODE=asgi.
+
+Workers e threads do perfil vêm dos núcleos da máquina (ou de WEB_CONCURRENCY
+e GUNICORN_THREADS). O gerador de carga divide a CPU com o servidor.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import setup_django, summarize
+from benchmarks.asgi_load import free_port, run_load, slow_upstream, wait_until_ready
+
+PROFILES = {
+    'default': (['--config', '{empty_config}', 'supertask.wsgi:application'], {}),
+    'gthread': (['--config', 'gunicorn.conf.py'], {'SERVER_MODE': 'wsgi'}),
+    'uvicorn': (['--config', 'gunicorn.conf.py'], {'SERVER_MODE': 'asgi'}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--upstream-delay', type=float, default=0.2, help='Atraso do upstream da citação (s)')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    # Sem -c o gunicorn carregaria o gunicorn.conf.py da raiz
+    empty_config = os.path.join(workdir.name, 'empty.conf.py')
+    open(empty_config, 'w').close()
+    upstream = slow_upstream(args.upstream_delay)
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='supertask.settings',
+        DATABASE_URL=f'sqlite:///{workdir.name}/bench.sqlite3',
+        QUOTE_API_URL=f'http://127.0.0.1:{upstream.server_port}/quotes/random',
+        QUOTE_CACHE_TIMEOUT='1',
+        QUOTE_REQUEST_TIMEOUT=str(args.upstream_delay * 2),
+        REQUEST_LOG_SAMPLE_RATE='0',
+    )
+    os.environ.update(env)
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from benchmarks.data import seed
+
+    call_command('migrate', verbosity=0)
+    user = seed(users=1, categories=5, tasks=args.tasks)[0]
+    token = str(RefreshToken.for_user(user).access_token)
+
+    results = {}
+    try:
+        for profile in args.profiles:
+            options, overrides = PROFILES[profile]
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            command = [
+                sys.executable, '-m', 'gunicorn',
+                *[option.format(empty_config=empty_config) for option in options],
+                '--bind', f'127.0.0.1:{port}',
+                '--log-level', 'warning',
+            ]
+            process = subprocess.Popen(command, env={**env, **overrides})
+            try:
+                wait_until_ready(base_url, process)
+                samples, errors, elapsed = run_load(base_url, token, args.concurrency, args.duration)
+            finally:
+                process.terminate()
+                process.wait(30)
+
+            total = sum(len(values) for values in samples.values())
+            results[profile] = {
+                'requests_per_second': round(total / elapsed, 1),
+                'errors': len(errors),
+                'all': summarize([value for values in samples.values() for value in values]),
+                'endpoints': {endpoint: summarize(values) for endpoint, values in samples.items() if values},
+            }
+            overall = results[profile]['all']
+            print(
+                f"{profile:<8} {results[profile]['requests_per_second']:8.1f} req/s  "
+                f"p50={overall['p50_ms']}ms  p95={overall['p95_ms']}ms  p99={overall['p99_ms']}ms  "
+                f"errors={len(errors)}"
+            )
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        upstream.shutdown()
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Requisições por segundo em /api/tasks/ com JWTAuthentication vs. StatelessJWTAuthentication.
+
+Uso:
+    python -m benchmarks.jwt_auth --requests 2000
+
+Autentica com um access token real (cabeçalho Authorization) e mede o mesmo
+GET com a autenticação padrão do simplejwt, que carrega o usuário do banco
+a cada requisição, e com a autenticação sem estado do projeto, que monta o
+usuário a partir das claims e guarda o estado ativo em cache por processo.
+"""
+import argparse
+import json
+import time
+
+from benchmarks import create_database, destroy_database, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--tasks', type=int, default=100)
+    parser.add_argument('--url', default='/api/tasks/?page_size=20')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, setup_test_environment
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.authentication import StatelessJWTAuthentication
+    from benchmarks.data import seed
+    from tasks.views import TaskListCreateView
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        user = seed(users=1, categories=5, tasks=args.tasks)[0]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        results = {}
+
+        for label, authentication in [('jwt (db user)', JWTAuthentication), ('stateless jwt', StatelessJWTAuthentication)]:
+            TaskListCreateView.authentication_classes = [authentication]
+            assert client.get(args.url).status_code == 200
+
+            with CaptureQueriesContext(connection) as queries:
+                client.get(args.url)
+            # captured_queries é calculado sob demanda sobre um log circular
+            query_count = len(queries)
+
+            samples = []
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                request_start = time.perf_counter()
+                client.get(args.url)
+                samples.append((time.perf_counter() - request_start) * 1000)
+            elapsed = time.perf_counter() - start
+
+            results[label] = {
+                'requests_per_second': round(args.requests / elapsed, 1),
+                'queries_per_request': query_count,
+                **summarize(samples),
+            }
+            print(
+                f"{label:<14} {args.requests / elapsed:8.1f} req/s  "
+                f"p50={results[label]['p50_ms']}ms  queries={query_count}"
+            )
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
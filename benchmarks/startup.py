@@ -0,0 +1,157 @@
+"""Tempo de inicialização: importações e tempo até a primeira resposta, por perfil de settings.
+
+Uso:
+    python -m benchmarks.startup --repeat 5
+
+Para ``supertask.settings`` e ``supertask.settings_api``, mede:
+
+- importações: ``python -X importtime`` carregando a aplicação WSGI (e as
+  URLs), com o total e os pacotes que mais pesam;
+- primeira resposta: do início do gunicorn (gunicorn.conf.py, 1 worker) até o
+  primeiro 200 em /health/, e a latência do primeiro GET /api/tasks/
+  autenticado;
+- o ``migrate`` sem migrações pendentes que o start.sh rodava antes de subir o
+  servidor.
+
+Usa um banco SQLite temporário; os tempos são medianas de --repeat execuções.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks import setup_django
+from benchmarks.asgi_load import free_port
+
+PROFILES = ['supertask.settings', 'supertask.settings_api']
+
+IMPORT_SCRIPT = 'import supertask.wsgi, django.urls; django.urls.get_resolver().url_patterns'
+
+
+def import_times(env):
+    """Tempo total de importação (ms) e o tempo próprio por pacote de primeiro nível"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(own) / 1000
+    return sum(packages.values()), packages
+
+
+def first_response(env, token):
+    """Segundos até o primeiro 200 em /health/ e ms do primeiro GET /api/tasks/"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        env=env,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError('O servidor encerrou durante a inicialização')
+            try:
+                urllib.request.urlopen(base_url + '/health/', timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+
+        request = urllib.request.Request(base_url + '/api/tasks/', headers={'Authorization': f'Bearer {token}'})
+        request_start = time.perf_counter()
+        urllib.request.urlopen(request, timeout=30).read()
+        first_api = (time.perf_counter() - request_start) * 1000
+    finally:
+        process.terminate()
+        process.wait(30)
+    return ready, first_api
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=PROFILES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='Pacotes listados por tempo de importação')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='supertask.settings',
+        DATABASE_URL=f'sqlite:///{workdir.name}/bench.sqlite3',
+        WEB_CONCURRENCY='1',
+        REQUEST_LOG_SAMPLE_RATE='0',
+    )
+    os.environ.update(env)
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from benchmarks.data import seed
+
+    call_command('migrate', verbosity=0)
+    user = seed(users=1, categories=5, tasks=100)[0]
+    token = str(RefreshToken.for_user(user).access_token)
+
+    results = {}
+    try:
+        migrate = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, 'manage.py', 'migrate', '--noinput', '-v0'], env=env, check=True)
+            migrate.append(time.perf_counter() - start)
+        results['migrate_noop_s'] = round(statistics.median(migrate), 3)
+        print(f"migrate sem migrações pendentes (removido do start.sh): {results['migrate_noop_s']}s")
+
+        for profile in args.profiles:
+            profile_env = {**env, 'DJANGO_SETTINGS_MODULE': profile}
+            totals, packages, ready, first_api = [], {}, [], []
+            for _ in range(args.repeat):
+                total, by_package = import_times(profile_env)
+                totals.append(total)
+                for package, ms in by_package.items():
+                    packages.setdefault(package, []).append(ms)
+                seconds, ms = first_response(profile_env, token)
+                ready.append(seconds)
+                first_api.append(ms)
+
+            top = sorted(
+                ((package, round(statistics.median(values), 1)) for package, values in packages.items()),
+                key=lambda item: -item[1],
+            )[:args.top]
+            results[profile] = {
+                'import_ms': round(statistics.median(totals), 1),
+                'first_response_s': round(statistics.median(ready), 3),
+                'first_api_request_ms': round(statistics.median(first_api), 1),
+                'top_packages_ms': dict(top),
+            }
+            print(
+                f"{profile:<24} importações={results[profile]['import_ms']}ms  "
+                f"primeira resposta={results[profile]['first_response_s']}s  "
+                f"primeiro /api/tasks/={results[profile]['first_api_request_ms']}ms"
+            )
+            print('    ' + ', '.join(f'{package} {ms}ms' for package, ms in top))
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Vazão e memória de pico da exportação (/api/tasks/export/) conforme o número de tarefas.
+
+Uso:
+    python -m benchmarks.task_export --tasks 10000 100000 1000000
+
+Para cada tamanho, consome a resposta transmitida em CSV e NDJSON e reporta
+linhas por segundo, o tempo até o primeiro bloco e o pico de memória
+alocada (tracemalloc) durante a transmissão.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks import create_database, destroy_database, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson'])
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+    from benchmarks.data import seed
+    from tasks.models import Task
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        user = seed(users=1, categories=5, tasks=0)[0]
+        client = APIClient()
+        client.force_authenticate(user=user)
+        results = []
+
+        for total in sorted(args.tasks):
+            missing = total - Task.objects.count()
+            if missing > 0:
+                seed_more(user, missing)
+
+            for export_format in args.formats:
+                for traced in (False, True):
+                    response = client.get('/api/tasks/export/', {'format': export_format})
+                    if traced:
+                        tracemalloc.start()
+                    start = time.perf_counter()
+                    first_chunk = None
+                    lines = 0
+                    size = 0
+                    for chunk in response.streaming_content:
+                        if first_chunk is None:
+                            first_chunk = time.perf_counter() - start
+                        lines += chunk.count(b'\n')
+                        size += len(chunk)
+                    elapsed = time.perf_counter() - start
+                    if traced:
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                    else:
+                        # A vazão é medida sem o tracemalloc, que deixa a alocação mais lenta
+                        rows_per_second = total / elapsed
+                        first_chunk_ms = first_chunk * 1000
+
+                result = {
+                    'tasks': total,
+                    'format': export_format,
+                    'rows_per_second': round(rows_per_second),
+                    'first_chunk_ms': round(first_chunk_ms, 1),
+                    'peak_memory_kb': round(peak / 1024),
+                    'size_mb': round(size / 1024 / 1024, 1),
+                }
+                results.append(result)
+                print(
+                    f"{total:>9} tasks  {export_format:<6} {result['rows_per_second']:>8} rows/s  "
+                    f"first chunk={result['first_chunk_ms']}ms  peak={result['peak_memory_kb']}KB  "
+                    f"size={result['size_mb']}MB"
+                )
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+def seed_more(user, count, batch_size=10000):
+    from tasks.models import Category, Task
+
+    categories = list(Category.objects.filter(user=user))
+    for offset in range(0, count, batch_size):
+        Task.objects.bulk_create([
+            Task(
+                title=f'Export task {offset + i}',
+                description='Tarefa gerada para o benchmark de exportação',
+                user=user,
+                category=categories[(offset + i) % len(categories)] if (offset + i) % 4 else None,
+            )
+            for i in range(min(batch_size, count - offset))
+        ])
+
+
+if __name__ == '__main__':
+    main()
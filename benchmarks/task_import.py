@@ -0,0 +1,122 @@
+"""Vazão da importação de tarefas (TaskImporter) vs. o caminho por item do TaskCreateUpdateSerializer.
+
+Uso:
+    python -m benchmarks.task_import --rows 100000 --batch-size 5000
+
+Gera um arquivo CSV e um NDJSON com --rows linhas (algumas inválidas, com
+categorias existentes e novas) e mede linhas por segundo e consultas por
+lote da importação. Para comparação, cria --serializer-rows tarefas pelo
+TaskCreateUpdateSerializer, como faria POST /api/tasks/ linha a linha.
+"""
+import argparse
+import csv
+import io
+import json
+import time
+
+from benchmarks import create_database, destroy_database, setup_django
+
+FIELDS = ['title', 'description', 'priority', 'status', 'due_date', 'category_name']
+
+
+def generate_rows(count, categories=20):
+    for number in range(count):
+        yield {
+            'title': f'Imported task {number}' if number % 100 else '',
+            'description': 'Importada de outra ferramenta',
+            'priority': ['low', 'medium', 'high'][number % 3],
+            'status': ['pending', 'in_progress', 'completed'][number % 3],
+            'due_date': f'2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}',
+            'category_name': f'Categoria {number % categories}',
+        }
+
+
+def csv_file(count):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(generate_rows(count))
+    return io.BytesIO(output.getvalue().encode())
+
+
+def ndjson_file(count):
+    return io.BytesIO(''.join(json.dumps(row) + '\n' for row in generate_rows(count)).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--serializer-rows', type=int, default=2000)
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIRequestFactory
+    from tasks.imports import TaskImporter
+    from tasks.models import Category
+    from tasks.serializers import TaskCreateUpdateSerializer
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        results = {}
+        for import_format, build in [('csv', csv_file), ('ndjson', ndjson_file)]:
+            user = User.objects.create_user(username=f'bench_import_{import_format}')
+            # Metade das categorias já existe; a outra metade é criada pela importação
+            Category.objects.bulk_create(Category(user=user, name=f'Categoria {i}') for i in range(10))
+            stream = build(args.rows)
+
+            importer = TaskImporter(user, batch_size=args.batch_size)
+            # O log do CaptureQueriesContext é limitado a 9000 consultas
+            executed = []
+
+            def count_queries(execute, sql, params, many, context):
+                executed.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_queries):
+                start = time.perf_counter()
+                summary = importer.run(stream, import_format)
+                elapsed = time.perf_counter() - start
+            query_count = len(executed)
+
+            results[import_format] = {
+                'rows': args.rows,
+                'created': summary['created'],
+                'errors': summary['errors'],
+                'rows_per_second': round(args.rows / elapsed),
+                'queries': query_count,
+            }
+            print(
+                f"{import_format:<7} {args.rows} rows in {elapsed:.2f}s  "
+                f"{results[import_format]['rows_per_second']} rows/s  "
+                f"created={summary['created']} errors={summary['errors']} queries={query_count}"
+            )
+
+        user = User.objects.create_user(username='bench_import_serializer')
+        Category.objects.bulk_create(Category(user=user, name=f'Categoria {i}') for i in range(20))
+        request = APIRequestFactory().post('/api/tasks/')
+        request.user = user
+        rows = [row for row in generate_rows(args.serializer_rows) if row['title']]
+        start = time.perf_counter()
+        for row in rows:
+            serializer = TaskCreateUpdateSerializer(data=row, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        elapsed = time.perf_counter() - start
+        results['per_item_serializer'] = {'rows': len(rows), 'rows_per_second': round(len(rows) / elapsed)}
+        print(f"per-item serializer {len(rows)} rows  {round(len(rows) / elapsed)} rows/s")
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Latência de /api/tasks/ por profundidade: paginação por página vs. cursor.
+
+Uso:
+    python -m benchmarks.task_list_pagination --tasks 200000
+
+A paginação por página faz COUNT(*) e OFFSET, ficando mais lenta nas páginas
+profundas; o cursor (?pagination=cursor) deve manter a latência constante.
+"""
+import argparse
+import json
+
+from benchmarks import create_database, destroy_database, setup_django, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--ordering', default='-created_at')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+    from benchmarks.data import seed
+    from tasks.filters import order_tasks, ordering_keys
+    from tasks.models import Task
+    from tasks.pagination import TaskCursorPagination, row_value
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        user = seed(users=1, categories=5, tasks=args.tasks)[0]
+        client = APIClient()
+        client.force_authenticate(user=user)
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        queryset = order_tasks(Task.objects.filter(user=user), args.ordering)
+        keys = ordering_keys(args.ordering)
+
+        results = []
+        depth = 1
+        while depth * page_size < args.tasks:
+            page_url = f'/api/tasks/?ordering={args.ordering}&page={depth}'
+            page = summarize(timed(lambda: client.get(page_url), args.repeat))
+
+            last_row = queryset[(depth - 1) * page_size - 1] if depth > 1 else None
+            paginator = TaskCursorPagination()
+            paginator.ordering = args.ordering
+            cursor_url = f'/api/tasks/?ordering={args.ordering}&pagination=cursor'
+            if last_row is not None:
+                cursor = paginator.encode_cursor([row_value(last_row, name) for name, _ in keys])
+                cursor_url += f'&cursor={cursor}'
+            cursor = summarize(timed(lambda: client.get(cursor_url), args.repeat))
+
+            print(f"página {depth:>6}: page p50={page['p50_ms']:>8}ms | cursor p50={cursor['p50_ms']:>8}ms")
+            results.append({'depth': depth, 'page': page, 'cursor': cursor})
+            depth *= 10
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(results, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
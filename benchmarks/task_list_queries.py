@@ -0,0 +1,86 @@
+"""Planos de execução e latência das consultas de TaskListCreateView.
+
+Uso:
+    python -m benchmarks.task_list_queries --tasks 1000000
+    DATABASE_URL=postgresql://... python -m benchmarks.task_list_queries --tasks 1000000
+
+Para cada combinação de filtros (priority, status, category, due_date) e
+ordenação, mede a consulta da página (LIMIT PAGE_SIZE) e o COUNT da paginação
+no banco configurado, imprimindo o EXPLAIN da consulta da página.
+"""
+import argparse
+from itertools import product
+import json
+
+from benchmarks import create_database, destroy_database, setup_django, summarize, timed
+
+
+def combinations(category_id):
+    filters = product(
+        [None, 'high'],
+        [None, 'pending'],
+        [None, category_id],
+        [None, 'today', 'overdue'],
+    )
+    for (priority, status, category, due_date), ordering in product(filters, ['-created_at', 'due_date', 'priority']):
+        params = {
+            'priority': priority,
+            'status': status,
+            'category': category,
+            'due_date': due_date,
+        }
+        yield {key: value for key, value in params.items() if value is not None}, ordering
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keepdb', action='store_true', help='Reutiliza o banco de testes já populado')
+    parser.add_argument('--no-explain', action='store_true')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from benchmarks.data import seed
+    from tasks.filters import filter_tasks, order_tasks
+    from tasks.models import Task, Category
+
+    old_name = create_database(keepdb=args.keepdb)
+    try:
+        if not Task.objects.exists():
+            print(f"Populando {args.tasks} tarefas...")
+            seed(users=args.users, categories=args.categories, tasks=args.tasks)
+
+        user_id = Task.objects.values_list('user_id', flat=True).first()
+        category_id = Category.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+        results = []
+        print(f"Banco: {connection.vendor} | tarefas: {Task.objects.count()} | page_size: {page_size}\n")
+        for params, ordering in combinations(category_id):
+            queryset = order_tasks(filter_tasks(Task.objects.filter(user_id=user_id), params), ordering)
+            page = summarize(timed(lambda: list(queryset[:page_size]), args.repeat))
+            count = summarize(timed(queryset.count, args.repeat))
+            label = ' '.join(f'{key}={value}' for key, value in params.items()) or '(sem filtros)'
+            print(f"{label} ordering={ordering}: página p50={page['p50_ms']}ms p95={page['p95_ms']}ms | "
+                  f"count p50={count['p50_ms']}ms")
+            result = {'params': params, 'ordering': ordering, 'page': page, 'count': count}
+            if not args.no_explain:
+                result['explain'] = queryset[:page_size].explain()
+                print('  ' + result['explain'].replace('\n', '\n  '))
+            results.append(result)
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump({'vendor': connection.vendor, 'results': results}, output, indent=2)
+    finally:
+        destroy_database(old_name, keepdb=args.keepdb)
+
+
+if __name__ == '__main__':
+    main()
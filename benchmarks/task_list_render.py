@@ -0,0 +1,114 @@
+"""Custo por tarefa da listagem: TaskSerializer + JSONRenderer vs. .values() + TaskJSONRenderer.
+
+Uso:
+    python -m benchmarks.task_list_render --rows 20 100 1000
+
+Para cada tamanho, mede separadamente a consulta, a montagem dos dados e a
+renderização do JSON nos dois caminhos (conferindo que os bytes são iguais),
+e a requisição completa de GET /api/tasks/ com e sem TASK_LIST_FAST_PATH.
+"""
+import argparse
+import json
+
+from benchmarks import create_database, destroy_database, setup_django, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test.utils import override_settings, setup_test_environment
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from tasks.models import Category, Task
+    from tasks.renderers import TaskJSONRenderer, orjson
+    from tasks.rows import task_values, tasks_data
+    from tasks.serializers import TaskSerializer
+
+    setup_test_environment()
+    old_name = create_database()
+    try:
+        user = User.objects.create_user(username='bench_render')
+        category = Category.objects.create(user=user, name='Trabalho')
+        today = timezone.localdate()
+        Task.objects.bulk_create(
+            Task(
+                title=f'Tarefa {number} com um título de tamanho típico',
+                description='Descrição da tarefa' if number % 2 else None,
+                user=user,
+                category=category if number % 3 else None,
+                priority=['low', 'medium', 'high'][number % 3],
+                status=['pending', 'in_progress', 'completed'][number % 3],
+                due_date=today + timezone.timedelta(days=number % 30 - 15),
+            )
+            for number in range(max(args.rows))
+        )
+        queryset = Task.objects.filter(user=user).select_related('category').order_by('-created_at', '-id')
+        print(f"orjson: {'sim' if orjson else 'não'}")
+
+        results = []
+        for rows in args.rows:
+            page = queryset[:rows]
+            tasks = list(page)
+            values = list(task_values(page))
+            serializer_data = TaskSerializer(tasks, many=True).data
+            fast_data = tasks_data(values)
+            assert JSONRenderer().render(serializer_data) == TaskJSONRenderer().render(fast_data)
+
+            stages = {
+                'serializer': {
+                    'query': timed(lambda: list(page.all()), args.repeat),
+                    'build': timed(lambda: TaskSerializer(tasks, many=True).data, args.repeat),
+                    'render': timed(lambda: JSONRenderer().render(serializer_data), args.repeat),
+                },
+                'fast_path': {
+                    'query': timed(lambda: list(task_values(page)), args.repeat),
+                    'build': timed(lambda: tasks_data(values), args.repeat),
+                    'render': timed(lambda: TaskJSONRenderer().render(fast_data), args.repeat),
+                },
+            }
+            result = {'rows': rows}
+            for path, samples in stages.items():
+                result[path] = {stage: summarize(values) for stage, values in samples.items()}
+                total = sum(result[path][stage]['p50_ms'] for stage in samples)
+                result[path]['per_row_us'] = round(total * 1000 / rows, 2)
+            result['speedup'] = round(result['serializer']['per_row_us'] / result['fast_path']['per_row_us'], 2)
+            results.append(result)
+            print(
+                f"{rows:>5} rows  serializer {result['serializer']['per_row_us']}µs/row  "
+                f"fast path {result['fast_path']['per_row_us']}µs/row  ({result['speedup']}x)"
+            )
+            for stage in ['query', 'build', 'render']:
+                print(
+                    f"      {stage:<7} p50 {result['serializer'][stage]['p50_ms']}ms -> "
+                    f"{result['fast_path'][stage]['p50_ms']}ms"
+                )
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        requests = {}
+        for enabled in [False, True]:
+            with override_settings(TASK_LIST_FAST_PATH=enabled):
+                requests['fast_path' if enabled else 'serializer'] = summarize(
+                    timed(lambda: client.get('/api/tasks/'), args.repeat)
+                )
+        print(
+            f"GET /api/tasks/ (página de 20)  serializer p50={requests['serializer']['p50_ms']}ms  "
+            f"fast path p50={requests['fast_path']['p50_ms']}ms"
+        )
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump({'render': results, 'request': requests}, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
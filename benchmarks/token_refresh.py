@@ -0,0 +1,96 @@
+"""Latência do refresh de tokens (/api/auth/token/refresh/) conforme as tabelas da blacklist crescem.
+
+Uso:
+    python -m benchmarks.token_refresh --sizes 0 10000 100000
+
+Para cada tamanho, insere tokens expirados e válidos na blacklist e mede o
+refresh com o serializer do projeto (blacklist em memória) e com o
+TokenRefreshSerializer original do simplejwt (uma query por jti). Ao final executa a limpeza dos
+tokens expirados e reporta o tempo gasto.
+"""
+import argparse
+import json
+import time
+import uuid
+
+from benchmarks import create_database, destroy_database, setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--sync-interval', type=int, default=None, help='TOKEN_BLACKLIST_SYNC_INTERVAL')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import timedelta
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test.utils import setup_test_environment
+    from django.utils import timezone
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from accounts.blacklist import prune_expired_tokens
+    from accounts.serializers import TokenRefreshSerializer as InMemoryTokenRefreshSerializer
+    from accounts.tokens import RefreshToken
+
+    setup_test_environment()
+    if args.sync_interval is not None:
+        settings.TOKEN_BLACKLIST_SYNC_INTERVAL = args.sync_interval
+    old_name = create_database()
+    try:
+        user = User.objects.create_user(username='bench_refresh')
+        results = []
+        inserted = 0
+
+        def grow(total):
+            now = timezone.now()
+            batch = []
+            for i in range(inserted, total):
+                # Metade expirada, metade ainda válida
+                expires_at = now + timedelta(days=1 if i % 2 else -1)
+                batch.append(OutstandingToken(user=user, jti=uuid.uuid4().hex, token='', expires_at=expires_at))
+            tokens = OutstandingToken.objects.bulk_create(batch, batch_size=5000)
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token=token) for token in tokens], batch_size=5000
+            )
+
+        def run(refresh):
+            token = RefreshToken.for_user(user)
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                token = refresh(token)
+                samples.append((time.perf_counter() - start) * 1000)
+            return summarize(samples)
+
+        def refresh_with(serializer_class):
+            def refresh(token):
+                serializer = serializer_class(data={'refresh': str(token)})
+                serializer.is_valid(raise_exception=True)
+                return serializer.validated_data['refresh']
+            return refresh
+
+        for size in sorted(args.sizes):
+            grow(size)
+            inserted = max(inserted, size)
+            memory = run(refresh_with(InMemoryTokenRefreshSerializer))
+            database = run(refresh_with(TokenRefreshSerializer))
+            print(f"{size:>9} tokens: memória p50={memory['p50_ms']:>7}ms | simplejwt p50={database['p50_ms']:>7}ms")
+            results.append({'blacklisted': size, 'in_memory': memory, 'simplejwt': database})
+
+        start = time.perf_counter()
+        pruned = prune_expired_tokens()
+        print(f"limpeza: {pruned} tokens expirados em {time.perf_counter() - start:.2f}s")
+
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump({'refresh': results, 'pruned': pruned}, output, indent=2)
+    finally:
+        destroy_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
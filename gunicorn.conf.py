@@ -0,0 +1,99 @@
+"""Perfil de produção do gunicorn, carregado pelo start.sh e pela imagem Docker.
+
+SERVER_MODE escolhe a aplicação e a classe de worker:
+
+- wsgi (padrão): ``supertask.wsgi`` com workers gthread (threads para as
+  esperas de I/O, processos para usar os núcleos);
+- asgi: ``supertask.asgi`` com workers uvicorn e as views assíncronas.
+
+Workers e threads saem dos núcleos disponíveis ao contêiner (respeitando a
+cota do cgroup) e podem ser fixados por WEB_CONCURRENCY e GUNICORN_THREADS.
+Cada thread mantém uma conexão com o banco (DB_CONN_MAX_AGE), então
+workers × threads × instâncias precisa caber no max_connections do
+PostgreSQL; o total por instância é registrado na inicialização.
+"""
+import math
+import os
+
+# Importado como env: o gunicorn leria um nome "config" como a sua opção --config
+from decouple import config as env
+
+
+def available_cpus():
+    """Núcleos que o processo pode usar, limitados pela cota de CPU do contêiner"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as file:
+            quota, period = file.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+SERVER_MODE = env('SERVER_MODE', default='wsgi')
+CPUS = available_cpus()
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'supertask.asgi:application'
+    default_worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'supertask.wsgi:application'
+    default_worker_class = 'gthread'
+
+worker_class = env('GUNICORN_WORKER_CLASS', default=default_worker_class)
+
+if worker_class == 'gthread':
+    # Um processo por núcleo (o trabalho de CPU disputa o GIL) e threads para as esperas de I/O
+    default_workers, default_threads = CPUS, 4
+elif worker_class == 'sync':
+    default_workers, default_threads = CPUS * 2 + 1, 1
+else:
+    # O loop de eventos atende as requisições concorrentes de cada processo
+    default_workers, default_threads = CPUS, 1
+
+workers = env('WEB_CONCURRENCY', default=default_workers, cast=int)
+threads = env('GUNICORN_THREADS', default=default_threads, cast=int)
+
+bind = f"0.0.0.0:{env('PORT', default='8000')}"
+
+# Importa a aplicação uma vez no processo mestre: os workers compartilham a memória
+# do código carregado por copy-on-write e um erro de importação aparece antes do fork
+preload_app = env('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Recicla cada worker após max_requests requisições (contém vazamentos de memória);
+# o jitter evita que todos reiniciem ao mesmo tempo. O worker gthread derruba as
+# conexões que aguardavam na fila ao sair, por isso o valor alto (0 desliga)
+max_requests = env('GUNICORN_MAX_REQUESTS', default=10000, cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=max_requests // 10, cast=int)
+
+# Worker sem responder por timeout segundos é reiniciado; no encerramento (deploy),
+# as requisições em andamento têm graceful_timeout segundos para terminar
+timeout = env('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = env('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+# Mantém a conexão do balanceador aberta entre requisições
+keepalive = env('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+# O heartbeat dos workers em memória evita travamentos quando o disco do contêiner está lento
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+loglevel = env('GUNICORN_LOG_LEVEL', default='info')
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info('%s: %d workers %s × %d threads (%d núcleos)', wsgi_app, workers, worker_class, threads, CPUS)
+    if worker_class in ('gthread', 'sync'):
+        server.log.info('Até %d conexões persistentes com o banco por instância', workers * threads)
+
+
+def pre_fork(server, worker):
+    # Com preload_app, uma conexão aberta no mestre seria herdada (e disputada) pelos workers
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
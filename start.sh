@@ -1,3 +1,4 @@
-python manage.py migrate --noinput
-
-gunicorn supertask.wsgi:application --bind 0.0.0.0:$PORT
\ No newline at end of file
+# As migrações rodam no build.sh (ou como comando de pre-deploy), fora da inicialização:
+# cada instância que sobe (inclusive ao escalar do zero) vai direto para o gunicorn.
+# Workers, threads e classe de worker (SERVER_MODE=wsgi ou asgi) vêm de gunicorn.conf.py
+exec gunicorn --config gunicorn.conf.py
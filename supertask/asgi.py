@@ -2,5 +2,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'supertask.settings')
+# Views assíncronas para os endpoints de I/O (supertask.urls_async); ASYNC_VIEWS=False desativa
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""Circuit breaker em memória, por processo, para dependências que podem ficar fora do ar.
+
+Usado pela citação diária (API externa) e pelo roteamento de leituras para
+réplicas do banco.
+"""
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Circuit breaker simples: abre após falhas seguidas e libera uma tentativa após reset_timeout"""
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at >= self.reset_timeout:
+                # Meio aberto: uma tentativa; nova falha reabre o circuito
+                self.opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
@@ -0,0 +1,317 @@
+"""Instrumentação das requisições: consultas, tempo de banco, serialização e latência.
+
+O ``RequestMetricsMiddleware`` mede cada requisição e:
+
+- envia o cabeçalho ``Server-Timing`` (``db``, ``serializer`` e ``total``);
+- registra uma linha JSON no logger ``supertask.requests`` (configurado em
+  ``LOGGING``) para uma amostra das requisições (REQUEST_LOG_SAMPLE_RATE) e
+  para todas as mais lentas que REQUEST_LOG_SLOW_MS;
+- agrega histogramas por rota, expostos em ``/metrics/`` no formato texto do
+  Prometheus (por processo: com vários workers, cada um tem os seus).
+
+As consultas são contadas por um ``execute_wrapper`` instalado em cada conexão
+e atribuídas à requisição por uma ContextVar, o que cobre também as views
+assíncronas (o ORM roda em threads do ``sync_to_async``, que herdam o
+contexto). O tempo de serialização é o medido por ``supertask.timing.timed``
+(serializers com ``TimedRepresentationMixin`` e o caminho rápido da listagem);
+o middleware não altera os serializers do DRF. Em respostas transmitidas (exportação), o que acontece durante a
+transmissão não entra na medição.
+"""
+import ipaddress
+import json
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .timing import current_metrics
+
+logger = logging.getLogger('supertask.requests')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class RequestMetrics:
+    """Medições de uma requisição"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.active = set()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper: soma a consulta à requisição atual, se houver uma"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets, labels):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self.series.items()):
+            labels = format_labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, description, labels):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values):
+        self.series[label_values] = self.series.get(label_values, 0) + 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{{format_labels(self.labels, label_values)}}} {value}')
+        return lines
+
+
+def format_labels(names, values):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    """Histogramas e contadores do processo, por método e rota"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        labels = ('method', 'route')
+        self.requests = Counter('http_requests_total', 'Requisições atendidas.', ('method', 'route', 'status'))
+        self.histograms = {
+            'duration': Histogram(
+                'http_request_duration_seconds', 'Latência das requisições.', DURATION_BUCKETS, labels,
+            ),
+            'db': Histogram(
+                'http_request_db_duration_seconds', 'Tempo em consultas ao banco por requisição.',
+                DURATION_BUCKETS, labels,
+            ),
+            'serializer': Histogram(
+                'http_request_serializer_duration_seconds', 'Tempo de serialização por requisição.',
+                DURATION_BUCKETS, labels,
+            ),
+            'queries': Histogram(
+                'http_request_db_queries', 'Consultas ao banco por requisição.', QUERY_BUCKETS, labels,
+            ),
+        }
+
+    def observe(self, method, route, status, metrics, elapsed):
+        labels = (method, route)
+        with self.lock:
+            self.requests.inc((method, route, str(status)))
+            self.histograms['duration'].observe(labels, elapsed)
+            self.histograms['db'].observe(labels, metrics.db_time)
+            self.histograms['serializer'].observe(labels, metrics.timings.get('serializer', 0.0))
+            self.histograms['queries'].observe(labels, metrics.queries)
+
+    def render(self):
+        with self.lock:
+            lines = self.requests.render()
+            for histogram in self.histograms.values():
+                lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        self.__init__()
+
+
+registry = MetricsRegistry()
+
+
+def request_route(request):
+    """Padrão da rota (ex.: api/tasks/<int:pk>/), para não criar uma série por URL"""
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None else '<unmatched>'
+
+
+def server_timing(metrics, elapsed):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+        f"serializer;dur={metrics.timings.get('serializer', 0.0) * 1000:.2f}",
+        f'total;dur={elapsed * 1000:.2f}',
+    ])
+
+
+def should_log(elapsed):
+    slow_ms = settings.REQUEST_LOG_SLOW_MS
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        return True
+    rate = settings.REQUEST_LOG_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def log_request(request, response, metrics, elapsed, route):
+    user = getattr(request, 'user', None)
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'route': route,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000, 2),
+        'db_queries': metrics.queries,
+        'db_ms': round(metrics.db_time * 1000, 2),
+        'serializer_ms': round(metrics.timings.get('serializer', 0.0) * 1000, 2),
+        'user_id': getattr(user, 'pk', None),
+    }, separators=(',', ':')))
+
+
+class RequestMetricsMiddleware:
+    """Mede consultas, tempo de banco, serialização e latência de cada requisição"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Entradas inválidas em METRICS_ALLOWED_IPS falham na inicialização, não em cada /metrics/
+        allowed_networks()
+        # Conexões abertas antes do middleware (as próximas recebem pelo connection_created)
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        elapsed = metrics.elapsed
+        route = request_route(request)
+        response['Server-Timing'] = server_timing(metrics, elapsed)
+        registry.observe(request.method, route, response.status_code, metrics, elapsed)
+        if should_log(elapsed):
+            log_request(request, response, metrics, elapsed, route)
+        return response
+
+
+_allowed_networks = None
+
+
+def parse_networks(entries):
+    """Redes de METRICS_ALLOWED_IPS; bits de host são ignorados (10.0.0.1/8 vira 10.0.0.0/8)"""
+    networks = []
+    for entry in entries:
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError as exc:
+            raise ImproperlyConfigured(f'METRICS_ALLOWED_IPS: entrada inválida {entry!r} ({exc})') from exc
+    return networks
+
+
+def allowed_networks():
+    global _allowed_networks
+    if _allowed_networks is None:
+        _allowed_networks = parse_networks(settings.METRICS_ALLOWED_IPS)
+    return _allowed_networks
+
+
+@receiver(setting_changed)
+def reset_allowed_networks(setting=None, **kwargs):
+    global _allowed_networks
+    if setting is None or setting == 'METRICS_ALLOWED_IPS':
+        _allowed_networks = None
+
+
+def metrics_allowed(request):
+    """Acesso a /metrics/ por token (METRICS_TOKEN) ou a partir de METRICS_ALLOWED_IPS"""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in network for network in allowed_networks())
+
+
+def metrics_view(request):
+    """Métricas agregadas das requisições no formato texto do Prometheus"""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
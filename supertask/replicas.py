@@ -0,0 +1,188 @@
+"""Leituras em réplicas do banco (DATABASE_REPLICAS) nas listagens e no dashboard.
+
+As views que podem ler de uma réplica chamam ``use_replica(request)`` depois
+da autenticação (``ReplicaReadMixin`` nas views DRF). Nessa requisição o
+``ReplicaRouter`` manda as leituras para a réplica escolhida; todas as
+escritas, e as leituras das demais views, vão para o ``default``. A requisição
+usa uma única réplica, então a contagem e a página da paginação (e o ETag)
+vêm do mesmo banco.
+
+- Read-your-writes: uma requisição que escreve fixa o usuário no principal por
+  REPLICA_STICKY_SECONDS, tempo que cobre o atraso da replicação. A marca fica
+  no cache (com REDIS_URL vale para todos os workers).
+- Réplica fora do ar: a conexão é verificada ao escolher a réplica. Se falhar,
+  a leitura vai para o principal e a réplica fica fora por
+  REPLICA_RETRY_SECONDS (circuit breaker por processo).
+"""
+from contextvars import ContextVar
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework import permissions
+
+from .circuit import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+current_routing = ContextVar('replica_routing', default=None)
+
+# Circuit breaker de cada réplica, por processo
+breakers = {}
+
+
+class RoutingState:
+    """Banco das leituras de uma requisição e se ela escreveu"""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+def pinned_key(user_id):
+    return f'replica:pinned:{user_id}'
+
+
+def replica_breaker(alias):
+    breaker = breakers.get(alias)
+    if breaker is None:
+        breaker = breakers.setdefault(
+            alias, CircuitBreaker(failure_threshold=1, reset_timeout=settings.REPLICA_RETRY_SECONDS),
+        )
+    return breaker
+
+
+def available_replica():
+    """Uma réplica que aceita conexão, ou None"""
+    aliases = list(settings.DATABASE_REPLICAS)
+    random.shuffle(aliases)
+    for alias in aliases:
+        breaker = replica_breaker(alias)
+        if not breaker.allow():
+            continue
+        connection = connections[alias]
+        try:
+            connection.close_if_health_check_failed()
+            connection.ensure_connection()
+        except DatabaseError as exc:
+            breaker.record_failure()
+            logger.warning("Réplica %s indisponível, lendo do banco principal: %s", alias, exc)
+            continue
+        breaker.record_success()
+        return alias
+    return None
+
+
+def is_pinned(user):
+    """Se o usuário escreveu há menos de REPLICA_STICKY_SECONDS"""
+    if user is None or not user.is_authenticated:
+        return False
+    try:
+        return bool(cache.get(pinned_key(user.pk)))
+    except Exception:
+        # Sem o cache não há como saber: o principal é sempre consistente
+        logger.warning("Falha ao ler a marca de read-your-writes do cache", exc_info=True)
+        return True
+
+
+def pin(user):
+    if user is None or not user.is_authenticated:
+        return
+    try:
+        cache.set(pinned_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+    except Exception:
+        logger.warning("Falha ao gravar a marca de read-your-writes no cache", exc_info=True)
+
+
+def use_replica(request):
+    """Envia as leituras desta requisição a uma réplica, se houver uma disponível.
+
+    Não muda nada se não há réplicas configuradas, se a requisição já
+    escreveu ou se o usuário escreveu há pouco. Retorna a réplica escolhida.
+    """
+    state = current_routing.get()
+    if state is None or not settings.DATABASE_REPLICAS or state.wrote:
+        return None
+    if is_pinned(getattr(request, 'user', None)):
+        return None
+    state.replica = available_replica()
+    return state.replica
+
+
+async def ause_replica(request):
+    # Na thread do ORM assíncrono, onde a conexão com a réplica será usada
+    return await sync_to_async(use_replica)(request)
+
+
+class ReplicaRouter:
+    """Leituras na réplica escolhida por use_replica; o resto no banco principal"""
+
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if state is not None and state.replica is not None:
+            return state.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Sempre o principal, mesmo para um objeto lido de uma réplica
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+            state.replica = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # As réplicas são cópias do principal
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """Estado do roteamento por requisição; depois de uma escrita, fixa o usuário no principal"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        if state.wrote:
+            pin(getattr(request, 'user', None))
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        if state.wrote:
+            await sync_to_async(pin)(getattr(request, 'user', None))
+        return response
+
+
+class ReplicaReadMixin:
+    """View DRF cujas leituras (GET/HEAD) podem ir para uma réplica"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS:
+            use_replica(request)
@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import Choices, config
 from datetime import timedelta
 import dj_database_url
 import os
@@ -44,6 +44,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'supertask.instrumentation.RequestMetricsMiddleware',
+    'supertask.replicas.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.middleware.security.SecurityMiddleware',
@@ -55,7 +57,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'supertask.urls'
+# No modo ASGI (supertask.asgi) os endpoints de I/O usam views assíncronas
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+ROOT_URLCONF = 'supertask.urls_async' if ASYNC_VIEWS else 'supertask.urls'
 
 TEMPLATES = [
     {
@@ -76,9 +80,101 @@ TEMPLATES = [
 WSGI_APPLICATION = 'supertask.wsgi.application'
 
 DATABASE_URL = config('DATABASE_URL', default='sqlite:///db.sqlite3')
+# Segundos que cada conexão é reaproveitada entre requisições (0 abre uma por requisição).
+# No modo ASGI o padrão é 0, como recomenda o Django: use um pgbouncer (DB_POOL_MODE)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0 if ASYNC_VIEWS else 600, cast=int)
+# Antes de reaproveitar uma conexão, confere se ela ainda responde (descarta as derrubadas)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+# pgbouncer: DATABASE_URL aponta para um pgbouncer em transaction pooling
+DB_POOL_MODE = config('DB_POOL_MODE', default='', cast=Choices(['', 'pgbouncer']))
 DATABASES = {
-    'default': dj_database_url.parse(DATABASE_URL)
+    'default': dj_database_url.parse(
+        DATABASE_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
 }
+# Réplicas de leitura (supertask.replicas): URLs separadas por vírgula, vazio desliga.
+# As listagens de tarefas e categorias e o dashboard leem delas; o resto usa o principal
+DATABASE_REPLICA_URLS = config(
+    'DATABASE_REPLICA_URLS',
+    default='',
+    cast=lambda value: [item.strip() for item in value.split(',') if item.strip()],
+)
+for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+DATABASE_REPLICAS = [f'replica_{index}' for index in range(1, len(DATABASE_REPLICA_URLS) + 1)]
+DATABASE_ROUTERS = ['supertask.replicas.ReplicaRouter']
+# Segundos em que um usuário lê do principal depois de escrever (cobre o atraso da replicação)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+# Segundos até tentar de novo uma réplica que recusou a conexão
+REPLICA_RETRY_SECONDS = config('REPLICA_RETRY_SECONDS', default=30, cast=int)
+
+if DB_POOL_MODE == 'pgbouncer':
+    # Cada transação pode ir para outra conexão do servidor: cursores no servidor
+    # (o iterator() da exportação) não sobreviveriam entre elas
+    for database in DATABASES.values():
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Cache: Redis (ou compatível) em produção via REDIS_URL, memória local caso contrário
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'supertask',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'supertask',
+        }
+    }
+
+DASHBOARD_STATS_CACHE_TIMEOUT = config('DASHBOARD_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+TASK_BULK_MAX_OPERATIONS = config('TASK_BULK_MAX_OPERATIONS', default=5000, cast=int)
+# Linhas lidas do banco (e transmitidas) por bloco na exportação
+TASK_EXPORT_CHUNK_SIZE = config('TASK_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# Importação: linhas por lote (uma transação cada) e máximo de erros detalhados na resposta
+TASK_IMPORT_BATCH_SIZE = config('TASK_IMPORT_BATCH_SIZE', default=5000, cast=int)
+TASK_IMPORT_MAX_ERRORS = config('TASK_IMPORT_MAX_ERRORS', default=1000, cast=int)
+# Arquivamento (manage.py archive_tasks): idade mínima em dias das tarefas concluídas e linhas por lote
+TASK_ARCHIVE_AFTER_DAYS = config('TASK_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+TASK_ARCHIVE_BATCH_SIZE = config('TASK_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+# GET /api/tasks/ monta a lista a partir de .values() em vez do TaskSerializer (mesma saída)
+TASK_LIST_FAST_PATH = config('TASK_LIST_FAST_PATH', default=True, cast=bool)
+
+# Instrumentação (supertask.instrumentation): Server-Timing, log por requisição e /metrics/
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+# Fração das requisições registradas no log supertask.requests (0 a 1)
+REQUEST_LOG_SAMPLE_RATE = config('REQUEST_LOG_SAMPLE_RATE', default=1.0, cast=float)
+# Requisições mais lentas que isto (ms) são sempre registradas; 0 desliga
+REQUEST_LOG_SLOW_MS = config('REQUEST_LOG_SLOW_MS', default=1000, cast=int)
+# /metrics/: endereços (ou redes) liberados e token opcional (Authorization: Bearer <token>)
+METRICS_ALLOWED_IPS = config(
+    'METRICS_ALLOWED_IPS',
+    default='127.0.0.1,::1',
+    cast=lambda value: [item.strip() for item in value.split(',') if item.strip()],
+)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+QUOTE_API_URL = config('QUOTE_API_URL', default='http://api.quotable.io/quotes/random')
+QUOTE_CACHE_TIMEOUT = config('QUOTE_CACHE_TIMEOUT', default=86400, cast=int)
+QUOTE_REQUEST_TIMEOUT = config('QUOTE_REQUEST_TIMEOUT', default=5, cast=float)
+QUOTE_CIRCUIT_FAILURE_THRESHOLD = config('QUOTE_CIRCUIT_FAILURE_THRESHOLD', default=3, cast=int)
+QUOTE_CIRCUIT_RESET_SECONDS = config('QUOTE_CIRCUIT_RESET_SECONDS', default=300, cast=int)
+
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=1000, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+SYNC_WATERMARK_OVERLAP_SECONDS = config('SYNC_WATERMARK_OVERLAP_SECONDS', default=5, cast=int)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -112,7 +208,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -138,8 +234,15 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
+# Segundos entre sincronizações da blacklist de refresh tokens em memória (0 = a cada verificação)
+TOKEN_BLACKLIST_SYNC_INTERVAL = config('TOKEN_BLACKLIST_SYNC_INTERVAL', default=0, cast=int)
+
+# Segundos que cada processo guarda o estado ativo/inativo dos usuários autenticados por JWT
+AUTH_USER_STATE_CACHE_TIMEOUT = config('AUTH_USER_STATE_CACHE_TIMEOUT', default=30, cast=int)
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
@@ -181,6 +284,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # Uma linha JSON por requisição (amostrada), do RequestMetricsMiddleware
+        'supertask.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -190,6 +299,19 @@ if 'test' in sys.argv or 'test_coverage' in sys.argv:
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:'  # Usa SQLite em memória para testes
     }
+    # Réplica separada para os testes de roteamento, que a ligam com override_settings
+    DATABASES['replica_1'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    DATABASE_REPLICAS = []
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'supertask-tests',
+        }
+    }
     
     # Desabilita migrações para acelerar testes
     class DisableMigrations:
@@ -199,4 +321,8 @@ if 'test' in sys.argv or 'test_coverage' in sys.argv:
         def __getitem__(self, item):
             return None
     
-    MIGRATION_MODULES = DisableMigrations()
\ No newline at end of file
+    MIGRATION_MODULES = DisableMigrations()
+
+    # Sem o log por requisição na saída dos testes
+    REQUEST_LOG_SAMPLE_RATE = 0
+    REQUEST_LOG_SLOW_MS = 0
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""Perfil só de API, para os workers que atendem os clientes com JWT.
+
+Parte de ``supertask.settings`` e remove o que uma API autenticada apenas por
+JWT não usa: admin, sessões, mensagens e arquivos estáticos, com os seus
+middlewares (CSRF e AuthenticationMiddleware só servem às sessões). Menos apps
+e middlewares significam menos módulos importados na inicialização e menos
+trabalho por requisição.
+
+Uso: ``DJANGO_SETTINGS_MODULE=supertask.settings_api``. O admin, o
+collectstatic e as migrações continuam com ``supertask.settings``.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in (
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.contrib.messages.context_processors.messages'
+        ],
+    },
+}]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
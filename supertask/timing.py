@@ -0,0 +1,40 @@
+"""Medição de trechos de código dentro da requisição atual.
+
+``timed`` não depende do middleware: sem uma requisição sendo medida (ou com
+REQUEST_METRICS_ENABLED desligado) o bloco roda sem medição. O
+``RequestMetricsMiddleware`` (supertask.instrumentation) coloca as medições
+da requisição em ``current_metrics`` e publica os tempos em Server-Timing,
+no log e em /metrics/.
+
+O tempo de ``serializer`` vem dos serializers do projeto que usam
+``TimedRepresentationMixin`` e do caminho rápido da listagem de tarefas.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+current_metrics = ContextVar('request_metrics', default=None)
+
+
+@contextmanager
+def timed(name):
+    """Soma o tempo do bloco em ``name`` na requisição atual; chamadas aninhadas contam uma vez"""
+    metrics = current_metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+    metrics.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active.discard(name)
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+class TimedRepresentationMixin:
+    """Serializer DRF cujo to_representation entra no tempo ``serializer`` da requisição"""
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
@@ -1,10 +1,12 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import logging
 
+from .instrumentation import metrics_view
+
 logger = logging.getLogger(__name__)
 
 @csrf_exempt
@@ -34,6 +36,7 @@ def home_view(request):
                     'list_create': '/api/tasks/',
                     'detail': '/api/tasks/{id}/',
                     'toggle_status': '/api/tasks/{id}/toggle-status/',
+                    'bulk': '/api/tasks/bulk/',
                 },
                 'categories': {
                     'list_create': '/api/categories/',
@@ -42,7 +45,8 @@ def home_view(request):
                 'dashboard': {
                     'stats': '/api/dashboard/stats/',
                     'quote': '/api/dashboard/quote/',
-                }
+                },
+                'sync': '/api/sync/',
             },
             'docs': 'Esta é uma API REST para gerenciamento de tarefas.',
             'author': 'Jannyfer Tamagno',
@@ -70,7 +74,12 @@ def health_check(request):
 urlpatterns = [
     path('', home_view, name='home'), 
     path('health/', health_check, name='health_check'),
-    path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/auth/', include('accounts.urls')),
     path('api/', include('tasks.urls')),
-]
\ No newline at end of file
+]
+
+# O perfil só de API (supertask.settings_api) não instala o admin
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""URLs do modo ASGI: endpoints de I/O servidos por views assíncronas.
+
+Selecionado por ``ASYNC_VIEWS`` (ativo por padrão em ``supertask.asgi``);
+as demais rotas são as mesmas de ``supertask.urls``.
+"""
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.urls import path
+
+from tasks import async_views
+from . import urls
+
+
+async def health_check(request):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    return JsonResponse({
+        'status': 'healthy',
+        'service': 'SuperTask API',
+        'timestamp': str(request.GET.get('timestamp', 'now')),
+        'method': request.method
+    })
+
+
+urlpatterns = [
+    path('health/', health_check, name='health_check'),
+    path('api/tasks/', async_views.task_list_create, name='task-list-create'),
+    path('api/dashboard/stats/', async_views.dashboard_stats, name='dashboard-stats'),
+    path('api/dashboard/quote/', async_views.daily_quote, name='daily-quote'),
+] + urls.urlpatterns
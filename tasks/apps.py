@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tasks'
\ No newline at end of file
+    name = 'tasks'
+
+    def ready(self):
+        # Registra a restauração do índice FTS5 após o migrate (SQLite)
+        from . import search  # noqa: F401
@@ -0,0 +1,147 @@
+"""Arquivamento das tarefas concluídas antigas na tabela fria tasks_archivedtask.
+
+Tarefas concluídas há mais de TASK_ARCHIVE_AFTER_DAYS saem da tasks_task, e
+as listagens, contagens e índices do dia a dia deixam de passar por elas.
+
+- ``archive_tasks``: em lotes por faixa de id, cada um em uma transação, copia
+  as linhas com um INSERT ... SELECT e as remove pelo TaskQuerySet.delete(),
+  que atualiza os contadores (o dashboard conta só as tarefas não arquivadas)
+  e grava os tombstones da sincronização incremental.
+- ``restore_tasks``: o caminho inverso, com o mesmo id e updated_at atual (a
+  sincronização volta a enviar a tarefa), removendo os tombstones.
+- ``with_archived``: ``?include_archived=true`` em GET /api/tasks/ une as
+  duas tabelas em uma única consulta (UNION ALL), com os mesmos filtros.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q, Value
+from django.utils import timezone
+
+from .cache import invalidate_dashboard_stats
+from .counters import apply_deltas, grouped_counts
+from .filters import filter_tasks, order_tasks
+from .models import ArchivedTask, DeletionLog, Task
+from .rows import task_values
+from .search import contains_terms, search_terms
+
+# Colunas comuns à tasks_task e à tasks_archivedtask
+COPIED_COLUMNS = [
+    'id', 'title', 'description', 'priority', 'status', 'due_date',
+    'category_id', 'user_id', 'created_at', 'updated_at', 'completed_at',
+]
+
+
+def include_archived(params):
+    """?include_archived=true (ou 1) na query string"""
+    return params.get('include_archived', '').lower() in ('1', 'true')
+
+
+def archivable_tasks(days=None, now=None):
+    """Tarefas concluídas há mais de ``days`` dias (por updated_at se não há completed_at)"""
+    if days is None:
+        days = settings.TASK_ARCHIVE_AFTER_DAYS
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Task.objects.filter(
+        Q(completed_at__lt=cutoff) | Q(completed_at__isnull=True, updated_at__lt=cutoff),
+        status='completed',
+    )
+
+
+def _copy(queryset, target, **values):
+    """INSERT INTO <target> SELECT das linhas do queryset, sem passar pelo Python.
+
+    As colunas em ``values`` recebem esses valores em vez dos da origem.
+    """
+    copied = [name for name in COPIED_COLUMNS if name not in values]
+    annotations = {
+        f'copy_{name}': Value(value, output_field=target._meta.get_field(name))
+        for name, value in values.items()
+    }
+    select = queryset.order_by().annotate(**annotations).values(*copied, *annotations)
+    sql, params = select.query.sql_with_params()
+
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(target._meta.get_field(name).column) for name in [*copied, *values])
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {quote(target._meta.db_table)} ({columns}) {sql}', params)
+        return cursor.rowcount
+
+
+def _batches(queryset, batch_size):
+    """Fatias do queryset por faixa de id com até batch_size linhas cada"""
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield queryset.filter(pk__gt=last_id, pk__lte=ids[-1])
+        last_id = ids[-1]
+
+
+def archive_batch(queryset, now=None):
+    """Move as tarefas do queryset para a tasks_archivedtask; retorna quantas foram movidas"""
+    db = router.db_for_write(Task)
+    queryset = queryset.using(db)
+    with transaction.atomic(using=db):
+        # Trava as linhas: uma tarefa reaberta durante o lote não pode ficar nas duas tabelas
+        if not list(queryset.select_for_update().values_list('pk', flat=True)):
+            return 0
+        archived = _copy(queryset, ArchivedTask, archived_at=now or timezone.now())
+        queryset.delete()
+    return archived
+
+
+def restore_batch(queryset, now=None):
+    """Devolve as tarefas arquivadas do queryset à tasks_task; retorna quantas foram restauradas"""
+    db = router.db_for_write(Task)
+    queryset = queryset.using(db)
+    with transaction.atomic(using=db):
+        user_ids = set(queryset.select_for_update().values_list('user_id', flat=True))
+        if not user_ids:
+            return 0
+        restored = _copy(queryset, Task, updated_at=now or timezone.now())
+        apply_deltas(grouped_counts(queryset))
+        DeletionLog.objects.using(db).filter(model='task', object_id__in=queryset.values('pk')).delete()
+        queryset.delete()
+        for user_id in user_ids:
+            invalidate_dashboard_stats(user_id)
+    return restored
+
+
+def archive_tasks(queryset, batch_size=None, now=None):
+    """Arquiva as tarefas do queryset (ver archivable_tasks) em lotes; retorna o total"""
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    now = now or timezone.now()
+    return sum(archive_batch(batch, now) for batch in _batches(queryset, batch_size))
+
+
+def restore_tasks(queryset, batch_size=None, now=None):
+    """Restaura as tarefas arquivadas do queryset em lotes; retorna o total"""
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    now = now or timezone.now()
+    return sum(restore_batch(batch, now) for batch in _batches(queryset, batch_size))
+
+
+def archived_tasks(user, params):
+    """Tarefas arquivadas do usuário com os filtros, a busca e a ordenação de /api/tasks/.
+
+    A busca usa icontains por termo: a tabela fria não tem índice textual.
+    """
+    queryset = filter_tasks(ArchivedTask.objects.filter(user=user), params)
+    terms = search_terms(params.get('q') or '')
+    if terms:
+        queryset = contains_terms(queryset, terms)
+    return order_tasks(queryset, params.get('ordering', '-created_at'))
+
+
+def with_archived(queryset, archived, fields=None):
+    """task_values das tarefas e das arquivadas em uma consulta, na ordenação do queryset"""
+    ordering = queryset.query.order_by
+    return (
+        task_values(queryset, fields).order_by()
+        .union(task_values(archived, fields).order_by(), all=True)
+        .order_by(*ordering)
+    )
@@ -0,0 +1,149 @@
+"""Views assíncronas (ASGI) dos endpoints de I/O mais acessados.
+
+Servidas apenas no modo ASGI (``supertask.urls_async``), com o ORM assíncrono
+do Django. Produzem as mesmas respostas JSON das views DRF equivalentes; o que
+elas não cobrem (POST, paginação por cursor) é delegado à view síncrona.
+"""
+from collections import OrderedDict
+from functools import wraps
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from accounts.authentication import StatelessJWTAuthentication
+from supertask.replicas import ause_replica
+from .archive import include_archived
+from .conditional import auser_etag, not_modified_response, set_etag
+from .fields import only_task_columns, requested_fields
+from .quotes import get_quote_provider
+from .renderers import TaskJSONRenderer
+from .rows import task_values, tasks_data
+from .serializers import DashboardStatsSerializer, TaskSerializer
+from .stats import aget_dashboard_stats
+from . import views
+
+
+def json_response(data, status=200, renderer_class=JSONRenderer):
+    response = HttpResponse(renderer_class().render(data), status=status, content_type='application/json')
+    response['Vary'] = 'Accept'
+    return response
+
+
+def api_error(exc):
+    # Como no exception_handler do DRF, erros de validação vão sem o envelope "detail"
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if exc.status_code == 401:
+        response['WWW-Authenticate'] = StatelessJWTAuthentication().authenticate_header(None)
+    return response
+
+
+def async_csrf_exempt(view):
+    # O csrf_exempt do Django 4.2 embrulha a view em uma função síncrona
+    view.csrf_exempt = True
+    return view
+
+
+def authenticated(view):
+    """Autentica com o JWT (como IsAuthenticated nas views DRF) e converte APIException em JSON"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await StatelessJWTAuthentication().aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return api_error(exc)
+    return async_csrf_exempt(wrapper)
+
+
+async def conditional(request):
+    etag = await auser_etag(request)
+    return etag, not_modified_response(request, etag)
+
+
+task_list_create_sync = sync_to_async(views.TaskListCreateView.as_view())
+
+
+@async_csrf_exempt
+async def task_list_create(request):
+    """GET /api/tasks/ com paginação por página; os demais casos (e ?include_archived=) usam a view DRF"""
+    if (
+        request.method != 'GET'
+        or request.GET.get('pagination') == 'cursor'
+        or 'cursor' in request.GET
+        or include_archived(request.GET)
+    ):
+        return await task_list_create_sync(request)
+    return await task_list(request)
+
+
+@authenticated
+async def task_list(request):
+    await ause_replica(request)
+    etag, not_modified = await conditional(request)
+    if not_modified is not None:
+        return not_modified
+
+    fields = requested_fields(request.GET, TaskSerializer.Meta.fields)
+    queryset = only_task_columns(views.user_tasks(request.user, request.GET).select_related('category'), fields)
+
+    # Mesma semântica do PageNumberPagination do DRF (PAGE_SIZE, ?page=N|last)
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    count = await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+    page_param = request.GET.get('page', 1)
+    try:
+        number = num_pages if page_param == 'last' else int(page_param)
+    except (TypeError, ValueError):
+        number = 0
+    if number < 1 or number > num_pages:
+        return api_error(exceptions.NotFound('Invalid page.'))
+
+    offset = (number - 1) * page_size
+    if settings.TASK_LIST_FAST_PATH:
+        rows = [row async for row in task_values(queryset, fields)[offset:offset + page_size]]
+        results = tasks_data(rows, fields=fields)
+    else:
+        tasks = [task async for task in queryset[offset:offset + page_size]]
+        results = TaskSerializer(tasks, many=True, context={'request': request, 'fields': fields}).data
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', number + 1) if number < num_pages else None
+    if number == 1:
+        previous_url = None
+    elif number == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', number - 1)
+
+    data = OrderedDict([
+        ('count', count),
+        ('next', next_url),
+        ('previous', previous_url),
+        ('results', results),
+    ])
+    return set_etag(json_response(data, renderer_class=TaskJSONRenderer), etag)
+
+
+@authenticated
+async def dashboard_stats(request):
+    replica = await ause_replica(request)
+    etag, not_modified = await conditional(request)
+    if not_modified is not None:
+        return not_modified
+
+    data = await aget_dashboard_stats(request.user, store=replica is None)
+    return set_etag(json_response(DashboardStatsSerializer(data).data), etag)
+
+
+@authenticated
+async def daily_quote(request):
+    return json_response(await get_quote_provider().aget_quote())
@@ -0,0 +1,146 @@
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Task, Category
+from .serializers import BulkTaskItemSerializer
+
+OPERATIONS = ('create', 'update', 'delete')
+BATCH_SIZE = 500
+
+
+def resolve_categories(user, names):
+    """Resolve nomes de categoria (sem diferenciar maiúsculas) em uma única consulta"""
+    names = {name.lower().strip() for name in names if isinstance(name, str) and name.strip()}
+    if not names:
+        return {}
+
+    categories = {}
+    queryset = (
+        Category.objects.filter(user=user)
+        .annotate(lower_name=Lower('name'))
+        .filter(lower_name__in=names)
+        .order_by('pk')
+    )
+    for category in queryset:
+        categories.setdefault(category.lower_name, category)
+    return categories
+
+
+def _error(index, op, errors, task_id=None):
+    result = {'index': index, 'op': op, 'status': 'error', 'errors': errors}
+    if task_id is not None:
+        result['id'] = task_id
+    return result
+
+
+def apply_bulk_operations(user, operations):
+    """Aplica criações, atualizações e exclusões de tarefas em lote.
+
+    Cada operação é {"op": "create", "data": {...}}, {"op": "update", "id": 1,
+    "data": {...}} ou {"op": "delete", "id": 1}. Operações inválidas são
+    reportadas por item e não impedem as demais. Retorna a lista de resultados,
+    na mesma ordem das operações.
+    """
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    task_ids = set()
+
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op not in OPERATIONS:
+            results[index] = _error(index, op, {'op': [f"Expected one of: {', '.join(OPERATIONS)}."]})
+            continue
+
+        if op == 'create':
+            creates.append((index, operation.get('data')))
+            continue
+
+        task_id = operation.get('id')
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            results[index] = _error(index, op, {'id': ['A valid integer is required.']})
+        elif task_id in task_ids:
+            results[index] = _error(index, op, {'id': ['Duplicate task id in request.']}, task_id)
+        else:
+            task_ids.add(task_id)
+            if op == 'update':
+                updates.append((index, task_id, operation.get('data')))
+            else:
+                deletes.append((index, task_id))
+
+    names = [
+        data.get('category_name')
+        for data in [data for _, data in creates] + [data for _, _, data in updates]
+        if isinstance(data, dict)
+    ]
+    context = {'categories': resolve_categories(user, names)}
+    existing = Task.objects.filter(user=user).in_bulk(task_ids) if task_ids else {}
+    now = timezone.now()
+
+    # Uma instância de serializer por tipo de operação: os campos são montados uma única vez
+    create_serializer = BulkTaskItemSerializer(context=context)
+    update_serializer = BulkTaskItemSerializer(context=context, partial=True)
+
+    new_tasks = []
+    for index, data in creates:
+        try:
+            validated = create_serializer.run_validation(data)
+        except serializers.ValidationError as exc:
+            results[index] = _error(index, 'create', exc.detail)
+            continue
+
+        category = validated.pop('category_name', None)
+        task = Task(user=user, category=category, **validated)
+        task.sync_completed_at(now)
+        new_tasks.append((index, task))
+
+    changed_tasks = []
+    changed_fields = {'completed_at', 'updated_at'}
+    for index, task_id, data in updates:
+        task = existing.get(task_id)
+        if task is None:
+            results[index] = _error(index, 'update', {'id': ['Not found.']}, task_id)
+            continue
+        try:
+            validated = update_serializer.run_validation(data)
+        except serializers.ValidationError as exc:
+            results[index] = _error(index, 'update', exc.detail, task_id)
+            continue
+
+        if 'category_name' in validated:
+            validated['category'] = validated.pop('category_name')
+        for field, value in validated.items():
+            setattr(task, field, value)
+            changed_fields.add(field)
+        task.sync_completed_at(now)
+        # bulk_update não aplica auto_now
+        task.updated_at = now
+        changed_tasks.append((index, task))
+
+    deleted_ids = []
+    for index, task_id in deletes:
+        if task_id in existing:
+            deleted_ids.append((index, task_id))
+        else:
+            results[index] = _error(index, 'delete', {'id': ['Not found.']}, task_id)
+
+    with transaction.atomic():
+        Task.objects.bulk_create([task for _, task in new_tasks], batch_size=BATCH_SIZE)
+        if changed_tasks:
+            Task.objects.bulk_update(
+                [task for _, task in changed_tasks],
+                sorted(changed_fields),
+                batch_size=BATCH_SIZE,
+            )
+        if deleted_ids:
+            Task.objects.filter(user=user, pk__in=[task_id for _, task_id in deleted_ids]).delete()
+
+    for index, task in new_tasks:
+        results[index] = {'index': index, 'op': 'create', 'status': 'created', 'id': task.pk}
+    for index, task in changed_tasks:
+        results[index] = {'index': index, 'op': 'update', 'status': 'updated', 'id': task.pk}
+    for index, task_id in deleted_ids:
+        results[index] = {'index': index, 'op': 'delete', 'status': 'deleted', 'id': task_id}
+
+    return results
@@ -0,0 +1,82 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STATS_KEY = 'dashboard_stats:{user_id}'
+
+
+def dashboard_stats_key(user_id):
+    return DASHBOARD_STATS_KEY.format(user_id=user_id)
+
+
+def seconds_until_midnight(now=None):
+    """Segundos até a próxima meia-noite no fuso horário atual (TIME_ZONE)"""
+    now = timezone.localtime(now)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+    delta = midnight.astimezone(dt_timezone.utc) - now.astimezone(dt_timezone.utc)
+    return max(1, int(delta.total_seconds()))
+
+
+def _entry_data(entry, today):
+    if entry and entry.get('day') == today.isoformat():
+        return entry['data']
+    return None
+
+
+def _stats_timeout():
+    return min(settings.DASHBOARD_STATS_CACHE_TIMEOUT, seconds_until_midnight())
+
+
+def get_cached_dashboard_stats(user_id, today):
+    """Retorna as estatísticas em cache do usuário, ou None se não existirem ou forem de outro dia"""
+    try:
+        entry = cache.get(dashboard_stats_key(user_id))
+    except Exception:
+        logger.exception("Falha ao ler estatísticas do dashboard do cache")
+        return None
+    return _entry_data(entry, today)
+
+
+async def aget_cached_dashboard_stats(user_id, today):
+    try:
+        entry = await cache.aget(dashboard_stats_key(user_id))
+    except Exception:
+        logger.exception("Falha ao ler estatísticas do dashboard do cache")
+        return None
+    return _entry_data(entry, today)
+
+
+def set_cached_dashboard_stats(user_id, today, data):
+    """Armazena as estatísticas até a meia-noite local ou até o timeout configurado"""
+    try:
+        cache.set(dashboard_stats_key(user_id), {'day': today.isoformat(), 'data': data}, _stats_timeout())
+    except Exception:
+        logger.exception("Falha ao gravar estatísticas do dashboard no cache")
+
+
+async def aset_cached_dashboard_stats(user_id, today, data):
+    try:
+        await cache.aset(dashboard_stats_key(user_id), {'day': today.isoformat(), 'data': data}, _stats_timeout())
+    except Exception:
+        logger.exception("Falha ao gravar estatísticas do dashboard no cache")
+
+
+def _delete_dashboard_stats(user_id):
+    try:
+        cache.delete(dashboard_stats_key(user_id))
+    except Exception:
+        logger.exception("Falha ao invalidar estatísticas do dashboard")
+
+
+def invalidate_dashboard_stats(user_id):
+    """Invalida as estatísticas do usuário agora e novamente após o commit da transação"""
+    _delete_dashboard_stats(user_id)
+    if connection.in_atomic_block:
+        # Evita que uma leitura concorrente grave no cache dados anteriores ao commit
+        transaction.on_commit(lambda: _delete_dashboard_stats(user_id))
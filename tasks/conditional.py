@@ -0,0 +1,123 @@
+import hashlib
+
+from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .models import Task, Category, DeletionLog
+
+
+def _per_user(queryset, aggregate):
+    return Subquery(
+        queryset.filter(user=OuterRef('pk'))
+        .order_by()
+        .values('user')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def _etag(request, parts):
+    """ETag a partir das versões dos dados e do dia atual.
+
+    ``is_overdue`` e o dashboard mudam à meia-noite sem alterar nenhuma
+    linha, então o dia local entra no ETag. A URL e o Accept também entram
+    porque filtros e renderizadores alteram a representação.
+
+    Não há Last-Modified: com resolução de segundos, uma escrita no mesmo
+    segundo da leitura anterior não mudaria a data e o If-Modified-Since
+    devolveria um 304 falso. O ETag muda a cada escrita.
+    """
+    raw = '|'.join(str(part) for part in [
+        request.user.pk,
+        timezone.localdate().isoformat(),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        *parts,
+    ])
+    return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _user_versions(user):
+    return (
+        User.objects.filter(pk=user.pk)
+        .annotate(
+            task_updated=_per_user(Task.objects.all(), Max('updated_at')),
+            task_count=Coalesce(_per_user(Task.objects.all(), Count('id')), 0, output_field=IntegerField()),
+            category_updated=_per_user(Category.objects.all(), Max('updated_at')),
+            category_count=Coalesce(_per_user(Category.objects.all(), Count('id')), 0, output_field=IntegerField()),
+            last_deleted=_per_user(DeletionLog.objects.all(), Max('deleted_at')),
+        )
+        .values('task_updated', 'task_count', 'category_updated', 'category_count', 'last_deleted')
+    )
+
+
+def _user_etag(request, row):
+    return _etag(request, [
+        row['task_count'], row['category_count'],
+        row['task_updated'], row['category_updated'], row['last_deleted'],
+    ])
+
+
+def user_etag(request):
+    """ETag das tarefas e categorias do usuário em uma única query.
+
+    Usa max(updated_at) e a contagem de tarefas e categorias (índices
+    user/updated_at) e a exclusão mais recente registrada no DeletionLog.
+    """
+    return _user_etag(request, _user_versions(request.user).get())
+
+
+async def auser_etag(request):
+    """Versão assíncrona de user_etag para as views ASGI"""
+    return _user_etag(request, await _user_versions(request.user).aget())
+
+
+def task_etag(request, pk):
+    """ETag de uma tarefa (ela e sua categoria), ou None se não existir"""
+    row = (
+        Task.objects.filter(pk=pk, user=request.user)
+        .values_list('updated_at', 'category_id', 'category__updated_at')
+        .first()
+    )
+    if row is None:
+        return None
+    return _etag(request, row)
+
+
+def not_modified_response(request, etag):
+    """Resposta 304 se o If-None-Match do cliente indicar que nada mudou"""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_etag(response, etag)
+    return response
+
+
+def set_etag(response, etag):
+    response['ETag'] = etag
+    # Respostas por usuário: proíbe caches compartilhados e força revalidação
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """GET condicional (If-None-Match) antes de consultar e serializar"""
+
+    def get_etag(self, request, *args, **kwargs):
+        return user_etag(request)
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_etag(response, etag)
+        return response
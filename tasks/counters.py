@@ -0,0 +1,143 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .cache import invalidate_dashboard_stats
+from .models import Task, TaskCounter
+
+# Campos da Task que determinam em qual contador ela é contabilizada
+COUNTED_FIELDS = ('user_id', 'category_id', 'status', 'priority')
+
+_pending_rebuild = ContextVar('task_counters_pending_rebuild', default=None)
+
+
+def counter_key(values):
+    """Chave (user_id, category_id, status, priority) a partir de um dict de valores"""
+    return tuple(values[field] for field in COUNTED_FIELDS)
+
+
+def _counter_filter(key):
+    user_id, category_id, status, priority = key
+    return {
+        'user_id': user_id,
+        'category_id': category_id,
+        'status': status,
+        'priority': priority,
+    }
+
+
+def apply_deltas(deltas):
+    """Aplica incrementos/decrementos aos contadores dentro de uma transação"""
+    with transaction.atomic():
+        for key, delta in deltas.items():
+            if not delta:
+                continue
+
+            counters = TaskCounter.objects.filter(**_counter_filter(key))
+            if counters.update(count=F('count') + delta) or delta < 0:
+                continue
+
+            try:
+                with transaction.atomic():
+                    TaskCounter.objects.create(count=delta, **_counter_filter(key))
+            except IntegrityError:
+                # Outra transação criou o contador primeiro
+                counters.update(count=F('count') + delta)
+
+
+def grouped_counts(queryset):
+    """Conta as tarefas do queryset agrupadas pela chave dos contadores"""
+    rows = (
+        queryset.order_by()
+        .values(*COUNTED_FIELDS)
+        .annotate(total=Count('id'))
+    )
+    return Counter({counter_key(row): row['total'] for row in rows})
+
+
+def rebuild_counters(user_ids=None):
+    """Recalcula os contadores a partir da tabela de tarefas; retorna o número de linhas criadas"""
+    tasks = Task.objects.all()
+    counters = TaskCounter.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        tasks = tasks.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        counters.delete()
+        created = TaskCounter.objects.bulk_create(
+            TaskCounter(count=total, **_counter_filter(key))
+            for key, total in grouped_counts(tasks).items()
+        )
+    return len(created)
+
+
+def verify_counters(user_ids=None):
+    """Compara os contadores com a tabela de tarefas e retorna as divergências"""
+    tasks = Task.objects.all()
+    counters = TaskCounter.objects.exclude(count=0)
+    if user_ids is not None:
+        tasks = tasks.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    expected = grouped_counts(tasks)
+    actual = Counter({
+        counter_key(row): row['count']
+        for row in counters.values(*COUNTED_FIELDS, 'count')
+    })
+
+    return {
+        key: (expected[key], actual[key])
+        for key in expected.keys() | actual.keys()
+        if expected[key] != actual[key]
+    }
+
+
+def refresh_users(user_ids):
+    """Reconstrói os contadores e invalida o cache do dashboard dos usuários informados"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    pending = _pending_rebuild.get()
+    if pending is not None:
+        pending.update(user_ids)
+        return
+
+    rebuild_counters(user_ids)
+    for user_id in user_ids:
+        invalidate_dashboard_stats(user_id)
+
+
+@contextmanager
+def deferred_refresh():
+    """Agrupa as reconstruções de contadores feitas dentro do bloco em uma única ao final"""
+    if _pending_rebuild.get() is not None:
+        yield
+        return
+
+    pending = set()
+    token = _pending_rebuild.set(pending)
+    try:
+        yield
+    finally:
+        _pending_rebuild.reset(token)
+    refresh_users(pending)
+
+
+def category_task_count(category):
+    """Número de tarefas da categoria lido dos contadores"""
+    total = TaskCounter.objects.filter(category=category).aggregate(total=Sum('count'))['total']
+    return total or 0
+
+
+def move_category_counters_to_uncategorized(category):
+    """Transfere os contadores de uma categoria excluída para 'sem categoria' (SET_NULL)"""
+    deltas = Counter()
+    for row in TaskCounter.objects.filter(category=category).values(*COUNTED_FIELDS, 'count'):
+        deltas[(row['user_id'], None, row['status'], row['priority'])] += row['count']
+    apply_deltas(deltas)
@@ -0,0 +1,117 @@
+"""Exportação das tarefas em CSV ou NDJSON, transmitida linha a linha.
+
+As linhas são lidas com ``iterator(chunk_size=...)`` (cursor no servidor no
+PostgreSQL) como ``.values()``, convertidas por ``tasks.rows``, e escritas em
+blocos de TASK_EXPORT_CHUNK_SIZE linhas: a memória usada não depende do
+número de tarefas do usuário. No ASGI o conteúdo é um iterador assíncrono
+(``aexport_stream``): com um gerador síncrono o Django 4.2 leria a exportação
+inteira para a memória antes de enviá-la.
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .rows import TASK_FIELDS, overdue_today, task_data, task_values
+
+EXPORT_FIELDS = TASK_FIELDS
+
+
+class CSVRenderer(BaseRenderer):
+    """Habilita ?format=csv (e Accept: text/csv) na view de exportação"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Usado apenas para respostas de erro; a exportação é transmitida pela view
+        return json.dumps(data).encode()
+
+
+class NDJSONRenderer(CSVRenderer):
+    """Habilita ?format=ndjson (e Accept: application/x-ndjson)"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def export_rows(queryset, today=None, fields=None):
+    """Gera dicionários com as colunas de EXPORT_FIELDS (ou só ``fields``), lendo o queryset em blocos"""
+    if today is None:
+        today = overdue_today()
+
+    tz = timezone.get_current_timezone()
+    rows = task_values(queryset, fields).iterator(chunk_size=settings.TASK_EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield task_data(row, today, tz, fields)
+
+
+class LineBuffer:
+    """Destino do csv.writer que acumula as linhas escritas até serem transmitidas"""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, value):
+        self.lines.append(value)
+
+    def flush(self):
+        data = ''.join(self.lines)
+        self.lines = []
+        return data
+
+
+def chunked(lines, size):
+    """Agrupa as linhas em blocos de até size linhas, para não transmitir uma linha por vez"""
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) >= size:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def csv_lines(rows, fields=None):
+    buffer = LineBuffer()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS if fields is None else fields)
+    writer.writeheader()
+    yield buffer.flush()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.flush()
+
+
+def ndjson_lines(rows, fields=None):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
+
+
+def export_stream(queryset, export_format, fields=None):
+    """Conteúdo da exportação em blocos de texto, para o StreamingHttpResponse"""
+    lines = EXPORT_FORMATS[export_format](export_rows(queryset, fields=fields), fields)
+    return chunked(lines, settings.TASK_EXPORT_CHUNK_SIZE)
+
+
+async def aexport_stream(stream):
+    """Os blocos de export_stream como iterador assíncrono, lidos um a um.
+
+    Cada bloco é lido com sync_to_async na thread da requisição, onde está a
+    conexão (e o cursor) do banco usada pelo gerador.
+    """
+    blocks = iter(stream)
+    next_block = sync_to_async(next)
+    while True:
+        block = await next_block(blocks, None)
+        if block is None:
+            return
+        yield block
@@ -0,0 +1,75 @@
+"""Campos esparsos (?fields= e ?exclude=) nos endpoints de tarefas e categorias.
+
+``?fields=id,title,status`` restringe cada item a esses campos e
+``?exclude=description`` remove campos; a ordem é sempre a do serializer.
+Além da resposta, as views restringem as colunas lidas do banco
+(``.values()`` ou ``only()``), então uma descrição longa que não foi pedida
+nunca é lida. Vale só para leituras (GET).
+"""
+from rest_framework.exceptions import ValidationError
+
+from .rows import ordering_columns, task_columns
+
+def requested_fields(params, available):
+    """Campos pedidos, na ordem de ``available``, ou None quando todos são retornados"""
+    selected = list(available)
+    for param in ('fields', 'exclude'):
+        value = params.get(param)
+        if not value:
+            continue
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: [f"Unknown field(s): {', '.join(unknown)}."]})
+        if param == 'fields':
+            selected = [name for name in selected if name in names]
+        else:
+            selected = [name for name in selected if name not in names]
+    return None if selected == list(available) else selected
+
+
+def only_task_columns(queryset, fields):
+    """Restringe o SELECT das tarefas às colunas dos campos pedidos (e às chaves da ordenação)"""
+    if fields is None:
+        return queryset
+    columns = task_columns(fields)
+    if 'category__name' not in columns:
+        # only() não permite seguir com select_related uma relação adiada
+        queryset = queryset.select_related(None)
+    return queryset.only(*dict.fromkeys(columns + ordering_columns(queryset)))
+
+
+def only_category_columns(queryset, fields):
+    if fields is None:
+        return queryset
+    return queryset.only(*[name for name in fields if name != 'task_count'])
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer que retorna só os campos de ``context['fields']``, quando informado"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.context.get('fields')
+        if names is None:
+            return fields
+        return {name: fields[name] for name in names}
+
+
+class SparseFieldsMixin:
+    """?fields= e ?exclude= nas leituras de uma view DRF; ``available_fields`` são os do serializer"""
+    available_fields = None
+
+    @property
+    def sparse_fields(self):
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = requested_fields(self.request.query_params, self.available_fields)
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.sparse_fields
+        return context
+
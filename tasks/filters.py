@@ -0,0 +1,76 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Case, When, IntegerField
+from django.utils import timezone
+
+from .models import Task
+
+
+def filter_tasks(queryset, params):
+    """Aplica os filtros de query string suportados por /api/tasks/"""
+    priority = params.get('priority')
+    status_filter = params.get('status')
+    category = params.get('category')
+    due_date = params.get('due_date')
+    
+    if priority:
+        queryset = queryset.filter(priority=priority)
+    
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    
+    if category:
+        queryset = queryset.filter(category=category)
+        
+    if due_date:
+        today = timezone.localdate()
+        if due_date == 'today':
+            queryset = queryset.filter(due_date=today)
+        elif due_date == 'overdue':
+            queryset = queryset.filter(due_date__lt=today).exclude(status='completed')
+    
+    return queryset
+
+
+PRIORITY_RANK = Case(
+    When(priority='high', then=1),
+    When(priority='medium', then=2),
+    When(priority='low', then=3),
+    default=4,
+    output_field=IntegerField(),
+)
+
+
+def ordering_keys(ordering):
+    """Chaves (campo, descendente) de uma ordenação, terminando em um desempate estável.
+
+    Retorna None quando a ordenação não é um campo simples da Task (por exemplo,
+    campos relacionados), que então é repassada como está ao ``order_by``.
+    """
+    if ordering == 'due_date':
+        return [('due_date', False), ('created_at', True), ('id', True)]
+    if ordering == 'priority':
+        return [('priority_rank', False), ('created_at', True), ('id', True)]
+
+    descending = ordering.startswith('-')
+    name = ordering.lstrip('-')
+    try:
+        field = Task._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.is_relation:
+        return None
+
+    if field.primary_key:
+        return [('id', descending)]
+    return [(field.name, descending), ('id', descending)]
+
+
+def order_tasks(queryset, ordering):
+    """Aplica a ordenação suportada por /api/tasks/"""
+    keys = ordering_keys(ordering)
+    if keys is None:
+        return queryset.order_by(ordering)
+
+    if ordering == 'priority':
+        queryset = queryset.annotate(priority_rank=PRIORITY_RANK)
+    return queryset.order_by(*(f'-{name}' if descending else name for name, descending in keys))
@@ -0,0 +1,194 @@
+"""Importação de tarefas a partir de CSV ou NDJSON.
+
+O arquivo é lido linha a linha, cada linha é validada pelo
+ImportTaskItemSerializer (sem consultas) e as tarefas válidas são gravadas
+com ``bulk_create`` em lotes, cada lote na sua própria transação. As
+categorias são resolvidas por um mapa em memória (nome em minúsculas -> id)
+carregado uma única vez, e as inexistentes são criadas na primeira linha que
+as usa.
+
+Como os lotes já gravados permanecem, uma importação interrompida pode ser
+retomada com ``start`` igual ao ``next_row`` do último progresso reportado.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.parsers import BaseParser
+
+from .models import Task, Category
+from .serializers import ImportTaskItemSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'ndjson': 'ndjson',
+    'jsonl': 'ndjson',
+}
+
+
+def detect_format(content_type=None, filename=None):
+    """Formato pelo Content-Type ou, para uploads, pela extensão do arquivo"""
+    if content_type:
+        import_format = CONTENT_TYPES.get(content_type.split(';')[0].strip().lower())
+        if import_format:
+            return import_format
+    if filename and '.' in filename:
+        return EXTENSIONS.get(filename.rsplit('.', 1)[1].lower())
+    return None
+
+
+class ImportStreamParser(BaseParser):
+    """Entrega o corpo CSV à view sem lê-lo, para a importação ser incremental"""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+
+class NDJSONImportStreamParser(ImportStreamParser):
+    media_type = 'application/x-ndjson'
+
+
+def text_lines(stream):
+    """Linhas de texto de um arquivo (binário ou texto) ou do corpo da requisição, sem lê-lo inteiro"""
+    for number, line in enumerate(stream):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig' if number == 0 else 'utf-8')
+        yield line
+
+
+def csv_rows(stream):
+    for row in csv.DictReader(text_lines(stream)):
+        # Células vazias contam como campo não informado (exceto o título, que é obrigatório)
+        yield {key: value for key, value in row.items() if key and (value != '' or key == 'title')}
+
+
+def ndjson_rows(stream):
+    for line in text_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield serializers.ValidationError({'non_field_errors': ['Invalid JSON.']})
+
+
+ROW_READERS = {
+    'csv': csv_rows,
+    'ndjson': ndjson_rows,
+}
+
+
+def user_category_map(user):
+    """Mapa nome em minúsculas -> id das categorias do usuário (a mais antiga vence)"""
+    categories = {}
+    rows = (
+        Category.objects.filter(user=user)
+        .annotate(lower_name=Lower('name'))
+        .order_by('pk')
+        .values_list('lower_name', 'pk')
+    )
+    for name, pk in rows:
+        categories.setdefault(name, pk)
+    return categories
+
+
+class TaskImporter:
+    """Importa tarefas de um usuário em lotes; ``progress`` é chamado após cada lote gravado"""
+
+    def __init__(self, user, batch_size=None, create_categories=True, max_errors=None, progress=None):
+        self.user = user
+        self.batch_size = batch_size or settings.TASK_IMPORT_BATCH_SIZE
+        self.create_categories = create_categories
+        self.max_errors = settings.TASK_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self.progress = progress
+        self.categories = None
+        self.serializer = ImportTaskItemSerializer(context={})
+
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.categories_created = []
+        self.next_row = 0
+
+    def run(self, stream, import_format, start=0):
+        """Importa as linhas após as ``start`` primeiras e retorna o resumo"""
+        self.categories = user_category_map(self.user)
+        self.next_row = start
+        now = timezone.now()
+        batch = []
+        number = start
+
+        for number, data in enumerate(ROW_READERS[import_format](stream), start=1):
+            if number <= start:
+                continue
+            task = self.build_task(number, data, now)
+            if task is not None:
+                batch.append(task)
+            if number - self.next_row >= self.batch_size:
+                self.flush(batch, number)
+                batch = []
+        self.flush(batch, max(number, start))
+        return self.summary()
+
+    def build_task(self, number, data, now):
+        try:
+            if isinstance(data, serializers.ValidationError):
+                raise data
+            if not isinstance(data, dict):
+                raise serializers.ValidationError({'non_field_errors': ['Expected an object.']})
+            validated = self.serializer.run_validation(data)
+            category_name = validated.pop('category_name', None)
+            category_id = self.resolve_category(category_name) if category_name else None
+        except serializers.ValidationError as exc:
+            self.add_error(number, exc.detail)
+            return None
+
+        task = Task(user=self.user, category_id=category_id, **validated)
+        task.sync_completed_at(now)
+        return task
+
+    def resolve_category(self, name):
+        key = name.lower()
+        category_id = self.categories.get(key)
+        if category_id is None:
+            if not self.create_categories:
+                raise serializers.ValidationError({'category_name': [f"Categoria '{name}' não encontrada."]})
+            category, _ = Category.objects.get_or_create(user=self.user, name=name)
+            category_id = self.categories[key] = category.pk
+            self.categories_created.append(name)
+        return category_id
+
+    def add_error(self, number, detail):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': number, 'errors': detail})
+
+    def flush(self, batch, last_row):
+        if batch:
+            Task.objects.bulk_create(batch, batch_size=self.batch_size)
+            self.created += len(batch)
+        self.next_row = last_row
+        if self.progress is not None:
+            self.progress(self)
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'errors': self.error_count,
+            'error_rows': self.errors,
+            'categories_created': self.categories_created,
+            'next_row': self.next_row,
+        }
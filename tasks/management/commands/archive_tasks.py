@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.archive import archivable_tasks, archive_tasks, restore_tasks
+from tasks.models import ArchivedTask
+
+
+class Command(BaseCommand):
+    help = 'Move as tarefas concluídas há mais de N dias para a tabela de arquivadas, em lotes (ou as restaura)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help='Arquiva as concluídas há mais de N dias (padrão: TASK_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument('--batch-size', type=int, help='Tarefas por lote (padrão: TASK_ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--user', help='Username: apenas as tarefas deste usuário')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Só conta as tarefas que seriam arquivadas (ou restauradas)',
+        )
+        parser.add_argument(
+            '--restore',
+            action='store_true',
+            help='Devolve as tarefas arquivadas (todas, ou as de --user) à tabela principal',
+        )
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            queryset = ArchivedTask.objects.all()
+        else:
+            queryset = archivable_tasks(options['days'])
+
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário '{options['user']}' não encontrado")
+            queryset = queryset.filter(user=user)
+
+        if options['dry_run']:
+            action = 'restauradas' if options['restore'] else 'arquivadas'
+            self.stdout.write(f"Tarefas que seriam {action}: {queryset.count()}")
+            return
+
+        if options['restore']:
+            restored = restore_tasks(queryset, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Tarefas restauradas: {restored}"))
+        else:
+            archived = archive_tasks(queryset, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Tarefas arquivadas: {archived}"))
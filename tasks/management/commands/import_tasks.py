@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import IMPORT_FORMATS, TaskImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = 'Importa tarefas de um arquivo CSV ou NDJSON para um usuário, em lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo .csv/.ndjson ('-' para a entrada padrão)")
+        parser.add_argument('--user', required=True, help='Username do dono das tarefas')
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='Formato do arquivo (padrão: pela extensão)',
+        )
+        parser.add_argument('--batch-size', type=int, help='Linhas por lote (padrão: TASK_IMPORT_BATCH_SIZE)')
+        parser.add_argument('--start', type=int, default=0, help='Pula as N primeiras linhas de dados')
+        parser.add_argument(
+            '--checkpoint',
+            help='Arquivo com a próxima linha a importar: lido ao iniciar e atualizado a cada lote',
+        )
+        parser.add_argument(
+            '--no-create-categories',
+            action='store_false',
+            dest='create_categories',
+            help='Reporta como erro as categorias inexistentes em vez de criá-las',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['user']}' não encontrado")
+
+        path = options['path']
+        import_format = options['format'] or detect_format(filename=path)
+        if import_format is None:
+            raise CommandError('Não foi possível detectar o formato; use --format')
+
+        start = options['start']
+        checkpoint = options['checkpoint']
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as checkpoint_file:
+                start = max(start, int(checkpoint_file.read().strip() or 0))
+            self.stdout.write(f"Retomando após a linha {start}")
+
+        def progress(importer):
+            if checkpoint:
+                with open(checkpoint, 'w') as checkpoint_file:
+                    checkpoint_file.write(str(importer.next_row))
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{importer.next_row} linhas processadas, {importer.created} tarefas criadas")
+
+        importer = TaskImporter(
+            user,
+            batch_size=options['batch_size'],
+            create_categories=options['create_categories'],
+            progress=progress,
+        )
+        started = time.perf_counter()
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            summary = importer.run(stream, import_format, start=start)
+        except Exception as exc:
+            raise CommandError(
+                f"Importação interrompida: {exc}. As linhas até {importer.next_row} foram gravadas; "
+                f"retome com --start {importer.next_row} (ou o mesmo --checkpoint)"
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        for error in summary['error_rows']:
+            self.stderr.write(f"Linha {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        if summary['categories_created']:
+            self.stdout.write(f"Categorias criadas: {', '.join(summary['categories_created'])}")
+        rows = summary['next_row'] - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Tarefas criadas: {summary['created']}, erros: {summary['errors']} "
+            f"({rows / elapsed if elapsed else 0:.0f} linhas/s)"
+        ))
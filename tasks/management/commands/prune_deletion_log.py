@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.sync import prune_deletion_log
+
+
+class Command(BaseCommand):
+    help = 'Remove os registros de exclusão (tombstones) mais antigos que a retenção da sincronização'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Retenção em dias (padrão: SYNC_TOMBSTONE_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = prune_deletion_log(before)
+        self.stdout.write(self.style.SUCCESS(f"Tombstones removidos: {deleted}"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.counters import rebuild_counters, verify_counters
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói e/ou verifica os contadores materializados de tarefas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Apenas verifica os contadores, sem reconstruir',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Restringe a operação ao usuário informado (pode ser repetido)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if not options['verify']:
+            created = rebuild_counters(user_ids)
+            self.stdout.write(f"Contadores reconstruídos: {created} linhas")
+
+        mismatches = verify_counters(user_ids)
+        if mismatches:
+            for key, (expected, actual) in sorted(mismatches.items(), key=str):
+                self.stderr.write(f"{key}: esperado {expected}, encontrado {actual}")
+            raise CommandError(f"{len(mismatches)} contadores divergentes")
+
+        self.stdout.write(self.style.SUCCESS('Contadores consistentes'))
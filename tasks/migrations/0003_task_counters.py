@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_task_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    rows = (
+        Task.objects.order_by()
+        .values('user_id', 'category_id', 'status', 'priority')
+        .annotate(total=models.Count('id'))
+    )
+    TaskCounter.objects.bulk_create(
+        TaskCounter(
+            user_id=row['user_id'],
+            category_id=row['category_id'],
+            status=row['status'],
+            priority=row['priority'],
+            count=row['total'],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0002_alter_category_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tasks.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskcounter',
+            constraint=models.UniqueConstraint(fields=('user', 'category', 'status', 'priority'), name='unique_task_counter'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'status', 'priority'), name='unique_uncategorized_task_counter'),
+        ),
+        migrations.RunPython(populate_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tasks.search import create_search_index, drop_search_index
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+    """Índice da busca textual: GIN no PostgreSQL, FTS5 com triggers no SQLite.
+
+    Fica fora de Task.Meta.indexes porque depende do banco; veja tasks/search.py.
+    """
+
+    dependencies = [
+        ('tasks', '0005_sync_deletion_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
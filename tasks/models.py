@@ -1,7 +1,13 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
+from .cache import invalidate_dashboard_stats
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     color = models.CharField(max_length=7, default='#007bff')
@@ -13,10 +19,81 @@ class Category(models.Model):
         verbose_name_plural = 'Categories'
         ordering = ['name']
         unique_together = ['name', 'user']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='category_user_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+class TaskQuerySet(models.QuerySet):
+    """QuerySet que mantém os contadores de tarefas consistentes em operações em lote"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .counters import apply_deltas, refresh_users
+
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            user_ids = {obj.user_id for obj in objs}
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Não é possível saber quais linhas foram inseridas
+                refresh_users(user_ids)
+            else:
+                apply_deltas(Counter(obj.counter_key() for obj in objs))
+                for user_id in user_ids:
+                    invalidate_dashboard_stats(user_id)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .counters import deferred_refresh
+
+        with transaction.atomic(using=self.db), deferred_refresh():
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        from .counters import refresh_users
+
+        # update() não aplica auto_now; a sincronização incremental depende de updated_at
+        kwargs.setdefault('updated_at', timezone.now())
+        counted = {'user', 'user_id', 'category', 'category_id', 'status', 'priority'}
+        # due_date não altera os contadores, mas altera overdue/due_today do dashboard
+        if counted.isdisjoint(kwargs) and 'due_date' not in kwargs:
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            user_ids = set(self.order_by().values_list('user_id', flat=True).distinct())
+            new_user = kwargs.get('user', kwargs.get('user_id'))
+            if new_user is not None:
+                user_ids.add(getattr(new_user, 'pk', new_user))
+            rows = super().update(**kwargs)
+            if counted.isdisjoint(kwargs):
+                for user_id in user_ids:
+                    invalidate_dashboard_stats(user_id)
+            else:
+                refresh_users(user_ids)
+        return rows
+
+    def delete(self):
+        from .counters import apply_deltas
+
+        with transaction.atomic(using=self.db):
+            rows = list(self.order_by().values_list('pk', 'user_id', 'category_id', 'status', 'priority'))
+            result = super().delete()
+            deltas = Counter()
+            for _, *key in rows:
+                deltas[tuple(key)] -= 1
+            apply_deltas(deltas)
+            # Tombstones para a sincronização incremental (/api/sync/)
+            DeletionLog.objects.bulk_create(
+                [DeletionLog(user_id=user_id, model='task', object_id=pk) for pk, user_id, *_ in rows],
+                batch_size=1000,
+            )
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ('low', 'Low'),
@@ -41,21 +118,191 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(blank=True, null=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        # Índices alinhados aos filtros e ordenações de TaskListCreateView (sempre filtrada por user)
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+            models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+            models.Index(fields=['user', 'priority', '-created_at'], name='task_user_priority_idx'),
+            models.Index(fields=['user', 'due_date', '-created_at'], name='task_user_due_created_idx'),
+            models.Index(fields=['category', '-created_at'], name='task_category_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='task_user_updated_idx'),
+            models.Index(
+                fields=['user', 'due_date'],
+                name='task_user_open_due_idx',
+                condition=models.Q(due_date__isnull=False) & ~models.Q(status='completed'),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
+    def counter_key(self):
+        return (self.user_id, self.category_id, self.status, self.priority)
+
+    def _stored_counter_key(self, using=None):
+        """Chave dos contadores da linha gravada no banco, travada até o fim da transação.
+
+        Relida a cada save/delete em vez de guardada ao carregar a instância:
+        duas cópias da mesma tarefa carregadas antes de qualquer save
+        aplicariam o mesmo delta duas vezes.
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        return (
+            Task.objects.db_manager(using).select_for_update()
+            .filter(pk=self.pk)
+            .values_list('user_id', 'category_id', 'status', 'priority')
+            .first()
+        )
+
+    def sync_completed_at(self, now=None):
+        """Define completed_at ao concluir a tarefa e o limpa nos demais status"""
         if self.status == 'completed' and not self.completed_at:
-            self.completed_at = timezone.now()
+            self.completed_at = now or timezone.now()
         elif self.status != 'completed':
             self.completed_at = None
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        from .counters import apply_deltas
+
+        self.sync_completed_at()
+
+        with transaction.atomic(using=kwargs.get('using')):
+            old_key = self._stored_counter_key(kwargs.get('using'))
+            super().save(*args, **kwargs)
+            new_key = self.counter_key()
+
+            update_fields = kwargs.get('update_fields')
+            if old_key is not None and update_fields is not None:
+                # Apenas os campos gravados alteram a chave armazenada
+                saved = {self._meta.get_field(name).attname for name in update_fields}
+                new_key = tuple(
+                    new if field in saved else old
+                    for field, old, new in zip(('user_id', 'category_id', 'status', 'priority'), old_key, new_key)
+                )
+
+            if old_key != new_key:
+                deltas = Counter({new_key: 1})
+                if old_key is not None:
+                    deltas[old_key] -= 1
+                apply_deltas(deltas)
+
+    def delete(self, *args, **kwargs):
+        from .counters import apply_deltas
+
+        with transaction.atomic(using=kwargs.get('using')):
+            key = self._stored_counter_key(kwargs.get('using'))
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            if key is not None:
+                apply_deltas(Counter({key: -1}))
+            DeletionLog.objects.create(user_id=self.user_id, model='task', object_id=pk)
+        return result
 
     @property
     def is_overdue(self):
         if self.due_date and self.status != 'completed':
             return self.due_date < timezone.now().date()
-        return False
\ No newline at end of file
+        return False
+
+class ArchivedTask(models.Model):
+    """Tarefa concluída movida da tasks_task pelo comando archive_tasks.
+
+    Mesmo id e mesmas colunas da Task, para que a restauração devolva a
+    tarefa como estava. Não entra nos contadores nem na sincronização.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    due_date = models.DateField(blank=True, null=True)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(blank=True, null=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archivedtask_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class TaskCounter(models.Model):
+    """Contadores desnormalizados de tarefas por usuário, categoria, status e prioridade"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category', 'status', 'priority'],
+                name='unique_task_counter',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'status', 'priority'],
+                condition=models.Q(category__isnull=True),
+                name='unique_uncategorized_task_counter',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}/{self.category_id}/{self.status}/{self.priority}: {self.count}"
+
+class DeletionLog(models.Model):
+    """Registro de exclusões (tombstones) usado pela sincronização incremental"""
+    MODEL_CHOICES = [
+        ('task', 'Task'),
+        ('category', 'Category'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='deletionlog_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_user_dashboard_stats(sender, instance, **kwargs):
+    invalidate_dashboard_stats(instance.user_id)
+
+@receiver(pre_delete, sender=Category)
+def move_deleted_category_counters(sender, instance, **kwargs):
+    from .counters import move_category_counters_to_uncategorized
+
+    move_category_counters_to_uncategorized(instance)
+
+@receiver(pre_delete, sender=Category)
+def touch_tasks_of_deleted_category(sender, instance, **kwargs):
+    # O SET_NULL não passa por save(); atualiza updated_at para a sincronização incremental
+    Task.objects.filter(category=instance).update(updated_at=timezone.now())
+
+def deleting_owner(origin):
+    """A exclusão começou pelo usuário (cascata): os tombstones dele também estão sendo apagados"""
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+@receiver(post_delete, sender=Category)
+def log_category_deletion(sender, instance, origin=None, **kwargs):
+    if deleting_owner(origin):
+        return
+    DeletionLog.objects.create(user_id=instance.user_id, model='category', object_id=instance.pk)
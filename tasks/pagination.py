@@ -0,0 +1,163 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+import binascii
+import json
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import ordering_keys
+from .models import Task
+
+
+def uses_cursor_pagination(request):
+    """A paginação por cursor é opcional: ?pagination=cursor ou um ?cursor= já emitido"""
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or 'cursor' in params
+
+
+def row_value(row, name):
+    if isinstance(row, dict):
+        return row[name]
+    return getattr(row, name)
+
+
+class TaskCursorPagination(BasePagination):
+    """Paginação keyset para /api/tasks/, sem COUNT(*) nem OFFSET.
+
+    O cursor é opaco (JSON em base64) e guarda a ordenação e os valores das
+    chaves da última linha da página; a próxima página é filtrada a partir
+    desses valores, então o custo não depende da profundidade.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = request.query_params.get('ordering', '-created_at')
+        self.keys = ordering_keys(self.ordering)
+        if self.keys is None:
+            raise ValidationError({'ordering': f"Ordering '{self.ordering}' is not supported with cursor pagination."})
+
+        values = self.decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, queryset.db))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_values = [row_value(rows[-1], name) for name, _ in self.keys] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_values))
+
+    def encode_cursor(self, values):
+        payload = {
+            'o': self.ordering,
+            'v': [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        }
+        return urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != self.ordering or len(payload['v']) != len(self.keys):
+                raise ValueError
+            return [
+                self.to_python(name, value)
+                for (name, _), value in zip(self.keys, payload['v'])
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, name, value):
+        if value is None:
+            return None
+        if name == 'priority_rank':
+            return int(value)
+        try:
+            return Task._meta.get_field(name).to_python(value)
+        except Exception:
+            raise ValueError(value)
+
+    def keyset_filter(self, values, using):
+        """Condição "depois da última linha" para chaves com direções e NULLs mistos.
+
+        Segue a ordenação de NULLs do banco (maiores no PostgreSQL, menores no SQLite)
+        para que os índices existentes continuem atendendo ao ORDER BY.
+        """
+        nulls_largest = connections[using].features.nulls_order_largest
+        terms = []
+        equal_so_far = Q()
+
+        for (name, descending), value in zip(self.keys, values):
+            after = self.after(name, descending, value, nulls_largest)
+            if after is not None:
+                terms.append(equal_so_far & after)
+            equal_so_far &= self.equal(name, value)
+
+        if not terms:
+            return Q(pk__in=[])
+
+        # Limite explícito na primeira chave para permitir busca por intervalo no índice
+        (name, descending), value = self.keys[0], values[0]
+        leading = self.equal(name, value)
+        after = self.after(name, descending, value, nulls_largest)
+        if after is not None:
+            leading |= after
+
+        return leading & reduce(or_, terms)
+
+    @staticmethod
+    def equal(name, value):
+        if value is None:
+            return Q(**{f'{name}__isnull': True})
+        return Q(**{name: value})
+
+    @staticmethod
+    def after(name, descending, value, nulls_largest):
+        """Linhas que vêm depois de value em uma única chave, ou None se não houver"""
+        # Em ordem crescente "depois" é maior; em decrescente, menor
+        wants_larger = not descending
+        if value is None:
+            # NULL é o maior (ou menor) valor possível
+            if wants_larger == nulls_largest:
+                return None
+            return Q(**{f'{name}__isnull': False})
+
+        after = Q(**{f'{name}__gt' if wants_larger else f'{name}__lt': value})
+        if wants_larger == nulls_largest:
+            after |= Q(**{f'{name}__isnull': True})
+        return after
@@ -0,0 +1,203 @@
+from datetime import timedelta
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from supertask.circuit import CircuitBreaker
+
+from .cache import seconds_until_midnight
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CACHE_KEY = 'daily_quote'
+
+FALLBACK_QUOTES = [
+    {
+        'quote': 'The only way to do great work is to love what you do.',
+        'author': 'Steve Jobs'
+    },
+    {
+        'quote': 'Success is not final, failure is not fatal: It is the courage to continue that counts.',
+        'author': 'Winston Churchill'
+    },
+    {
+        'quote': 'The future belongs to those who believe in the beauty of their dreams.',
+        'author': 'Eleanor Roosevelt'
+    }
+]
+
+
+class QuoteUnavailable(Exception):
+    pass
+
+
+def fallback_quote(today):
+    """Citação local do dia, a mesma para todas as requisições do dia"""
+    quote = dict(FALLBACK_QUOTES[today.toordinal() % len(FALLBACK_QUOTES)])
+    quote['source'] = 'fallback'
+    return quote
+
+
+def parse_quote(data):
+    """Extrai a citação da resposta do quotable.io (lista ou objeto)"""
+    if isinstance(data, list) and data:
+        data = data[0]
+    if not isinstance(data, dict) or not data.get('content') or not data.get('author'):
+        raise QuoteUnavailable('Unexpected quote payload')
+    return {
+        'quote': data['content'],
+        'author': data['author'],
+        'source': 'quotable_api',
+    }
+
+
+class QuoteProvider:
+    """Citação diária servida da memória, com atualização em segundo plano.
+
+    A requisição nunca espera pela API externa: uma citação válida é
+    retornada direto da memória do processo; uma expirada (outro dia ou TTL
+    vencido) continua sendo servida enquanto uma thread busca a nova
+    (stale-while-revalidate). Sem nenhuma citação ainda, serve a citação
+    local do dia. O cache do Django compartilha a citação entre workers, e
+    o circuit breaker evita bater na API enquanto ela estiver falhando.
+    """
+
+    def __init__(self, url=None, timeout=None, ttl=None, failure_threshold=None, reset_timeout=None):
+        self.url = url or settings.QUOTE_API_URL
+        self.timeout = timeout or settings.QUOTE_REQUEST_TIMEOUT
+        self.ttl = ttl or settings.QUOTE_CACHE_TIMEOUT
+        self.breaker = CircuitBreaker(
+            failure_threshold or settings.QUOTE_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout or settings.QUOTE_CIRCUIT_RESET_SECONDS,
+        )
+        self._entry = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get_quote(self):
+        today = timezone.localdate()
+        entry = self._entry
+        if entry is not None and self._is_fresh(entry, today):
+            return entry['quote']
+
+        # Outro worker pode já ter buscado a citação
+        entry = self._load_shared() or entry
+        if entry is not None and self._is_fresh(entry, today):
+            return entry['quote']
+
+        self.refresh_async()
+        if entry is not None:
+            return entry['quote']
+        return fallback_quote(today)
+
+    async def aget_quote(self):
+        """Versão assíncrona de get_quote; só consulta o cache compartilhado se a memória expirou"""
+        today = timezone.localdate()
+        entry = self._entry
+        if entry is not None and self._is_fresh(entry, today):
+            return entry['quote']
+
+        entry = await self._aload_shared() or entry
+        if entry is not None and self._is_fresh(entry, today):
+            return entry['quote']
+
+        self.refresh_async()
+        if entry is not None:
+            return entry['quote']
+        return fallback_quote(today)
+
+    def _is_fresh(self, entry, today):
+        return entry['day'] == today.isoformat() and timezone.now() < entry['expires_at']
+
+    def _load_shared(self):
+        try:
+            entry = cache.get(QUOTE_CACHE_KEY)
+        except Exception:
+            logger.exception("Falha ao ler a citação do cache")
+            return None
+        if entry is not None:
+            self._entry = entry
+        return entry
+
+    async def _aload_shared(self):
+        try:
+            entry = await cache.aget(QUOTE_CACHE_KEY)
+        except Exception:
+            logger.exception("Falha ao ler a citação do cache")
+            return None
+        if entry is not None:
+            self._entry = entry
+        return entry
+
+    def refresh_async(self):
+        """Dispara uma atualização em segundo plano, se nenhuma estiver em andamento"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+            if not self.breaker.allow():
+                return None
+            self._thread = threading.Thread(target=self.refresh, name='quote-refresh', daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def wait(self, timeout=None):
+        """Aguarda a atualização em segundo plano em andamento, se houver"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def refresh(self):
+        """Busca uma nova citação e a armazena; falhas alimentam o circuit breaker"""
+        try:
+            quote = self.fetch()
+        except Exception as exc:
+            self.breaker.record_failure()
+            logger.warning("Falha ao buscar a citação diária: %s", exc)
+            return None
+
+        self.breaker.record_success()
+        now = timezone.now()
+        timeout = min(self.ttl, seconds_until_midnight(now))
+        entry = {
+            'day': timezone.localdate(now).isoformat(),
+            'expires_at': now + timedelta(seconds=timeout),
+            'quote': quote,
+        }
+        self._entry = entry
+        try:
+            cache.set(QUOTE_CACHE_KEY, entry, timeout)
+        except Exception:
+            logger.exception("Falha ao gravar a citação no cache")
+        return quote
+
+    def fetch(self):
+        # Importado só na primeira busca, fora da inicialização dos workers
+        import requests
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_quote(response.json())
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_quote_provider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = QuoteProvider()
+        return _provider
+
+
+@receiver(setting_changed)
+def reset_quote_provider(setting=None, **kwargs):
+    global _provider
+    if setting is None or setting.startswith('QUOTE_'):
+        with _provider_lock:
+            _provider = None
@@ -0,0 +1,36 @@
+"""Renderizador JSON da listagem de tarefas com orjson, quando instalado.
+
+Gera os mesmos bytes que o JSONRenderer do DRF na configuração do projeto
+(compacto, UTF-8, com \\u2028 e \\u2029 escapados): datas e tipos que o orjson
+formataria de outro jeito passam pelo encoder do DRF, e o que ele não
+serializa (chaves não-string, inteiros grandes) ou a saída indentada usam o
+JSONRenderer.
+
+O orjson escreve floats em outra notação (0.00001 em vez de 1e-05), então
+este renderizador só é usado em respostas sem floats, como a listagem.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+class TaskJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
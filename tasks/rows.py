@@ -0,0 +1,112 @@
+"""Representação das tarefas a partir de ``.values()``, sem o TaskSerializer.
+
+Produz os mesmos dicionários (campos, ordem e formatos) que o TaskSerializer,
+lendo só as colunas necessárias, com o nome da categoria vindo do JOIN, e
+calculando ``is_overdue`` contra um único "hoje" em vez de um
+``timezone.now()`` por tarefa. Com ``fields`` (?fields=/?exclude=) só as
+colunas dos campos pedidos são lidas. Usado pela listagem de /api/tasks/ e
+pela exportação.
+"""
+from django.utils import timezone
+
+from supertask.timing import timed
+
+# Mesmas colunas (e formatos) do TaskSerializer
+TASK_FIELDS = [
+    'id', 'title', 'description', 'priority', 'status',
+    'due_date', 'category', 'category_name', 'is_overdue',
+    'created_at', 'updated_at', 'completed_at',
+]
+
+# Colunas lidas para cada campo da resposta
+TASK_FIELD_COLUMNS = {
+    'id': ['id'],
+    'title': ['title'],
+    'description': ['description'],
+    'priority': ['priority'],
+    'status': ['status'],
+    'due_date': ['due_date'],
+    'category': ['category_id'],
+    'category_name': ['category_id', 'category__name'],
+    'is_overdue': ['due_date', 'status'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at'],
+    'completed_at': ['completed_at'],
+}
+
+
+def task_columns(fields=None):
+    """Colunas necessárias para os campos (todos sem ``fields``), sempre com o id"""
+    columns = ['id']
+    for name in TASK_FIELDS if fields is None else fields:
+        columns.extend(TASK_FIELD_COLUMNS[name])
+    return list(dict.fromkeys(columns))
+
+
+def ordering_columns(queryset):
+    """Campos da Task no ORDER BY, que a paginação por cursor lê da última linha"""
+    names = [name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str)]
+    concrete = {field.name for field in queryset.model._meta.concrete_fields}
+    return [name for name in names if name in concrete]
+
+
+def overdue_today():
+    # Mesma data usada por Task.is_overdue
+    return timezone.now().date()
+
+
+def format_datetime(value, tz=None):
+    # Mesmo formato do DateTimeField do DRF: fuso atual e sufixo Z para UTC
+    if value is None:
+        return None
+    value = value.astimezone(tz or timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def task_values(queryset, fields=None):
+    """O queryset como dicionários com as colunas dos campos e as chaves da ordenação"""
+    # A paginação por cursor lê as chaves da última linha (ex.: created_at, priority_rank)
+    annotations = [name for name in ('priority_rank',) if name in queryset.query.annotations]
+    columns = task_columns(fields) + ordering_columns(queryset) + annotations
+    return queryset.values(*dict.fromkeys(columns))
+
+
+def task_data(row, today, tz, fields=None):
+    """Dicionário equivalente a TaskSerializer(task).data para uma linha de task_values.
+
+    ``today`` e ``tz`` (fuso atual) são lidos uma vez por requisição; com
+    ``fields``, só esses campos (as colunas não lidas valem None).
+    """
+    category_id = row.get('category_id')
+    due_date = row.get('due_date')
+    status = row.get('status')
+    data = {
+        'id': row['id'],
+        'title': row.get('title'),
+        'description': row.get('description'),
+        'priority': row.get('priority'),
+        'status': status,
+        'due_date': due_date.isoformat() if due_date else None,
+        'category': category_id,
+        'category_name': row.get('category__name'),
+        'is_overdue': bool(due_date and status != 'completed' and due_date < today),
+        'created_at': format_datetime(row.get('created_at'), tz),
+        'updated_at': format_datetime(row.get('updated_at'), tz),
+        'completed_at': format_datetime(row.get('completed_at'), tz),
+    }
+    if category_id is None:
+        # Como no TaskSerializer, category_name é omitido sem categoria
+        del data['category_name']
+    if fields is not None:
+        data = {name: data[name] for name in fields if name in data}
+    return data
+
+
+def tasks_data(rows, today=None, fields=None):
+    if today is None:
+        today = overdue_today()
+    tz = timezone.get_current_timezone()
+    with timed('serializer'):
+        return [task_data(row, today, tz, fields) for row in rows]
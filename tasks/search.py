@@ -0,0 +1,183 @@
+"""Busca textual (?q=) no título e na descrição das tarefas.
+
+- PostgreSQL: ``to_tsvector`` de título + descrição com o índice GIN de
+  expressão ``task_search_idx``, ordenado por ``ts_rank``.
+- SQLite: tabela virtual FTS5 ``tasks_task_fts`` (conteúdo externo da
+  tasks_task) mantida por triggers de INSERT/UPDATE/DELETE, o que cobre
+  também bulk_create, update() e exclusões em lote; ordenada por bm25.
+- Outros bancos: ``icontains`` por termo, sem relevância.
+
+Os termos são extraídos da busca (palavras, sem operadores) e todos precisam
+aparecer, como prefixo: "reun plan" encontra "Reunião de planejamento" no
+SQLite (que também ignora acentos) e "reunião plan" no PostgreSQL.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+SEARCH_CONFIG = 'simple'
+SEARCH_INDEX_NAME = 'task_search_idx'
+FTS_TABLE = 'tasks_task_fts'
+SEARCH_MIGRATION = '0006_task_search_index'
+MAX_TERMS = 8
+TITLE_WEIGHT = 4.0
+
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF title, description ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+
+def search_terms(query):
+    """Palavras da busca, em minúsculas; caracteres especiais nunca chegam ao banco como sintaxe"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def search_tasks(queryset, query):
+    """Filtra o queryset pelos termos da busca e adiciona ``search_rank`` (maior é mais relevante)"""
+    terms = search_terms(query or '')
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _postgresql_search(queryset, terms)
+    if vendor == 'sqlite':
+        return _sqlite_search(queryset, terms)
+
+    return contains_terms(queryset, terms).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def contains_terms(queryset, terms):
+    """Todos os termos no título ou na descrição, por icontains (sem índice nem relevância)"""
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition)
+
+
+def is_ranked(queryset):
+    """O queryset tem search_rank (anotação no PostgreSQL, select extra no SQLite)"""
+    return 'search_rank' in queryset.query.annotations or 'search_rank' in queryset.query.extra
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+    # O título pesa mais que a descrição na relevância
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def _postgresql_search(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    # Mesma expressão do índice task_search_idx, para que o planner o utilize
+    vector = search_vector()
+    query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+    return (
+        queryset.annotate(search_document=vector)
+        .filter(search_document=query)
+        .annotate(search_rank=SearchRank(vector, query))
+    )
+
+
+def _sqlite_search(queryset, terms):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    table = queryset.model._meta.db_table
+    # JOIN com a tabela FTS5 (sem model): o bm25 é calculado em uma única consulta
+    # full-text, em vez de uma subconsulta correlacionada por linha. O "+" impede
+    # o planner de consultar o FTS5 por rowid para cada tarefa do usuário: o
+    # MATCH dirige o JOIN e as tarefas são lidas pela chave primária
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'+{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        # bm25 é menor para os mais relevantes; o título pesa mais que a descrição
+        select={'search_rank': f'-bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0)'},
+    )
+
+
+def create_search_index(schema_editor, model):
+    """Cria o índice de busca do banco (GIN no PostgreSQL, FTS5 e triggers no SQLite)"""
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        schema_editor.add_index(model, GinIndex(search_vector(), name=SEARCH_INDEX_NAME))
+    elif connection.vendor == 'sqlite':
+        ensure_fts_index(connection)
+
+
+def drop_search_index(schema_editor, model):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def ensure_fts_index(connection):
+    """Cria a tabela FTS5 e os triggers que faltarem, reconstruindo o índice se algum faltava.
+
+    O SQLite recria a tabela tasks_task em algumas migrações (ALTER TABLE
+    emulado), o que apaga os triggers, e bancos criados sem migrações não
+    passam pela 0006; por isso isto também roda após cada migrate.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            (f'{FTS_TABLE}%',),
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in FTS_TRIGGERS if name not in existing]
+        if FTS_TABLE in existing and not missing:
+            return False
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"title, description, content='tasks_task', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def search_index_migrated(connection):
+    """A migração 0006 foi aplicada (ou o banco foi criado sem migrações, como nos testes)"""
+    applied = [name for app, name in MigrationRecorder(connection).applied_migrations() if app == 'tasks']
+    return not applied or max(applied) >= SEARCH_MIGRATION
+
+
+@receiver(post_migrate)
+def restore_fts_index(sender, app_config=None, using='default', **kwargs):
+    if app_config is None or app_config.label != 'tasks':
+        return
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and search_index_migrated(connection):
+        ensure_fts_index(connection)
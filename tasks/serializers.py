@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from supertask.timing import TimedRepresentationMixin
+from .counters import category_task_count
+from .fields import SparseFieldsSerializerMixin
 from .models import Task, Category
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     task_count = serializers.SerializerMethodField()
 
     class Meta:
@@ -9,13 +12,17 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'color', 'task_count', 'created_at', 'updated_at']
 
     def get_task_count(self, obj):
-        return obj.task_set.count()
+        # As views anotam task_total a partir dos contadores; fallback para uma consulta
+        task_total = getattr(obj, 'task_total', None)
+        if task_total is None:
+            return category_task_count(obj)
+        return task_total
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedRepresentationMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     is_overdue = serializers.ReadOnlyField()
     
@@ -32,11 +39,11 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
     def validate_category(self, value):
-        if value and value.user != self.context['request'].user:
+        if value and value.user_id != self.context['request'].user.pk:
             raise serializers.ValidationError("You can only assign tasks to your own categories.")
         return value
 
-class TaskCreateUpdateSerializer(serializers.ModelSerializer):
+class TaskCreateUpdateSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Serializer específico para criação e atualização de tasks"""
     category_name = serializers.CharField(write_only=True, required=False, allow_blank=True)
     category = serializers.PrimaryKeyRelatedField(read_only=True) 
@@ -112,7 +119,7 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             data['category_name'] = None
         return data
 
-class DashboardStatsSerializer(serializers.Serializer):
+class DashboardStatsSerializer(TimedRepresentationMixin, serializers.Serializer):
     """Serializer para estatísticas do dashboard"""
     completed = serializers.IntegerField()
     in_progress = serializers.IntegerField()
@@ -120,4 +127,33 @@ class DashboardStatsSerializer(serializers.Serializer):
     high_priority = serializers.IntegerField()
     due_today = serializers.IntegerField()
     total_tasks = serializers.IntegerField()
-    categories_stats = serializers.DictField()
\ No newline at end of file
+    categories_stats = serializers.DictField()
+
+class BulkTaskItemSerializer(serializers.ModelSerializer):
+    """Valida um item do endpoint em lote sem consultar o banco.
+
+    As categorias são resolvidas antes, em uma única consulta, e chegam em
+    context['categories'] (nome em minúsculas -> Category).
+    """
+    category_name = serializers.CharField(write_only=True, required=False, allow_blank=True)
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'priority', 'status', 'due_date', 'category_name']
+
+    def validate_category_name(self, value):
+        """Retorna a Category correspondente, ou None para remover a categoria"""
+        if not value:
+            return None
+
+        category = self.context['categories'].get(value.lower().strip())
+        if category is None:
+            raise serializers.ValidationError(f"Categoria '{value}' não encontrada.")
+        return category
+
+class ImportTaskItemSerializer(BulkTaskItemSerializer):
+    """Valida uma linha da importação; as categorias são resolvidas (ou criadas) pelo importador"""
+    category_name = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+    def validate_category_name(self, value):
+        return value.strip() or None
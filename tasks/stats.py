@@ -0,0 +1,128 @@
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import (
+    aget_cached_dashboard_stats,
+    aset_cached_dashboard_stats,
+    get_cached_dashboard_stats,
+    set_cached_dashboard_stats,
+)
+from .models import Task, Category, TaskCounter
+
+
+def _dashboard_queries(user, today):
+    """As três consultas do dashboard: contadores, vencimentos e categorias"""
+    counters = (
+        TaskCounter.objects.filter(user=user)
+        .values('status', 'priority')
+        .annotate(total=Sum('count'))
+    )
+    due = (
+        Task.objects.filter(user=user, due_date__lte=today)
+        .exclude(status='completed')
+    )
+    due_aggregates = {
+        'overdue': Count('id', filter=Q(due_date__lt=today)),
+        'due_today': Count('id', filter=Q(due_date=today)),
+    }
+    categories = (
+        Category.objects.filter(user=user)
+        .annotate(
+            total=Coalesce(Sum('taskcounter__count'), 0),
+            completed=Coalesce(
+                Sum('taskcounter__count', filter=Q(taskcounter__status='completed')), 0
+            ),
+        )
+        .values_list('name', 'total', 'completed')
+    )
+    return counters, due, due_aggregates, categories
+
+
+def _build_dashboard_stats(counters, due, categories):
+    totals = {
+        'completed': 0,
+        'in_progress': 0,
+        'high_priority': 0,
+        'total_tasks': 0,
+    }
+    for row in counters:
+        totals['total_tasks'] += row['total']
+        if row['status'] == 'completed':
+            totals['completed'] += row['total']
+        elif row['priority'] == 'high':
+            totals['high_priority'] += row['total']
+        if row['status'] == 'in_progress':
+            totals['in_progress'] += row['total']
+
+    categories_stats = {
+        name: {
+            'total': total,
+            'completed': completed,
+            'pending': total - completed,
+        }
+        for name, total, completed in categories
+    }
+
+    return {
+        'completed': totals['completed'],
+        'in_progress': totals['in_progress'],
+        'overdue': due['overdue'],
+        'high_priority': totals['high_priority'],
+        'due_today': due['due_today'],
+        'total_tasks': totals['total_tasks'],
+        'categories_stats': categories_stats,
+    }
+
+
+def compute_dashboard_stats(user, today=None):
+    """Calcula o payload completo do dashboard a partir dos contadores materializados.
+
+    Os totais por status/prioridade e por categoria vêm de ``TaskCounter``; apenas
+    os campos que dependem da data (``overdue`` e ``due_today``) consultam as
+    tarefas ainda não concluídas com vencimento até hoje.
+    """
+    if today is None:
+        today = timezone.localdate()
+
+    counters, due, due_aggregates, categories = _dashboard_queries(user, today)
+    return _build_dashboard_stats(list(counters), due.aggregate(**due_aggregates), list(categories))
+
+
+async def acompute_dashboard_stats(user, today=None):
+    """Versão assíncrona de compute_dashboard_stats (ORM assíncrono)"""
+    if today is None:
+        today = timezone.localdate()
+
+    counters, due, due_aggregates, categories = _dashboard_queries(user, today)
+    return _build_dashboard_stats(
+        [row async for row in counters],
+        await due.aaggregate(**due_aggregates),
+        [row async for row in categories],
+    )
+
+
+def get_dashboard_stats(user, store=True):
+    """Retorna as estatísticas do dashboard usando o cache por usuário.
+
+    Com ``store=False`` (leitura em uma réplica) um cache vazio não é
+    preenchido: dados de uma réplica atrasada ficariam no cache, já
+    invalidado pela escrita, por todo o DASHBOARD_STATS_CACHE_TIMEOUT.
+    """
+    today = timezone.localdate()
+    data = get_cached_dashboard_stats(user.pk, today)
+    if data is None:
+        data = compute_dashboard_stats(user, today)
+        if store:
+            set_cached_dashboard_stats(user.pk, today, data)
+    return data
+
+
+async def aget_dashboard_stats(user, store=True):
+    today = timezone.localdate()
+    data = await aget_cached_dashboard_stats(user.pk, today)
+    if data is None:
+        data = await acompute_dashboard_stats(user, today)
+        if store:
+            await aset_cached_dashboard_stats(user.pk, today, data)
+    return data
@@ -0,0 +1,147 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta, timezone as dt_timezone
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Task, Category, DeletionLog
+
+TOMBSTONE_KEYS = {'task': 'tasks', 'category': 'categories'}
+
+
+class SyncState:
+    """Posição de uma sincronização incremental.
+
+    ``since`` é o limite inferior (exclusivo) de updated_at/deleted_at,
+    ``watermark`` o instante do servidor em que a sincronização começou
+    (limite superior de todas as páginas) e ``after`` a chave
+    (updated_at, id) da última tarefa enviada, quando há mais páginas.
+    O watermark só vai no token durante a paginação.
+    """
+
+    def __init__(self, since=None, watermark=None, after=None):
+        self.since = since
+        self.watermark = watermark or timezone.now()
+        self.after = after
+
+    @property
+    def first_page(self):
+        return self.after is None
+
+    def encode(self):
+        payload = {'s': self.since.isoformat() if self.since else None}
+        if self.after is not None:
+            payload['w'] = self.watermark.isoformat()
+            payload['a'] = [self.after[0].isoformat(), self.after[1]]
+        return urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode('ascii')
+
+    @classmethod
+    def decode(cls, token):
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode('ascii')))
+            since = _parse(payload['s']) if payload['s'] else None
+            if 'a' not in payload:
+                # Nova sincronização: o watermark é o instante atual
+                return cls(since)
+            after = (_parse(payload['a'][0]), int(payload['a'][1]))
+            return cls(since, _parse(payload['w']), after)
+        except (TypeError, ValueError, KeyError, IndexError, UnicodeEncodeError, binascii.Error):
+            raise ValidationError({'since': ['Invalid sync token.']})
+
+
+def _parse(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def parse_since(value):
+    """Aceita o token opaco devolvido em next_since ou um datetime ISO 8601"""
+    if not value:
+        return SyncState()
+    try:
+        return SyncState(since=_parse(value))
+    except ValueError:
+        return SyncState.decode(value)
+
+
+def sync_changes(user, state, limit=None):
+    """Monta uma página de alterações do usuário desde ``state.since``.
+
+    As tarefas são percorridas em ordem (updated_at, id) pelo índice
+    (user, updated_at) e limitadas ao watermark, então alterações feitas
+    durante a paginação ficam para a próxima sincronização. Categorias e
+    tombstones são enviados apenas na primeira página. Se ``since`` for mais
+    antigo que a retenção dos tombstones, a resposta é uma sincronização
+    completa com ``reset`` verdadeiro.
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    reset = False
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if state.since is not None and state.since < state.watermark - retention:
+        state = SyncState(watermark=state.watermark, after=state.after)
+        reset = True
+
+    window = Q(updated_at__lte=state.watermark)
+    if state.since is not None:
+        window &= Q(updated_at__gt=state.since)
+
+    tasks = Task.objects.filter(window, user=user).select_related('category')
+    if state.after is not None:
+        updated_at, pk = state.after
+        tasks = tasks.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+    tasks = list(tasks.order_by('updated_at', 'id')[:limit + 1])
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    categories = Category.objects.none()
+    deleted = {'tasks': [], 'categories': []}
+    if state.first_page:
+        categories = (
+            Category.objects.filter(window, user=user)
+            .annotate(task_total=Coalesce(Sum('taskcounter__count'), 0))
+            .order_by('updated_at', 'id')
+        )
+        if state.since is not None:
+            tombstones = DeletionLog.objects.filter(
+                user=user,
+                deleted_at__gt=state.since,
+                deleted_at__lte=state.watermark,
+            ).values_list('model', 'object_id')
+            for model, object_id in tombstones:
+                deleted[TOMBSTONE_KEYS[model]].append(object_id)
+
+    if has_more:
+        last = tasks[-1]
+        next_state = SyncState(state.since, state.watermark, (last.updated_at, last.pk))
+    else:
+        # Sobreposição para não perder escritas de transações que ainda não
+        # tinham sido confirmadas quando o watermark foi lido
+        overlap = timedelta(seconds=settings.SYNC_WATERMARK_OVERLAP_SECONDS)
+        next_state = SyncState(state.watermark - overlap)
+
+    return {
+        'tasks': tasks,
+        'categories': categories,
+        'deleted': deleted,
+        'has_more': has_more,
+        'reset': reset,
+        'next_since': next_state.encode(),
+    }
+
+
+def prune_deletion_log(before=None):
+    """Remove tombstones mais antigos que a retenção; retorna quantos foram excluídos"""
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = DeletionLog.objects.filter(deleted_at__lt=before).delete()
+    return deleted
@@ -1,12 +1,138 @@
-from django.test import TestCase
+from django.apps import apps
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
-from django.urls import reverse
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from django.utils import timezone
-from rest_framework.test import APITestCase
+from django.utils.http import http_date
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
-from datetime import date, timedelta
+from rest_framework.serializers import ListSerializer, Serializer
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
 from unittest.mock import patch
-from .models import Task, Category
+from zoneinfo import ZoneInfo
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import RefreshToken
+import asyncio
+import csv
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .archive import archive_batch
+from .models import ArchivedTask, Task, TaskQuerySet, Category, DeletionLog, TaskCounter
+from .cache import dashboard_stats_key, seconds_until_midnight
+from .counters import verify_counters
+from .export import EXPORT_FORMATS
+from .rows import overdue_today
+from .serializers import TaskSerializer
+from .quotes import QuoteProvider, get_quote_provider
+from .search import restore_fts_index
+from supertask.instrumentation import RequestMetricsMiddleware, registry, should_log
+
+
+class QueryCountGuardClient(APIClient):
+    """APIClient que falha o teste se as queries de um GET crescerem com o tamanho do resultado.
+
+    Cada GET registra (tamanho do resultado, número de queries) por endpoint e
+    conjunto de parâmetros; um resultado maior com mais queries indica N+1.
+    """
+    samples = None
+
+    def get(self, path, data=None, follow=False, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = super().get(path, data, follow, **extra)
+        if self.samples is not None:
+            self.record(path, data, response, len(queries))
+        return response
+
+    def record(self, path, data, response, query_count):
+        results = getattr(response, 'data', None)
+        if isinstance(results, dict):
+            results = results.get('results')
+        if not isinstance(results, list) or not results:
+            return
+
+        url = urlparse(path)
+        params = set(parse_qs(url.query)) | set(data or {})
+        key = (resolve(url.path).url_name, frozenset(params - {'page', 'cursor'}))
+        size = len(results)
+
+        for other_size, other_count in self.samples[key]:
+            if (size - other_size) * (query_count - other_count) > 0:
+                raise AssertionError(
+                    f"{key[0]} {sorted(key[1])}: {query_count} queries para {size} resultados, "
+                    f"mas {other_count} queries para {other_size} resultados (N+1?)"
+                )
+        self.samples[key].append((size, query_count))
+
+
+class QueryCountGuardTestCase(APITestCase):
+    """APITestCase cujos GETs são verificados pelo QueryCountGuardClient"""
+    client_class = QueryCountGuardClient
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.query_count_samples = defaultdict(list)
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        self.client.samples = self.query_count_samples
+
+
+class QuoteStubServer:
+    """Servidor HTTP local no lugar do quotable.io nos testes da citação diária"""
+
+    def __init__(self, status=200, payload=None):
+        self.status = status
+        self.payload = payload or [{'content': 'Test quote', 'author': 'Test Author'}]
+        self.hits = 0
+        # Liberado por padrão; limpar o evento segura as respostas
+        self.release = threading.Event()
+        self.release.set()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                stub.release.wait(5)
+                body = json.dumps(stub.payload).encode()
+                self.send_response(stub.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/quotes/random'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
 
 
 class CategoryModelTest(TestCase):
@@ -133,7 +259,7 @@ class TaskModelTest(TestCase):
         self.assertFalse(completed_task.is_overdue)
 
 
-class CategoryAPITest(APITestCase):
+class CategoryAPITest(QueryCountGuardTestCase):
     """Testes para os endpoints de categorias"""
     
     def setUp(self):
@@ -239,7 +365,7 @@ class CategoryAPITest(APITestCase):
         self.assertEqual(response.data['results'][0]['name'], 'Work')
 
 
-class TaskAPITest(APITestCase):
+class TaskAPITest(QueryCountGuardTestCase):
     """Testes para os endpoints de tarefas"""
     
     def setUp(self):
@@ -463,6 +589,42 @@ class TaskAPITest(APITestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['status'], 'pending')
     
+    def test_list_query_count_does_not_grow(self):
+        """Testa se a listagem não faz uma consulta extra por tarefa (categoria no mesmo SELECT)"""
+        orderings = ['-created_at', 'due_date', 'priority']
+        for ordering in orderings:
+            response = self.client.get(self.task_list_url, {'ordering': ordering})
+            self.assertEqual(len(response.data['results']), 1)
+
+        for i in range(15):
+            Task.objects.create(title=f'Task {i}', category=self.category, user=self.user)
+
+        # O QueryCountGuardClient falha se a página maior fizer mais consultas
+        for ordering in orderings:
+            response = self.client.get(self.task_list_url, {'ordering': ordering})
+            self.assertEqual(len(response.data['results']), 16)
+            self.assertEqual(response.data['results'][0]['category_name'], 'Work')
+
+    def test_filter_tasks_overdue(self):
+        """Testa filtro de tarefas vencidas (exclui concluídas)"""
+        Task.objects.create(
+            title='Overdue Task',
+            due_date=date.today() - timedelta(days=1),
+            user=self.user
+        )
+        Task.objects.create(
+            title='Completed Overdue Task',
+            status='completed',
+            due_date=date.today() - timedelta(days=1),
+            user=self.user
+        )
+
+        response = self.client.get(self.task_list_url, {'due_date': 'overdue'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Overdue Task')
+    
     def test_user_can_only_see_own_tasks(self):
         """Testa se usuário só vê suas próprias tarefas"""
         # Cria tarefa para outro usuário
@@ -478,10 +640,11 @@ class TaskAPITest(APITestCase):
         self.assertEqual(response.data['results'][0]['title'], 'Test Task')
 
 
-class DashboardAPITest(APITestCase):
+class DashboardAPITest(QueryCountGuardTestCase):
     """Testes para os endpoints do dashboard"""
     
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
@@ -547,35 +710,66 @@ class DashboardAPITest(APITestCase):
         # Verifica estatísticas por categoria
         self.assertIn('categories_stats', response.data)
         self.assertIn('Work', response.data['categories_stats'])
-    
-    @patch('tasks.views.requests.get')
-    def test_daily_quote_success(self, mock_get):
+
+    def test_dashboard_categories_stats_values(self):
+        """Testa os contadores por categoria, incluindo categorias vazias"""
+        Category.objects.create(name='Empty', user=self.user)
+        Task.objects.create(
+            title='Pending Work Task',
+            status='pending',
+            category=self.category,
+            user=self.user
+        )
+
+        response = self.client.get(self.stats_url)
+
+        self.assertEqual(
+            response.data['categories_stats']['Work'],
+            {'total': 2, 'completed': 1, 'pending': 1}
+        )
+        self.assertEqual(
+            response.data['categories_stats']['Empty'],
+            {'total': 0, 'completed': 0, 'pending': 0}
+        )
+
+    def test_dashboard_stats_query_count_is_constant(self):
+        """Testa se o número de queries não cresce com o número de categorias"""
+        for i in range(50):
+            category = Category.objects.create(name=f'Category {i}', user=self.user)
+            Task.objects.create(title=f'Task {i}', category=category, user=self.user)
+
+        # Validadores do GET condicional, contadores, tarefas com vencimento até hoje e categorias
+        with self.assertNumQueries(4):
+            response = self.client.get(self.stats_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['categories_stats']), 51)
+        self.assertEqual(response.data['total_tasks'], 54)
+
+    def test_daily_quote_success(self):
         """Testa endpoint de citação diária com sucesso da API externa"""
-        # Mock da resposta da API externa
-        mock_response = mock_get.return_value
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'content': 'Test quote',
-            'author': 'Test Author'
-        }
-        
-        response = self.client.get(self.quote_url)
-        
+        with QuoteStubServer() as stub, self.settings(QUOTE_API_URL=stub.url):
+            # A primeira requisição não espera pela API e dispara a atualização
+            self.client.get(self.quote_url)
+            get_quote_provider().wait(5)
+            response = self.client.get(self.quote_url)
+
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['quote'], 'Test quote')
         self.assertEqual(response.data['author'], 'Test Author')
-    
-    @patch('tasks.views.requests.get')
-    def test_daily_quote_fallback(self, mock_get):
+        self.assertEqual(response.data['source'], 'quotable_api')
+
+    def test_daily_quote_fallback(self):
         """Testa endpoint de citação diária com fallback"""
-        # Mock de falha na API externa
-        mock_get.side_effect = Exception('API Error')
-        
-        response = self.client.get(self.quote_url)
-        
+        with QuoteStubServer(status=500) as stub, self.settings(QUOTE_API_URL=stub.url):
+            self.client.get(self.quote_url)
+            get_quote_provider().wait(5)
+            response = self.client.get(self.quote_url)
+
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('quote', response.data)
         self.assertIn('author', response.data)
+        self.assertEqual(response.data['source'], 'fallback')
         # ✅ Lista atualizada com todos os autores de fallback
         fallback_authors = [
             'Steve Jobs', 'Winston Churchill', 'Eleanor Roosevelt',
@@ -593,4 +787,1997 @@ class DashboardAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         
         response = self.client.get(self.quote_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DashboardStatsCacheTest(QueryCountGuardTestCase):
+    """Testes para o cache das estatísticas do dashboard"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(
+            name='Work',
+            user=self.user
+        )
+        self.task = Task.objects.create(
+            title='Cached Task',
+            status='pending',
+            category=self.category,
+            user=self.user
+        )
+        self.stats_url = reverse('dashboard-stats')
+        self.client.force_authenticate(user=self.user)
+
+    def test_second_request_is_served_from_cache(self):
+        """Testa se a segunda requisição só consulta os validadores do GET condicional"""
+        self.client.get(self.stats_url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.stats_url)
+
+        self.assertEqual(response.data['total_tasks'], 1)
+
+    def test_cache_is_per_user(self):
+        """Testa se cada usuário tem sua própria entrada no cache"""
+        self.client.get(self.stats_url)
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(self.stats_url)
+
+        self.assertEqual(response.data['total_tasks'], 0)
+
+    def test_task_save_invalidates_cache(self):
+        """Testa se criar e alterar tarefas invalida o cache"""
+        self.client.get(self.stats_url)
+        Task.objects.create(title='New Task', user=self.user)
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['total_tasks'], 2)
+
+        self.task.status = 'in_progress'
+        self.task.save()
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['in_progress'], 1)
+
+    def test_toggle_status_invalidates_cache(self):
+        """Testa se alternar o status da tarefa invalida o cache"""
+        self.client.get(self.stats_url)
+
+        self.client.patch(reverse('toggle-task-status', kwargs={'pk': self.task.pk}))
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['completed'], 1)
+        self.assertEqual(response.data['categories_stats']['Work']['completed'], 1)
+
+    def test_task_delete_invalidates_cache(self):
+        """Testa se excluir uma tarefa invalida o cache"""
+        self.client.get(self.stats_url)
+
+        self.task.delete()
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['total_tasks'], 0)
+
+    def test_category_delete_invalidates_cache(self):
+        """Testa se excluir uma categoria (SET_NULL nas tarefas) invalida o cache"""
+        self.client.get(self.stats_url)
+
+        self.client.delete(reverse('category-detail', kwargs={'pk': self.category.pk}))
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['categories_stats'], {})
+        self.assertEqual(response.data['total_tasks'], 1)
+
+    def test_stats_roll_over_at_local_midnight(self):
+        """Testa se overdue/due_today mudam à meia-noite de America/Sao_Paulo"""
+        sao_paulo = ZoneInfo('America/Sao_Paulo')
+        before_midnight = datetime(2025, 3, 10, 23, 59, tzinfo=sao_paulo)
+        after_midnight = datetime(2025, 3, 11, 0, 1, tzinfo=sao_paulo)
+        self.task.due_date = date(2025, 3, 10)
+        self.task.save()
+
+        with patch('django.utils.timezone.now', return_value=before_midnight):
+            response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['due_today'], 1)
+        self.assertEqual(response.data['overdue'], 0)
+
+        with patch('django.utils.timezone.now', return_value=after_midnight):
+            response = self.client.get(self.stats_url)
+        self.assertEqual(response.data['due_today'], 0)
+        self.assertEqual(response.data['overdue'], 1)
+
+    def test_cache_expires_at_local_midnight(self):
+        """Testa o cálculo do tempo restante até a meia-noite local"""
+        now = datetime(2025, 3, 10, 23, 0, tzinfo=ZoneInfo('America/Sao_Paulo'))
+
+        self.assertEqual(seconds_until_midnight(now), 3600)
+
+    def test_cache_entry_is_keyed_per_user(self):
+        """Testa a chave do cache por usuário"""
+        self.client.get(self.stats_url)
+
+        self.assertIsNotNone(cache.get(dashboard_stats_key(self.user.pk)))
+
+
+class TaskCounterTest(TestCase):
+    """Testes para os contadores materializados de tarefas"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.work = Category.objects.create(name='Work', user=self.user)
+        self.home = Category.objects.create(name='Home', user=self.user)
+        self.task = Task.objects.create(
+            title='Counted Task',
+            priority='high',
+            category=self.work,
+            user=self.user
+        )
+
+    def counter(self, category, status, priority):
+        counter = TaskCounter.objects.filter(
+            user=self.user, category=category, status=status, priority=priority
+        ).first()
+        return counter.count if counter else 0
+
+    def test_create_increments_counter(self):
+        """Testa se criar uma tarefa incrementa o contador"""
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_status_change_moves_counter(self):
+        """Testa se mudar o status move a contagem entre contadores"""
+        self.task.status = 'completed'
+        self.task.save()
+
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 0)
+        self.assertEqual(self.counter(self.work, 'completed', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_stale_instances_apply_delta_once(self):
+        """Testa se duas cópias carregadas antes de qualquer save não aplicam o delta duas vezes"""
+        first = Task.objects.get(pk=self.task.pk)
+        second = Task.objects.get(pk=self.task.pk)
+        first.status = 'completed'
+        first.save()
+        second.status = 'completed'
+        second.save()
+
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 0)
+        self.assertEqual(self.counter(self.work, 'completed', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+        # Excluir uma cópia de uma tarefa já excluída não decrementa de novo
+        stale = Task.objects.get(pk=self.task.pk)
+        Task.objects.get(pk=self.task.pk).delete()
+        stale.delete()
+        self.assertEqual(verify_counters(), {})
+
+    def test_stale_instance_save_restores_its_key(self):
+        """Testa se salvar uma cópia desatualizada move a contagem a partir do que está no banco"""
+        stale = Task.objects.get(pk=self.task.pk)
+        fresh = Task.objects.get(pk=self.task.pk)
+        fresh.status = 'completed'
+        fresh.save()
+
+        stale.title = 'Renamed'
+        stale.save()
+
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, 'pending')
+        self.assertEqual(verify_counters(), {})
+
+    def test_category_reassignment_moves_counter(self):
+        """Testa se trocar a categoria move a contagem"""
+        task = Task.objects.get(pk=self.task.pk)
+        task.category = self.home
+        task.save()
+
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 0)
+        self.assertEqual(self.counter(self.home, 'pending', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_delete_decrements_counter(self):
+        """Testa se excluir a tarefa decrementa o contador"""
+        self.task.delete()
+
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 0)
+        self.assertEqual(verify_counters(), {})
+
+    def test_category_delete_moves_counters_to_uncategorized(self):
+        """Testa se excluir a categoria (SET_NULL) move os contadores para 'sem categoria'"""
+        self.work.delete()
+
+        self.assertEqual(self.counter(None, 'pending', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_bulk_operations_keep_counters_consistent(self):
+        """Testa bulk_create, update, bulk_update e delete em lote"""
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Bulk {i}', category=self.home, user=self.user)
+            for i in range(5)
+        ])
+        self.assertEqual(self.counter(self.home, 'pending', 'medium'), 5)
+
+        Task.objects.filter(category=self.home).update(status='in_progress')
+        self.assertEqual(self.counter(self.home, 'in_progress', 'medium'), 5)
+
+        for task in tasks[:2]:
+            task.priority = 'low'
+        Task.objects.bulk_update(tasks[:2], ['priority'])
+        self.assertEqual(self.counter(self.home, 'in_progress', 'low'), 2)
+
+        Task.objects.filter(category=self.home).delete()
+        self.assertEqual(self.counter(self.home, 'in_progress', 'medium'), 0)
+        self.assertEqual(verify_counters(), {})
+
+    def test_save_with_update_fields(self):
+        """Testa se update_fields considera apenas os campos gravados"""
+        self.task.status = 'completed'
+        self.task.priority = 'low'
+        self.task.save(update_fields=['priority'])
+
+        self.assertEqual(self.counter(self.work, 'pending', 'low'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_rebuild_command_fixes_counters(self):
+        """Testa se o comando reconstrói contadores divergentes"""
+        TaskCounter.objects.update(count=42)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_counters', '--verify', stdout=StringIO(), stderr=StringIO())
+
+        call_command('rebuild_task_counters', stdout=StringIO())
+        self.assertEqual(self.counter(self.work, 'pending', 'high'), 1)
+        self.assertEqual(verify_counters(), {})
+
+    def test_category_list_reads_counters(self):
+        """Testa se a listagem de categorias não faz uma consulta por categoria"""
+        for i in range(10):
+            category = Category.objects.create(name=f'Category {i}', user=self.user)
+            Task.objects.create(title=f'Task {i}', category=category, user=self.user)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        # Validadores, contagem da paginação e a página anotada com os contadores
+        with self.assertNumQueries(3):
+            response = client.get(reverse('category-list-create'))
+
+        counts = {item['name']: item['task_count'] for item in response.data['results']}
+        self.assertEqual(counts['Work'], 1)
+        self.assertEqual(counts['Home'], 0)
+        self.assertEqual(counts['Category 3'], 1)
+
+
+class TaskCursorPaginationTest(QueryCountGuardTestCase):
+    """Testes para a paginação por cursor (keyset) de /api/tasks/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.task_list_url = reverse('task-list-create')
+        priorities = ['low', 'medium', 'high']
+        base = timezone.now()
+        for i in range(45):
+            task = Task.objects.create(
+                title=f'Task {i % 7}',
+                priority=priorities[i % 3],
+                due_date=date.today() + timedelta(days=i % 4) if i % 5 else None,
+                user=self.user
+            )
+            # Vários created_at repetidos para exercitar o desempate por id
+            Task.objects.filter(pk=task.pk).update(created_at=base - timedelta(minutes=i // 3))
+        self.client.force_authenticate(user=self.user)
+
+    def walk(self, params):
+        ids = []
+        response = self.client.get(self.task_list_url, {**params, 'pagination': 'cursor'})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def expected_ids(self, params):
+        ids = []
+        page = 1
+        while True:
+            response = self.client.get(self.task_list_url, {**params, 'page': page})
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            page += 1
+
+    def test_cursor_pagination_matches_each_ordering(self):
+        """Testa se o cursor percorre todas as tarefas na mesma ordem da paginação por página"""
+        for ordering in ['-created_at', 'due_date', 'priority', '-due_date', 'title', 'created_at']:
+            with self.subTest(ordering=ordering):
+                ids = self.walk({'ordering': ordering})
+                self.assertEqual(len(ids), 45)
+                self.assertEqual(len(set(ids)), 45)
+                self.assertEqual(ids, self.expected_ids({'ordering': ordering}))
+
+    def test_cursor_pagination_with_filters(self):
+        """Testa o cursor combinado com filtros"""
+        ids = self.walk({'priority': 'high', 'ordering': 'due_date'})
+
+        self.assertEqual(ids, self.expected_ids({'priority': 'high', 'ordering': 'due_date'}))
+        self.assertEqual(len(ids), 15)
+
+    def test_cursor_pagination_does_not_count(self):
+        """Testa se a paginação por cursor não executa COUNT nem OFFSET"""
+        first = self.client.get(self.task_list_url, {'pagination': 'cursor'})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+
+        # A primeira query é a dos validadores do GET condicional
+        sql = ' '.join(query['sql'] for query in queries[1:]).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_invalid_cursor(self):
+        """Testa se um cursor inválido ou de outra ordenação retorna 404"""
+        response = self.client.get(self.task_list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        first = self.client.get(self.task_list_url, {'pagination': 'cursor'})
+        cursor = parse_qs(urlparse(first.data['next']).query)['cursor'][0]
+        response = self.client.get(self.task_list_url, {'cursor': cursor, 'ordering': 'priority'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskBulkAPITest(QueryCountGuardTestCase):
+    """Testes para o endpoint de operações em lote"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.task = Task.objects.create(title='Existing Task', user=self.user)
+        self.other_task = Task.objects.create(title='Other Task', user=self.other_user)
+        self.bulk_url = reverse('task-bulk')
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, operations):
+        return self.client.post(self.bulk_url, {'operations': operations}, format='json')
+
+    def test_bulk_create_update_delete(self):
+        """Testa criação, atualização e exclusão na mesma requisição"""
+        doomed = Task.objects.create(title='Doomed Task', user=self.user)
+
+        response = self.post([
+            {'op': 'create', 'data': {'title': 'Created', 'category_name': 'WORK', 'status': 'completed'}},
+            {'op': 'update', 'id': self.task.pk, 'data': {'status': 'in_progress', 'category_name': 'work'}},
+            {'op': 'delete', 'id': doomed.pk},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (response.data['created'], response.data['updated'], response.data['deleted'], response.data['errors']),
+            (1, 1, 1, 0)
+        )
+        created = Task.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual(created.category, self.category)
+        self.assertIsNotNone(created.completed_at)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'in_progress')
+        self.assertEqual(self.task.category, self.category)
+        self.assertFalse(Task.objects.filter(pk=doomed.pk).exists())
+        self.assertEqual(verify_counters(), {})
+
+    def test_bulk_update_preserves_completed_at_semantics(self):
+        """Testa se completed_at é definido ao concluir e limpo ao reabrir"""
+        previous_updated_at = self.task.updated_at
+
+        self.post([{'op': 'update', 'id': self.task.pk, 'data': {'status': 'completed'}}])
+        self.task.refresh_from_db()
+        self.assertIsNotNone(self.task.completed_at)
+        self.assertGreater(self.task.updated_at, previous_updated_at)
+
+        self.post([{'op': 'update', 'id': self.task.pk, 'data': {'status': 'pending'}}])
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.completed_at)
+
+    def test_bulk_reports_per_item_errors(self):
+        """Testa se itens inválidos são reportados sem impedir os demais"""
+        response = self.post([
+            {'op': 'create', 'data': {'title': 'Valid'}},
+            {'op': 'create', 'data': {'title': 'Bad Category', 'category_name': 'nonexistent'}},
+            {'op': 'create', 'data': {'priority': 'urgent'}},
+            {'op': 'update', 'id': self.other_task.pk, 'data': {'title': 'Hijack'}},
+            {'op': 'delete', 'id': 'abc'},
+            {'op': 'archive', 'id': self.task.pk},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertIn('category_name', results[1]['errors'])
+        self.assertIn('title', results[2]['errors'])
+        self.assertIn('priority', results[2]['errors'])
+        self.assertEqual(results[3]['errors'], {'id': ['Not found.']})
+        self.assertIn('id', results[4]['errors'])
+        self.assertIn('op', results[5]['errors'])
+        self.assertEqual(response.data['errors'], 5)
+
+        self.other_task.refresh_from_db()
+        self.assertEqual(self.other_task.title, 'Other Task')
+
+    def test_bulk_query_count_does_not_grow(self):
+        """Testa se o número de queries não depende do número de operações"""
+        def operations(count):
+            tasks = Task.objects.bulk_create(
+                Task(title=f'Task {i}', user=self.user) for i in range(count)
+            )
+            return (
+                [{'op': 'create', 'data': {'title': f'New {i}', 'category_name': 'work'}} for i in range(count)]
+                + [{'op': 'update', 'id': task.pk, 'data': {'status': 'completed'}} for task in tasks]
+            )
+
+        small, large = operations(2), operations(40)
+        with CaptureQueriesContext(connection) as small_queries:
+            self.post(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            response = self.post(large)
+
+        self.assertEqual(response.data['created'], 40)
+        self.assertEqual(response.data['updated'], 40)
+        # A primeira requisição ainda cria as linhas de contadores
+        self.assertLessEqual(len(large_queries), len(small_queries))
+        self.assertEqual(verify_counters(), {})
+
+    def test_bulk_rejects_invalid_payload(self):
+        """Testa payload sem lista de operações ou acima do limite"""
+        response = self.client.post(self.bulk_url, {'operations': 'nope'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(TASK_BULK_MAX_OPERATIONS=1):
+            response = self.post([{'op': 'delete', 'id': 1}, {'op': 'delete', 'id': 2}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(SYNC_WATERMARK_OVERLAP_SECONDS=0)
+class SyncAPITest(QueryCountGuardTestCase):
+    """Testes para a sincronização incremental (/api/sync/)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.task = Task.objects.create(title='Task', user=self.user, category=self.category)
+        self.untouched = Task.objects.create(title='Untouched', user=self.user)
+        Task.objects.create(title='Other Task', user=self.other_user)
+        self.sync_url = reverse('sync')
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, since=None):
+        params = {'since': since} if since else {}
+        response = self.client.get(self.sync_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync(self):
+        """Testa a sincronização completa sem since"""
+        with self.assertNumQueries(2):
+            data = self.sync()
+
+        self.assertEqual({task['id'] for task in data['tasks']}, {self.task.pk, self.untouched.pk})
+        self.assertEqual([category['id'] for category in data['categories']], [self.category.pk])
+        self.assertEqual(data['categories'][0]['task_count'], 1)
+        self.assertEqual(data['deleted'], {'tasks': [], 'categories': []})
+        self.assertFalse(data['has_more'])
+        self.assertFalse(data['reset'])
+
+    def test_incremental_sync_returns_changes_and_tombstones(self):
+        """Testa se apenas alterações e exclusões desde o último sync são retornadas"""
+        since = self.sync()['next_since']
+
+        self.task.title = 'Changed'
+        self.task.save()
+        created = Task.objects.create(title='Created', user=self.user)
+        doomed = Task.objects.create(title='Doomed', user=self.user)
+        doomed_pk = doomed.pk
+        doomed.delete()
+        Task.objects.filter(pk=created.pk).delete()
+        with_category = Task.objects.create(title='Categorized', user=self.user, category=self.category)
+        category_pk = self.category.pk
+        self.category.delete()
+
+        with self.assertNumQueries(3):
+            data = self.sync(since)
+
+        self.assertEqual({task['id'] for task in data['tasks']}, {self.task.pk, with_category.pk})
+        self.assertTrue(all(task['category'] is None for task in data['tasks']))
+        self.assertEqual(sorted(data['deleted']['tasks']), sorted([doomed_pk, created.pk]))
+        self.assertEqual(data['deleted']['categories'], [category_pk])
+        self.assertEqual(data['categories'], [])
+
+        data = self.sync(data['next_since'])
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['deleted'], {'tasks': [], 'categories': []})
+
+    def test_queryset_update_is_synced(self):
+        """Testa se QuerySet.update atualiza updated_at e entra no próximo sync"""
+        since = self.sync()['next_since']
+        Task.objects.filter(pk=self.task.pk).update(title='Bulk Changed')
+
+        data = self.sync(since)
+        self.assertEqual([task['title'] for task in data['tasks']], ['Bulk Changed'])
+
+    def test_sync_pagination(self):
+        """Testa a paginação por watermark e cursor (updated_at, id)"""
+        Task.objects.bulk_create(Task(title=f'Task {i}', user=self.user) for i in range(5))
+        seen = []
+        since = None
+        with self.settings(SYNC_PAGE_SIZE=2):
+            data = self.sync()
+            seen += [task['id'] for task in data['tasks']]
+            self.assertEqual(len(data['categories']), 1)
+            # Alterações durante a paginação ficam para o próximo sync
+            self.untouched.title = 'Changed During Paging'
+            self.untouched.save()
+            while data['has_more']:
+                data = self.sync(data['next_since'])
+                self.assertEqual(data['categories'], [])
+                seen += [task['id'] for task in data['tasks']]
+            since = data['next_since']
+
+        expected = set(Task.objects.filter(user=self.user).values_list('id', flat=True))
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), expected)
+
+        data = self.sync(since)
+        self.assertEqual([task['id'] for task in data['tasks']], [self.untouched.pk])
+
+    def test_sync_accepts_iso_datetime(self):
+        """Testa since como datetime ISO 8601"""
+        since = (timezone.now() + timedelta(seconds=1)).isoformat()
+        data = self.sync(since)
+        self.assertEqual(data['tasks'], [])
+
+        since = (timezone.now() - timedelta(hours=1)).isoformat()
+        data = self.sync(since)
+        self.assertEqual(len(data['tasks']), 2)
+
+    def test_sync_reset_when_since_is_older_than_retention(self):
+        """Testa a sincronização completa quando os tombstones já foram removidos"""
+        since = (timezone.now() - timedelta(days=31)).isoformat()
+        with self.settings(SYNC_TOMBSTONE_RETENTION_DAYS=30):
+            data = self.sync(since)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tasks']), 2)
+
+    def test_sync_rejects_invalid_token(self):
+        """Testa since inválido"""
+        response = self.client.get(self.sync_url, {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_deletion_log(self):
+        """Testa a remoção de tombstones antigos"""
+        self.untouched.delete()
+        DeletionLog.objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        task_pk = self.task.pk
+        self.task.delete()
+
+        out = StringIO()
+        call_command('prune_deletion_log', '--days', '30', stdout=out)
+
+        self.assertIn('Tombstones removidos: 1', out.getvalue())
+        self.assertEqual(list(DeletionLog.objects.values_list('object_id', flat=True)), [task_pk])
+
+    def test_delete_user_with_categories_and_tasks(self):
+        """Testa se excluir um usuário com categorias e tarefas não deixa tombstones órfãos"""
+        self.task.delete()
+        Category.objects.create(name='Home', user=self.user)
+
+        self.user.delete()
+        # O SQLite só verifica as chaves estrangeiras no commit
+        connection.check_constraints()
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(DeletionLog.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(Category.objects.filter(user_id=self.user.pk).exists())
+
+        # A exclusão de uma categoria continua gerando o tombstone
+        category = Category.objects.create(name='Work', user=self.other_user)
+        category_pk = category.pk
+        category.delete()
+        self.assertTrue(
+            DeletionLog.objects.filter(user=self.other_user, model='category', object_id=category_pk).exists()
+        )
+
+
+class ConditionalGetTest(QueryCountGuardTestCase):
+    """Testes para o ETag nas listagens, no detalhe e no dashboard"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.task = Task.objects.create(title='Task', user=self.user, category=self.category)
+        self.client.force_authenticate(user=self.user)
+
+    def assertNotModified(self, url, **headers):
+        # Apenas a query dos validadores: nada é listado nem serializado
+        with self.assertNumQueries(1):
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+        return response
+
+    def test_unchanged_resources_return_304(self):
+        """Testa If-None-Match nas listagens, no detalhe e no dashboard"""
+        urls = [
+            reverse('task-list-create'),
+            reverse('task-detail', kwargs={'pk': self.task.pk}),
+            reverse('category-list-create'),
+            reverse('dashboard-stats'),
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('private', response['Cache-Control'])
+            self.assertNotModified(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_write_in_the_same_second_is_not_a_304(self):
+        """Testa se uma escrita no mesmo segundo da leitura não gera 304 por If-Modified-Since"""
+        url = reverse('task-list-create')
+        now = timezone.now().replace(microsecond=100)
+        with patch('django.utils.timezone.now', return_value=now):
+            response = self.client.get(url)
+            self.assertNotIn('Last-Modified', response)
+            etag = response['ETag']
+
+            self.task.title = 'Changed'
+            self.task.save()
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=http_date(now.timestamp() + 1),
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(now.timestamp() + 1))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_changes_invalidate_etag(self):
+        """Testa se alterações, exclusões e renomear a categoria mudam o ETag"""
+        url = reverse('task-list-create')
+        etags = [self.client.get(url)['ETag']]
+
+        self.task.title = 'Changed'
+        self.task.save()
+        etags.append(self.client.get(url)['ETag'])
+
+        self.category.name = 'Renamed'
+        self.category.save()
+        etags.append(self.client.get(url)['ETag'])
+
+        Task.objects.create(title='Another', user=self.user)
+        etags.append(self.client.get(url)['ETag'])
+
+        Task.objects.filter(title='Another').delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etags.append(response['ETag'])
+
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_etag_depends_on_query_and_day(self):
+        """Testa se filtros e a virada do dia geram outro ETag"""
+        url = reverse('task-list-create')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'status': 'pending'})['ETag'], etag)
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with patch('django.utils.timezone.now', return_value=tomorrow):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_users_task_is_not_found(self):
+        """Testa se o detalhe de tarefa alheia continua retornando 404"""
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        task = Task.objects.create(title='Other Task', user=other)
+
+        response = self.client.get(reverse('task-detail', kwargs={'pk': task.pk}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QuoteProviderTest(TestCase):
+    """Testes para o cache, a atualização em segundo plano e o circuit breaker da citação diária"""
+
+    def setUp(self):
+        cache.clear()
+        self.stub = QuoteStubServer()
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.provider = QuoteProvider(url=self.stub.url, timeout=2, failure_threshold=2, reset_timeout=60)
+
+    def warm(self, provider=None):
+        provider = provider or self.provider
+        provider.get_quote()
+        provider.wait(5)
+
+    def test_serves_cached_quote_without_calling_api(self):
+        """Testa se, depois de carregada, a citação vem da memória"""
+        self.warm()
+        for _ in range(100):
+            quote = self.provider.get_quote()
+
+        self.assertEqual(quote['quote'], 'Test quote')
+        self.assertEqual(self.stub.hits, 1)
+
+    def test_cold_start_does_not_block(self):
+        """Testa se uma API lenta não segura a requisição"""
+        self.stub.release.clear()
+        started = time.monotonic()
+        quote = self.provider.get_quote()
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(quote['source'], 'fallback')
+        self.stub.release.set()
+        self.provider.wait(5)
+        self.assertEqual(self.provider.get_quote()['source'], 'quotable_api')
+
+    def test_stale_while_revalidate_on_new_day(self):
+        """Testa se a citação de ontem é servida enquanto a nova é buscada"""
+        self.warm()
+        self.stub.payload = {'content': 'New quote', 'author': 'New Author'}
+        self.stub.release.clear()
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with patch('django.utils.timezone.now', return_value=tomorrow):
+            self.assertEqual(self.provider.get_quote()['quote'], 'Test quote')
+            self.stub.release.set()
+            self.provider.wait(5)
+            self.assertEqual(self.provider.get_quote()['quote'], 'New quote')
+        self.assertEqual(self.stub.hits, 2)
+
+    def test_quote_is_shared_through_cache(self):
+        """Testa se outro processo (outra instância) reaproveita a citação do cache"""
+        self.warm()
+        other = QuoteProvider(url=self.stub.url)
+
+        self.assertEqual(other.get_quote()['quote'], 'Test quote')
+        self.assertEqual(self.stub.hits, 1)
+
+    def test_circuit_breaker(self):
+        """Testa se o circuito abre após falhas seguidas e tenta de novo após o reset"""
+        clock = [0.0]
+        self.provider.breaker.clock = lambda: clock[0]
+        self.stub.status = 500
+
+        for _ in range(5):
+            self.warm()
+
+        self.assertTrue(self.provider.breaker.is_open)
+        self.assertEqual(self.stub.hits, 2)
+        self.assertEqual(self.provider.get_quote()['source'], 'fallback')
+
+        clock[0] += 61
+        self.stub.status = 200
+        self.warm()
+
+        self.assertFalse(self.provider.breaker.is_open)
+        self.assertEqual(self.stub.hits, 3)
+        self.assertEqual(self.provider.get_quote()['source'], 'quotable_api')
+
+
+@override_settings(ROOT_URLCONF='supertask.urls_async')
+class AsyncViewsTest(TestCase):
+    """Testes para as views assíncronas do modo ASGI (supertask.urls_async)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        for i in range(25):
+            Task.objects.create(
+                title=f'Task {i}',
+                user=self.user,
+                category=self.category if i % 2 else None,
+                priority='high' if i % 3 == 0 else 'medium',
+                due_date=timezone.localdate() - timedelta(days=i % 4),
+            )
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        # O AsyncClient recebe os cabeçalhos pelo parâmetro headers
+        self.async_auth = {'headers': {'Authorization': f'Bearer {token}'}}
+
+    def sync_response(self, path, data=None):
+        """Resposta da view DRF equivalente, para comparar o JSON"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with self.settings(ROOT_URLCONF='supertask.urls'):
+            return client.get(path, data)
+
+    def test_views_are_async(self):
+        """Testa se as rotas de I/O resolvem para coroutines no modo ASGI"""
+        for name in ['task-list-create', 'dashboard-stats', 'daily-quote', 'health_check']:
+            view = resolve(reverse(name)).func
+            self.assertTrue(asyncio.iscoroutinefunction(view), name)
+
+    def test_task_list_matches_drf_view(self):
+        """Testa se a listagem assíncrona retorna o mesmo JSON da view DRF"""
+        url = reverse('task-list-create')
+        params = [
+            {},
+            {'page': 2},
+            {'page': 'last'},
+            {'priority': 'high', 'ordering': 'due_date'},
+            {'category': self.category.pk, 'search': 'Task 1'},
+            {'fields': 'id,title,is_overdue', 'page': 2},
+        ]
+        for data in params:
+            response = self.client.get(url, data, **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, data)
+            self.assertEqual(response.json(), self.sync_response(url, data).json(), data)
+            with self.settings(TASK_LIST_FAST_PATH=False):
+                # Mesmos bytes com e sem a listagem por .values()
+                self.assertEqual(response.content, self.client.get(url, data, **self.auth).content, data)
+
+    def test_invalid_page(self):
+        """Testa se uma página inexistente retorna 404 como no DRF"""
+        response = self.client.get(reverse('task-list-create'), {'page': 9}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {'detail': 'Invalid page.'})
+
+    def test_invalid_fields(self):
+        """Testa se um campo inexistente em ?fields= retorna 400 como no DRF"""
+        url = reverse('task-list-create')
+        response = self.client.get(url, {'fields': 'user'}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), self.sync_response(url, {'fields': 'user'}).json())
+
+    def test_requires_authentication(self):
+        """Testa se as views assíncronas retornam 401 sem token ou com token inválido"""
+        for url in [reverse('task-list-create'), reverse('dashboard-stats'), reverse('daily-quote')]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertIn('Bearer', response['WWW-Authenticate'])
+
+            response = self.client.get(url, HTTP_AUTHORIZATION='Bearer invalid')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_post_and_cursor_use_drf_view(self):
+        """Testa se POST e a paginação por cursor continuam na view DRF"""
+        url = reverse('task-list-create')
+        response = self.client.post(url, {'title': 'Nova'}, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['title'], 'Nova')
+
+        response = self.client.get(url, {'pagination': 'cursor'}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.sync_response(url, {'pagination': 'cursor'}).json())
+
+    def test_conditional_get(self):
+        """Testa ETag/304 nas views assíncronas"""
+        for url in [reverse('task-list-create'), reverse('dashboard-stats')]:
+            response = self.client.get(url, **self.auth)
+            self.assertIn('private', response['Cache-Control'])
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_dashboard_stats(self):
+        """Testa o dashboard assíncrono pelo AsyncClient"""
+        response = await self.async_client.get(reverse('dashboard-stats'), **self.async_auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['total_tasks'], 25)
+        self.assertEqual(data['high_priority'], 9)
+        self.assertEqual(data['categories_stats']['Work']['total'], 12)
+
+        # A segunda requisição vem do cache do dashboard
+        response = await self.async_client.get(reverse('dashboard-stats'), **self.async_auth)
+        self.assertEqual(response.json(), data)
+
+    async def test_daily_quote_and_health(self):
+        """Testa a citação diária e o health check assíncronos"""
+        with QuoteStubServer() as stub, self.settings(QUOTE_API_URL=stub.url):
+            response = await self.async_client.get(reverse('daily-quote'), **self.async_auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['source'], 'fallback')
+
+            await sync_to_async(get_quote_provider().wait)(5)
+            response = await self.async_client.get(reverse('daily-quote'), **self.async_auth)
+            self.assertEqual(response.json()['quote'], 'Test quote')
+
+        response = await self.async_client.get(reverse('health_check'))
+        self.assertEqual(response.json()['status'], 'healthy')
+        response = await self.async_client.post(reverse('health_check'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class TaskExportTest(QueryCountGuardTestCase):
+    """Testes para a exportação em CSV/NDJSON de /api/tasks/export/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        today = timezone.localdate()
+        for i in range(30):
+            Task.objects.create(
+                title=f'Task {i}, "quoted"',
+                description='linha 1\nlinha 2' if i % 5 == 0 else None,
+                user=self.user,
+                category=self.category if i % 2 else None,
+                priority='high' if i % 3 == 0 else 'low',
+                status='completed' if i % 4 == 0 else 'pending',
+                due_date=today - timedelta(days=i % 3 - 1),
+            )
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        Task.objects.create(title='Other', user=other)
+        self.url = reverse('task-export')
+        self.client.force_authenticate(user=self.user)
+
+    def export(self, params=None, **extra):
+        response = self.client.get(self.url, params, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def list_results(self, params=None):
+        """Todos os itens de /api/tasks/, seguindo a paginação"""
+        response = self.client.get(reverse('task-list-create'), params)
+        results = list(response.data['results'])
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            results.extend(response.data['results'])
+        return results
+
+    def test_ndjson_matches_task_list(self):
+        """Testa se cada linha NDJSON é igual ao item correspondente de /api/tasks/"""
+        response, content = self.export({'format': 'ndjson'})
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertIn('tasks.ndjson', response['Content-Disposition'])
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        expected = json.loads(json.dumps(self.list_results(), cls=DjangoJSONEncoder))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows, expected)
+
+    def test_csv(self):
+        """Testa o CSV: cabeçalho, escape de vírgulas/aspas/quebras de linha e valores nulos"""
+        response, content = self.export({'format': 'csv'})
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+        rows = list(csv.DictReader(StringIO(content)))
+        expected = self.list_results()
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(list(rows[0]), list(TaskSerializer().fields))
+        for row, item in zip(rows, expected):
+            self.assertEqual(row['id'], str(item['id']))
+            self.assertEqual(row['title'], item['title'])
+            self.assertEqual(row['description'], item['description'] or '')
+            self.assertEqual(row['category_name'], item.get('category_name', ''))
+            self.assertEqual(row['is_overdue'], str(item['is_overdue']))
+            self.assertEqual(row['created_at'], item['created_at'])
+
+    def test_filters_and_ordering(self):
+        """Testa se a exportação respeita os filtros e a ordenação da listagem"""
+        cases = [
+            {'status': 'completed'},
+            {'priority': 'high', 'category': self.category.pk},
+            {'due_date': 'overdue'},
+            {'ordering': 'priority'},
+            {'ordering': 'due_date'},
+        ]
+        for params in cases:
+            _, content = self.export(dict(params, format='ndjson'))
+            ids = [json.loads(line)['id'] for line in content.splitlines()]
+            self.assertEqual(ids, [item['id'] for item in self.list_results(params)], params)
+
+    def test_accept_header_and_default_format(self):
+        """Testa a escolha do formato pelo Accept e o CSV como padrão"""
+        response, _ = self.export(HTTP_ACCEPT='application/x-ndjson')
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+
+        response, content = self.export()
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertTrue(content.startswith('id,title,'))
+
+    def test_invalid_format_and_authentication(self):
+        """Testa formato desconhecido e acesso sem autenticação"""
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=100)
+    def test_bounded_memory_and_throughput(self):
+        """Testa se a memória de pico não cresce com o número de tarefas e a vazão mínima"""
+        def create(count):
+            Task.objects.bulk_create(
+                [Task(title=f'Bulk {i}', description='x' * 100, user=self.user, category=self.category)
+                 for i in range(count)],
+                batch_size=1000,
+            )
+
+        def consume(export_format):
+            response = self.client.get(self.url, {'format': export_format})
+            rows = 0
+            tracemalloc.start()
+            start = time.perf_counter()
+            for chunk in response.streaming_content:
+                rows += chunk.count(b'\n')
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return rows, peak, elapsed
+
+        create(470)
+        small = {fmt: consume(fmt) for fmt in EXPORT_FORMATS}
+        create(9500)
+        large = {fmt: consume(fmt) for fmt in EXPORT_FORMATS}
+
+        for fmt in EXPORT_FORMATS:
+            self.assertGreaterEqual(large[fmt][0], 10000)
+            # 20x mais linhas com praticamente o mesmo pico de memória
+            self.assertLess(large[fmt][1], small[fmt][1] * 2, fmt)
+
+        # Vazão medida sem o tracemalloc, que deixa a alocação bem mais lenta
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        start = time.perf_counter()
+        rows = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+        self.assertGreater(rows / (time.perf_counter() - start), 5000)
+
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=5)
+    async def test_asgi_streams_async_iterator(self):
+        """Testa se no ASGI a exportação é um iterador assíncrono, sem ler tudo para a memória"""
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get(
+            self.url, {'format': 'ndjson'}, headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Com um gerador síncrono o Django 4.2 consumiria a exportação inteira com sync_to_async(list)
+        self.assertTrue(response.is_async)
+        blocks = [block async for block in response.streaming_content]
+        self.assertEqual(len(blocks), 6)
+
+        rows = [json.loads(line) for line in b''.join(blocks).decode().splitlines()]
+        expected = await sync_to_async(self.list_results)()
+        self.assertEqual(rows, json.loads(json.dumps(expected, cls=DjangoJSONEncoder)))
+
+
+class TaskImportTest(QueryCountGuardTestCase):
+    """Testes para a importação de tarefas (POST /api/tasks/import/ e manage.py import_tasks)"""
+
+    CSV = (
+        'title,description,priority,status,due_date,category_name\n'
+        'Primeira,"com, vírgula",high,pending,2025-01-10,work\n'
+        'Segunda,,low,completed,,Nova Categoria\n'
+        ',sem título,medium,pending,,\n'
+        'Terceira,"linha 1\nlinha 2",urgent,pending,2025-13-01,WORK\n'
+        'Quarta,,medium,in_progress,,nova categoria\n'
+    )
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.url = reverse('task-import')
+        self.client.force_authenticate(user=self.user)
+
+    def post_body(self, body, content_type='text/csv', params=''):
+        return self.client.generic('POST', self.url + params, body.encode(), content_type=content_type)
+
+    def ndjson(self, count, start=0):
+        return ''.join(
+            json.dumps({'title': f'Task {i}', 'category_name': f'Cat {i % 3}'}) + '\n'
+            for i in range(start, start + count)
+        )
+
+    def test_csv_import_with_row_errors(self):
+        """Testa a importação de CSV: categorias resolvidas/criadas, erros por linha e contadores"""
+        response = self.post_body(self.CSV)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['errors'], 2)
+        self.assertEqual(response.data['next_row'], 5)
+        self.assertEqual(response.data['categories_created'], ['Nova Categoria'])
+        errors = {error['row']: error['errors'] for error in response.data['error_rows']}
+        self.assertEqual(set(errors), {3, 4})
+        self.assertIn('title', errors[3])
+        self.assertEqual(set(errors[4]), {'priority', 'due_date'})
+
+        first = Task.objects.get(title='Primeira')
+        self.assertEqual(first.category, self.category)
+        self.assertEqual(first.description, 'com, vírgula')
+        self.assertEqual(first.due_date, date(2025, 1, 10))
+        second = Task.objects.get(title='Segunda')
+        self.assertIsNotNone(second.completed_at)
+        self.assertEqual(Task.objects.get(title='Quarta').category, second.category)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(verify_counters([self.user.pk]), {})
+
+    def test_ndjson_upload(self):
+        """Testa o upload multipart de um arquivo NDJSON, com linha inválida"""
+        content = self.ndjson(5) + 'not json\n\n' + json.dumps(['list']) + '\n'
+        upload = SimpleUploadedFile('tasks.ndjson', content.encode(), content_type='application/octet-stream')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual([error['row'] for error in response.data['error_rows']], [6, 7])
+        self.assertEqual(Task.objects.filter(user=self.user, category__name='Cat 1').count(), 2)
+
+    def test_category_lookups_do_not_grow_with_rows(self):
+        """Testa se as categorias são lidas uma única vez, independente do número de linhas"""
+        Category.objects.create(name='Cat 0', user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_body(self.ndjson(300), 'application/x-ndjson')
+        self.assertEqual(response.data['created'], 300)
+        category_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'tasks_category' in query['sql']
+        ]
+        # O mapa inicial e uma consulta do get_or_create para cada uma das duas categorias novas
+        self.assertEqual(len(category_selects), 3)
+
+    def test_without_creating_categories(self):
+        """Testa ?create_categories=false: categorias inexistentes viram erros da linha"""
+        response = self.post_body(self.CSV, params='?create_categories=false')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'], 4)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(TASK_IMPORT_BATCH_SIZE=10)
+    def test_resume_after_failure(self):
+        """Testa se uma falha preserva os lotes gravados e a importação retoma de next_row"""
+        body = self.ndjson(35)
+        original = TaskQuerySet.bulk_create
+        calls = []
+
+        def failing_bulk_create(queryset, objs, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 3:
+                raise DatabaseError('disk full')
+            return original(queryset, objs, *args, **kwargs)
+
+        with patch.object(TaskQuerySet, 'bulk_create', failing_bulk_create):
+            response = self.post_body(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data['created'], 20)
+        self.assertEqual(response.data['next_row'], 20)
+
+        response = self.post_body(body, 'application/x-ndjson', params='?start=20')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 15)
+        self.assertEqual(response.data['next_row'], 35)
+        titles = list(Task.objects.filter(user=self.user).values_list('title', flat=True))
+        self.assertEqual(sorted(titles), sorted(f'Task {i}' for i in range(35)))
+
+    def test_export_round_trip(self):
+        """Testa se o CSV da exportação pode ser importado de volta"""
+        Task.objects.create(title='Exportada', user=self.user, category=self.category, priority='high')
+        export = b''.join(self.client.get(reverse('task-export'), {'format': 'csv'}).streaming_content)
+
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other)
+        response = self.post_body(export.decode())
+        self.assertEqual(response.data['created'], 1)
+        task = Task.objects.get(user=other)
+        self.assertEqual((task.title, task.priority, task.category.name), ('Exportada', 'high', 'Work'))
+        self.assertNotEqual(task.category, self.category)
+
+    def test_invalid_requests(self):
+        """Testa corpo vazio, formato não suportado, start inválido e arquivo malformado"""
+        self.assertEqual(self.post_body('').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.post_body('{}', 'application/json').status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+        self.assertEqual(self.post_body(self.CSV, params='?start=x').status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.generic('POST', self.url, b'title\n\xff\xfe\n', content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['next_row'], 0)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.post_body(self.CSV).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_import_command_with_checkpoint(self):
+        """Testa o manage.py import_tasks, retomando pelo arquivo de checkpoint após uma falha"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.ndjson')
+            checkpoint = os.path.join(directory, 'progress')
+            with open(path, 'w') as output:
+                output.write(self.ndjson(25))
+
+            original = TaskQuerySet.bulk_create
+            calls = []
+
+            def failing_bulk_create(queryset, objs, *args, **kwargs):
+                calls.append(1)
+                if len(calls) == 2:
+                    raise DatabaseError('connection lost')
+                return original(queryset, objs, *args, **kwargs)
+
+            with patch.object(TaskQuerySet, 'bulk_create', failing_bulk_create):
+                with self.assertRaisesMessage(CommandError, '--start 10'):
+                    call_command(
+                        'import_tasks', path, user='testuser', batch_size=10,
+                        checkpoint=checkpoint, stdout=StringIO(),
+                    )
+            with open(checkpoint) as progress:
+                self.assertEqual(progress.read(), '10')
+
+            out = StringIO()
+            call_command('import_tasks', path, user='testuser', batch_size=10, checkpoint=checkpoint, stdout=out)
+            self.assertIn('Retomando após a linha 10', out.getvalue())
+            self.assertIn('Tarefas criadas: 15', out.getvalue())
+
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 25)
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', 'tasks.txt', user='testuser')
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', 'tasks.csv', user='missing')
+
+
+class TaskSearchTest(QueryCountGuardTestCase):
+    """Testes para a busca textual (?q=) em /api/tasks/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        self.planning = Task.objects.create(
+            title='Reunião de planejamento', user=self.user, category=self.category, priority='high'
+        )
+        self.report = Task.objects.create(
+            title='Relatório mensal',
+            description='Incluir o planejamento do próximo trimestre e os números de vendas da equipe',
+            user=self.user,
+        )
+        self.other = Task.objects.create(title='Comprar café', description='Sem açúcar', user=self.user)
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        Task.objects.create(title='Planejamento alheio', user=other_user)
+        self.url = reverse('task-list-create')
+        self.client.force_authenticate(user=self.user)
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_ranked_results(self):
+        """Testa se a busca retorna apenas as tarefas do usuário, com o título mais relevante primeiro"""
+        self.assertEqual(self.search('planejamento'), [self.planning.pk, self.report.pk])
+        self.assertEqual(self.search('café'), [self.other.pk])
+        self.assertEqual(self.search('inexistente'), [])
+
+    def test_prefix_accents_and_terms(self):
+        """Testa prefixos, acentos ignorados e a exigência de todos os termos"""
+        self.assertEqual(self.search('planej'), [self.planning.pk, self.report.pk])
+        self.assertEqual(self.search('reuniao'), [self.planning.pk])
+        self.assertEqual(self.search('planejamento vendas'), [self.report.pk])
+        self.assertEqual(self.search('REUNIÃO'), [self.planning.pk])
+
+    def test_special_characters(self):
+        """Testa se a sintaxe do FTS na busca não causa erro"""
+        for q in ['"planejamento', 'planejamento OR café', 'title:café', 'café*', '(a', '-', 'NEAR(a b)']:
+            self.client.get(self.url, {'q': q})
+        self.assertEqual(self.search('planejamento OR café'), [])
+        self.assertEqual(self.search('"planejamento'), [self.planning.pk, self.report.pk])
+        # Sem nenhuma palavra a busca é ignorada
+        self.assertEqual(self.search('***'), [self.other.pk, self.report.pk, self.planning.pk])
+
+    def test_filters_ordering_and_pagination(self):
+        """Testa a busca com filtros, ordenação explícita e as duas paginações"""
+        self.assertEqual(self.search('planejamento', priority='high'), [self.planning.pk])
+        self.assertEqual(self.search('planejamento', category=self.category.pk), [self.planning.pk])
+        self.assertEqual(self.search('planejamento', ordering='created_at'), [self.planning.pk, self.report.pk])
+
+        Task.objects.bulk_create(
+            [Task(title=f'Planejamento {i}', user=self.user) for i in range(25)]
+        )
+        response = self.client.get(self.url, {'q': 'planejamento'})
+        self.assertEqual(response.data['count'], 27)
+        self.assertEqual(len(response.data['results']), 20)
+        page2 = self.client.get(response.data['next']).data['results']
+        self.assertEqual(len(page2), 7)
+
+        ids = []
+        response = self.client.get(self.url, {'q': 'planejamento', 'pagination': 'cursor'})
+        while True:
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(ids), 27)
+        self.assertEqual(len(set(ids)), 27)
+
+    def test_index_follows_changes(self):
+        """Testa se o índice acompanha save, update(), bulk_create e exclusões"""
+        self.planning.title = 'Reunião de orçamento'
+        self.planning.save()
+        self.assertEqual(self.search('planejamento'), [self.report.pk])
+        self.assertEqual(self.search('orcamento'), [self.planning.pk])
+
+        Task.objects.filter(pk=self.other.pk).update(description='Com planejamento')
+        self.assertEqual(set(self.search('planejamento')), {self.report.pk, self.other.pk})
+
+        self.report.delete()
+        Task.objects.filter(pk=self.other.pk).delete()
+        self.assertEqual(self.search('planejamento'), [])
+
+    def test_restores_triggers_after_table_rebuild(self):
+        """Testa se o post_migrate recria triggers apagados (SQLite recria tabelas em algumas migrações)"""
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER tasks_task_fts_insert')
+        Task.objects.create(title='Planejamento perdido', user=self.user)
+
+        restore_fts_index(sender=None, app_config=apps.get_app_config('tasks'), using='default')
+        self.assertEqual(len(self.search('planejamento')), 3)
+
+        task = Task.objects.create(title='Planejamento novo', user=self.user)
+        self.assertIn(task.pk, self.search('novo'))
+
+    def test_export_supports_search(self):
+        """Testa ?q= na exportação"""
+        response = self.client.get(reverse('task-export'), {'q': 'planejamento', 'format': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.planning.pk, self.report.pk])
+
+
+class TaskListFastPathTest(QueryCountGuardTestCase):
+    """Testes para a listagem de /api/tasks/ a partir de .values() (TASK_LIST_FAST_PATH)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Trabalho ☕', user=self.user)
+        today = timezone.now().date()
+        for i in range(25):
+            Task.objects.create(
+                title=f'Tarefa {i} "ação" \t<b>\u2028',
+                description='linha 1\nlinha 2 ' if i % 5 == 0 else None,
+                user=self.user,
+                category=self.category if i % 2 else None,
+                priority=['high', 'medium', 'low'][i % 3],
+                status='completed' if i % 4 == 0 else 'pending',
+                due_date=today + timedelta(days=i % 3 - 1) if i % 7 else None,
+            )
+        self.url = reverse('task-list-create')
+        self.client.force_authenticate(user=self.user)
+
+    def assert_same_bytes(self, params=None, **extra):
+        fast = self.client.get(self.url, params, **extra)
+        with override_settings(TASK_LIST_FAST_PATH=False):
+            slow = self.client.get(self.url, params, **extra)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_same_bytes_as_serializer(self):
+        """Testa se a resposta é idêntica, byte a byte, à do TaskSerializer"""
+        response = self.assert_same_bytes()
+        self.assertIn(b'\\u2028', response.content)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assert_same_bytes({'page': 2})
+        self.assert_same_bytes({'ordering': 'due_date', 'status': 'pending'})
+        self.assert_same_bytes({'q': 'tarefa', 'format': 'json'})
+        self.assert_same_bytes(HTTP_ACCEPT='application/json; indent=4')
+
+    def test_same_bytes_with_cursor_pagination(self):
+        """Testa a paginação por cursor, inclusive pela chave anotada priority_rank"""
+        for ordering in ['-created_at', 'priority']:
+            response = self.assert_same_bytes({'pagination': 'cursor', 'ordering': ordering})
+            self.assert_same_bytes(dict(parse_qs(urlparse(response.data['next']).query)))
+
+    def test_is_overdue_uses_one_today(self):
+        """Testa se is_overdue usa a mesma data do model, lida uma vez por requisição"""
+        with patch('tasks.rows.overdue_today', wraps=overdue_today) as today:
+            results = self.client.get(self.url).data['results']
+        self.assertEqual(today.call_count, 1)
+        tasks = Task.objects.in_bulk([item['id'] for item in results])
+        self.assertEqual(
+            [item['is_overdue'] for item in results],
+            [tasks[item['id']].is_overdue for item in results],
+        )
+        self.assertTrue(any(item['is_overdue'] for item in results))
+
+    def test_renderer_without_orjson(self):
+        """Testa se o renderizador mantém a saída sem o orjson e com dados que ele não serializa"""
+        expected = self.client.get(self.url).content
+        with patch('tasks.renderers.orjson', None):
+            self.assertEqual(self.client.get(self.url).content, expected)
+
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import TaskJSONRenderer
+        data = {'big': 2 ** 70, 'when': timezone.now(), 1: 'int key', 'day': date(2025, 1, 2)}
+        self.assertEqual(TaskJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SparseFieldsTest(QueryCountGuardTestCase):
+    """Testes para ?fields= e ?exclude= nos endpoints de tarefas e categorias"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.category = Category.objects.create(name='Work', user=self.user)
+        for i in range(25):
+            Task.objects.create(
+                title=f'Task {i}',
+                description='descrição longa ' * 50,
+                user=self.user,
+                category=self.category if i % 2 else None,
+                priority=['high', 'medium', 'low'][i % 3],
+                due_date=timezone.localdate() - timedelta(days=i % 3),
+            )
+        self.task = Task.objects.filter(category=self.category).first()
+        self.url = reverse('task-list-create')
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_task_list_fields(self):
+        """Testa se a lista retorna só os campos pedidos, na ordem do serializer, sem ler a descrição"""
+        for fast_path in [True, False]:
+            with self.settings(TASK_LIST_FAST_PATH=fast_path):
+                response, sql = self.get(self.url, {'fields': 'status,id,title,priority'})
+                for item in response.data['results']:
+                    self.assertEqual(list(item), ['id', 'title', 'priority', 'status'])
+                self.assertNotIn('"description"', sql)
+                self.assertNotIn('"due_date"', sql)
+
+                response, sql = self.get(self.url, {'exclude': 'description,updated_at'})
+                item = response.data['results'][0]
+                self.assertNotIn('description', item)
+                self.assertNotIn('updated_at', item)
+                self.assertIn('is_overdue', item)
+                self.assertNotIn('"description"', sql)
+
+    def test_same_output_with_and_without_fast_path(self):
+        """Testa se o caminho por .values() e o TaskSerializer geram os mesmos bytes com campos esparsos"""
+        params = [
+            {'fields': 'id,category_name,is_overdue'},
+            {'fields': 'id,category', 'exclude': 'category'},
+            {'exclude': 'description', 'ordering': 'due_date'},
+        ]
+        for data in params:
+            fast = self.client.get(self.url, data)
+            with self.settings(TASK_LIST_FAST_PATH=False):
+                self.assertEqual(fast.content, self.client.get(self.url, data).content, data)
+
+    def test_cursor_pagination_reads_ordering_keys(self):
+        """Testa se as chaves do cursor são lidas mesmo quando não fazem parte dos campos pedidos"""
+        for fast_path in [True, False]:
+            with self.settings(TASK_LIST_FAST_PATH=fast_path):
+                data = {'fields': 'id', 'pagination': 'cursor', 'ordering': 'priority'}
+                ids = []
+                response, _ = self.get(self.url, data)
+                while True:
+                    ids.extend(item['id'] for item in response.data['results'])
+                    if not response.data['next']:
+                        break
+                    response, _ = self.get(response.data['next'], None)
+                expected = self.client.get(self.url, {'ordering': 'priority', 'page': 1}).data['count']
+                self.assertEqual(len(ids), expected)
+                self.assertEqual(len(set(ids)), expected)
+
+    def test_task_detail_fields(self):
+        """Testa ?fields= no detalhe da tarefa"""
+        url = reverse('task-detail', kwargs={'pk': self.task.pk})
+        response, sql = self.get(url, {'fields': 'id,title,category_name'})
+        self.assertEqual(response.data, {'id': self.task.pk, 'title': self.task.title, 'category_name': 'Work'})
+        self.assertNotIn('"description"', sql)
+
+        response, sql = self.get(url, {'fields': 'title'})
+        self.assertEqual(response.data, {'title': self.task.title})
+        self.assertNotIn('tasks_category', sql.split('FROM "tasks_task"')[-1])
+
+    def test_category_fields(self):
+        """Testa ?fields= nas categorias, sem somar os contadores quando task_count não é pedido"""
+        response, sql = self.get(reverse('category-list-create'), {'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': self.category.pk, 'name': 'Work'}])
+        self.assertNotIn('taskcounter', sql)
+
+        response, _ = self.get(reverse('category-list-create'), {'fields': 'name,task_count'})
+        self.assertEqual(response.data['results'], [{'name': 'Work', 'task_count': 12}])
+
+        url = reverse('category-detail', kwargs={'pk': self.category.pk})
+        response, _ = self.get(url, {'exclude': 'created_at,updated_at,color'})
+        self.assertEqual(response.data, {'id': self.category.pk, 'name': 'Work', 'task_count': 12})
+
+    def test_unknown_field(self):
+        """Testa se campos inexistentes retornam 400"""
+        response = self.client.get(self.url, {'fields': 'id,user'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'fields': ['Unknown field(s): user.']})
+        response = self.client.get(reverse('category-list-create'), {'exclude': 'tasks'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        """Testa se ?fields= não afeta a resposta de escritas"""
+        response = self.client.post(f'{self.url}?fields=id', {'title': 'Nova'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('title', response.data)
+
+    def test_export_fields(self):
+        """Testa ?fields= na exportação"""
+        response = self.client.get(reverse('task-export'), {'format': 'csv', 'fields': 'id,title'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,title')
+        self.assertEqual(len(lines), 26)
+
+
+class RequestMetricsTest(QueryCountGuardTestCase):
+    """Testes para o RequestMetricsMiddleware (Server-Timing, log por requisição e /metrics/)"""
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        category = Category.objects.create(name='Work', user=self.user)
+        for i in range(5):
+            Task.objects.create(title=f'Task {i}', user=self.user, category=category)
+        self.client.force_authenticate(user=self.user)
+
+    def server_timing(self, response):
+        timing = response['Server-Timing']
+        queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+        durations = dict(re.findall(r'(\w+);dur=([\d.]+)', timing))
+        return queries, {name: float(value) for name, value in durations.items()}
+
+    def test_server_timing_counts_queries(self):
+        """Testa se o Server-Timing traz as consultas, o tempo de banco, a serialização e o total"""
+        for url in [reverse('task-list-create'), reverse('category-list-create')]:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            queries, durations = self.server_timing(response)
+            self.assertEqual(queries, len(captured), url)
+            self.assertGreater(durations['serializer'], 0, url)
+            self.assertGreaterEqual(durations['total'], durations['db'] + durations['serializer'])
+
+    @override_settings(ROOT_URLCONF='supertask.urls_async')
+    async def test_async_views_are_measured(self):
+        """Testa se as consultas feitas pelas views assíncronas (em outras threads) são contadas"""
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get(
+            reverse('task-list-create'), headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries, _ = self.server_timing(response)
+        self.assertGreaterEqual(queries, 2)
+
+    def test_structured_log_with_sampling(self):
+        """Testa a linha JSON no logger supertask.requests e a amostragem"""
+        url = reverse('task-list-create')
+        with self.settings(REQUEST_LOG_SAMPLE_RATE=1):
+            with self.assertLogs('supertask.requests', 'INFO') as logs:
+                response = self.client.get(url)
+        record = json.loads(logs.records[0].getMessage())
+        queries, _ = self.server_timing(response)
+        self.assertEqual(record['route'], 'api/tasks/')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['db_queries'], queries)
+        self.assertEqual(record['user_id'], self.user.pk)
+
+        with self.settings(REQUEST_LOG_SAMPLE_RATE=0, REQUEST_LOG_SLOW_MS=0):
+            with self.assertNoLogs('supertask.requests'):
+                self.client.get(url)
+        with self.settings(REQUEST_LOG_SAMPLE_RATE=0, REQUEST_LOG_SLOW_MS=500):
+            self.assertTrue(should_log(0.6))
+            self.assertFalse(should_log(0.1))
+
+    def test_prometheus_metrics(self):
+        """Testa os histogramas agregados por rota em /metrics/"""
+        self.client.get(reverse('task-list-create'))
+        self.client.get(reverse('task-detail', kwargs={'pk': Task.objects.first().pk}))
+        self.client.get(reverse('task-list-create'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",route="api/tasks/",status="200"} 2', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="api/tasks/<int:pk>/"} 1', body)
+        self.assertIn('# TYPE http_request_db_queries histogram', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",route="api/tasks/",le="+Inf"} 2', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1/8'], METRICS_TOKEN='segredo')
+    def test_metrics_access(self):
+        """Testa se /metrics/ só responde a endereços liberados ou com o token"""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, status.HTTP_200_OK)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_middleware_does_not_patch_drf_serializers(self):
+        """Testa se carregar o middleware não altera o to_representation dos serializers do DRF"""
+        RequestMetricsMiddleware(lambda request: None)
+        for serializer_class in (Serializer, ListSerializer):
+            self.assertEqual(serializer_class.to_representation.__module__, 'rest_framework.serializers')
+
+    def test_invalid_allowed_ips_fail_at_startup(self):
+        """Testa se uma entrada inválida em METRICS_ALLOWED_IPS é rejeitada ao carregar o middleware"""
+        with self.settings(METRICS_ALLOWED_IPS=['127.0.0.1', 'localhost']):
+            with self.assertRaises(ImproperlyConfigured):
+                RequestMetricsMiddleware(lambda request: None)
+
+
+class ApiSettingsProfileTest(QueryCountGuardTestCase):
+    """Testes para o perfil só de API (supertask.settings_api)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        Task.objects.create(title='Task', user=self.user)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_profile_drops_session_stack(self):
+        """Testa se o perfil remove admin, sessões, mensagens e estáticos e mantém a autenticação"""
+        from supertask import settings_api
+
+        for app in ['django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages',
+                    'django.contrib.staticfiles']:
+            self.assertNotIn(app, settings_api.INSTALLED_APPS)
+        for app in ['django.contrib.auth', 'django.contrib.contenttypes', 'rest_framework_simplejwt.token_blacklist']:
+            self.assertIn(app, settings_api.INSTALLED_APPS)
+        self.assertEqual(settings_api.MIDDLEWARE[0], 'supertask.instrumentation.RequestMetricsMiddleware')
+        self.assertNotIn('django.contrib.sessions.middleware.SessionMiddleware', settings_api.MIDDLEWARE)
+        self.assertNotIn(
+            'django.contrib.messages.context_processors.messages',
+            settings_api.TEMPLATES[0]['OPTIONS']['context_processors'],
+        )
+
+    def test_api_works_with_profile_middleware(self):
+        """Testa se a API com JWT funciona só com os middlewares do perfil"""
+        from supertask import settings_api
+
+        with override_settings(MIDDLEWARE=settings_api.MIDDLEWARE, REST_FRAMEWORK=settings_api.REST_FRAMEWORK):
+            response = self.client.get(reverse('task-list-create'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['count'], 1)
+
+            response = self.client.post(reverse('task-list-create'), {'title': 'Nova'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(self.client.get(reverse('dashboard-stats')).status_code, status.HTTP_200_OK)
+
+    def test_task_list_follows_profile_renderers(self):
+        """Testa se a listagem de tarefas usa só os renderizadores do perfil, sem a API navegável"""
+        from supertask import settings_api
+
+        from .views import TaskListCreateView
+
+        def renderers():
+            return [type(renderer).__name__ for renderer in TaskListCreateView().get_renderers()]
+
+        self.assertEqual(renderers(), ['TaskJSONRenderer', 'BrowsableAPIRenderer'])
+        url = reverse('task-list-create')
+        with override_settings(REST_FRAMEWORK=settings_api.REST_FRAMEWORK):
+            self.assertEqual(renderers(), ['TaskJSONRenderer'])
+            response = self.client.get(url, HTTP_ACCEPT='text/html')
+            self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.accepted_renderer.__class__.__name__, 'TaskJSONRenderer')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReadReplicaRoutingTest(QueryCountGuardTestCase):
+    """Testes para as leituras em réplica (supertask.replicas)"""
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        from supertask import replicas
+
+        cache.clear()
+        replicas.breakers.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.task = Task.objects.create(title='Primária', user=self.user)
+        Category.objects.create(name='Categoria primária', user=self.user)
+        # A "réplica" tem dados diferentes para sabermos de onde veio cada leitura
+        User.objects.using('replica_1').bulk_create([User(id=self.user.id, username=self.user.username)])
+        Task.objects.using('replica_1').bulk_create([
+            Task(title='Réplica 1', user_id=self.user.id),
+            Task(title='Réplica 2', user_id=self.user.id, status='completed'),
+        ])
+        Category.objects.using('replica_1').bulk_create([Category(name='Categoria réplica', user_id=self.user.id)])
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def titles(self):
+        response = self.client.get(reverse('task-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(task['title'] for task in response.json()['results'])
+
+    def test_safe_reads_use_replica(self):
+        """Testa se a listagem de tarefas, a de categorias e o dashboard leem da réplica"""
+        self.assertEqual(self.titles(), ['Réplica 1', 'Réplica 2'])
+
+        response = self.client.get(reverse('category-list-create'))
+        self.assertEqual([category['name'] for category in response.json()['results']], ['Categoria réplica'])
+
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(list(response.json()['categories_stats']), ['Categoria réplica'])
+        # Estatísticas de uma réplica não preenchem o cache compartilhado
+        self.assertIsNone(cache.get(dashboard_stats_key(self.user.pk)))
+
+        with self.settings(DATABASE_REPLICAS=[]):
+            response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(list(response.json()['categories_stats']), ['Categoria primária'])
+        self.assertIsNotNone(cache.get(dashboard_stats_key(self.user.pk)))
+        # Com o cache preenchido pelo principal, a leitura na réplica o aproveita
+        response = self.client.get(reverse('dashboard-stats'))
+        self.assertEqual(list(response.json()['categories_stats']), ['Categoria primária'])
+
+    def test_other_endpoints_use_primary(self):
+        """Testa se o detalhe da tarefa e as escritas continuam no banco principal"""
+        response = self.client.get(reverse('task-detail', kwargs={'pk': self.task.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('task-list-create'), {'title': 'Nova'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Task.objects.using('default').filter(title='Nova').exists())
+        self.assertFalse(Task.objects.using('replica_1').filter(title='Nova').exists())
+
+    def test_read_your_writes(self):
+        """Testa se, depois de escrever, o usuário lê do principal até a marca expirar"""
+        from supertask.replicas import pinned_key
+
+        self.client.post(reverse('task-list-create'), {'title': 'Nova'}, format='json')
+        self.assertEqual(self.titles(), ['Nova', 'Primária'])
+
+        # Outro usuário continua lendo da réplica
+        self.assertTrue(cache.get(pinned_key(self.user.pk)))
+        self.assertIsNone(cache.get(pinned_key(self.user.pk + 1)))
+
+        cache.delete(pinned_key(self.user.pk))
+        self.assertEqual(self.titles(), ['Réplica 1', 'Réplica 2'])
+
+    def test_falls_back_to_primary_when_replica_is_down(self):
+        """Testa se a réplica fora do ar leva ao principal e fica fora pelo tempo de nova tentativa"""
+        from django.db import OperationalError, connections
+
+        replica = connections['replica_1']
+        with patch.object(replica, 'ensure_connection', side_effect=OperationalError('down')) as ensure:
+            with self.assertLogs('supertask.replicas', level='WARNING'):
+                self.assertEqual(self.titles(), ['Primária'])
+            self.assertEqual(self.titles(), ['Primária'])
+        self.assertEqual(ensure.call_count, 1)
+
+    def test_without_replicas_reads_primary(self):
+        """Testa se sem DATABASE_REPLICAS tudo vai para o principal"""
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.titles(), ['Primária'])
+
+    @override_settings(ROOT_URLCONF='supertask.urls_async')
+    async def test_async_views_use_replica(self):
+        """Testa se as views assíncronas também leem da réplica"""
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get(
+            reverse('task-list-create'), headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(task['title'] for task in response.json()['results']), ['Réplica 1', 'Réplica 2'])
+
+        response = await self.async_client.get(
+            reverse('dashboard-stats'), headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(list(response.json()['categories_stats']), ['Categoria réplica'])
+        self.assertIsNone(await cache.aget(dashboard_stats_key(self.user.pk)))
+
+
+class TaskArchiveTest(QueryCountGuardTestCase):
+    """Testes para o arquivamento de tarefas concluídas (tasks.archive e archive_tasks)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.category = Category.objects.create(name='Work', user=self.user)
+        old = timezone.now() - timedelta(days=400)
+        self.old_done = [
+            Task.objects.create(title=f'Antiga {i}', user=self.user, category=self.category,
+                                status='completed', priority='high' if i % 2 else 'low')
+            for i in range(5)
+        ]
+        self.recent_done = Task.objects.create(title='Recente', user=self.user, status='completed')
+        self.pending = Task.objects.create(title='Pendente', user=self.user, category=self.category)
+        self.other_done = Task.objects.create(title='Outra', user=self.other, status='completed')
+        Task.objects.filter(pk__in=[task.pk for task in self.old_done] + [self.other_done.pk]).update(completed_at=old)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_tasks', '--days', '365', *args, stdout=out)
+        return out.getvalue()
+
+    def test_command_archives_old_completed_tasks_in_batches(self):
+        """Testa se só as concluídas antigas são movidas, em lotes, com contadores e tombstones"""
+        original = Task.objects.get(pk=self.old_done[0].pk)
+        with patch('tasks.archive.archive_batch', wraps=archive_batch) as batch:
+            output = self.archive('--batch-size', '2')
+        self.assertIn('Tarefas arquivadas: 6', output)
+        self.assertEqual(batch.call_count, 3)
+
+        self.assertEqual(
+            set(Task.objects.values_list('title', flat=True)),
+            {'Recente', 'Pendente'},
+        )
+        archived = ArchivedTask.objects.get(pk=original.pk)
+        for field in ['title', 'priority', 'status', 'category_id', 'user_id', 'created_at', 'updated_at', 'completed_at']:
+            self.assertEqual(getattr(archived, field), getattr(original, field), field)
+
+        self.assertEqual(verify_counters(), {})
+        self.assertEqual(
+            DeletionLog.objects.filter(user=self.user, model='task').count(), 5,
+        )
+
+    def test_command_dry_run_and_user(self):
+        """Testa --dry-run (não altera nada) e --user (só as tarefas do usuário)"""
+        self.assertIn('Tarefas que seriam arquivadas: 6', self.archive('--dry-run'))
+        self.assertEqual(ArchivedTask.objects.count(), 0)
+
+        self.assertIn('Tarefas arquivadas: 1', self.archive('--user', 'other'))
+        self.assertEqual(list(ArchivedTask.objects.values_list('title', flat=True)), ['Outra'])
+
+        with self.assertRaises(CommandError):
+            self.archive('--user', 'nobody')
+
+    def test_list_excludes_archived_unless_requested(self):
+        """Testa a listagem com e sem ?include_archived=, com filtros, ordenação e paginação"""
+        self.archive()
+        url = reverse('task-list-create')
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['count'], 2)
+
+        response = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['count'], 7)
+        expected = TaskSerializer(
+            Task.objects.filter(user=self.user).select_related('category'), many=True,
+        ).data
+        by_id = {task['id']: task for task in data['results']}
+        for task in expected:
+            self.assertEqual(by_id[task['id']], task)
+        archived = by_id[self.old_done[0].pk]
+        self.assertEqual(archived['category_name'], 'Work')
+        self.assertEqual(archived['status'], 'completed')
+        self.assertEqual(
+            [task['id'] for task in data['results']],
+            sorted(by_id, reverse=True),
+        )
+
+        response = self.client.get(url, {'include_archived': '1', 'priority': 'high', 'ordering': 'created_at'})
+        self.assertEqual(
+            [task['title'] for task in response.json()['results']],
+            ['Antiga 1', 'Antiga 3'],
+        )
+
+        response = self.client.get(url, {'include_archived': 'true', 'ordering': 'priority', 'fields': 'id,priority'})
+        priorities = [task['priority'] for task in response.json()['results']]
+        self.assertEqual(priorities, ['high', 'high', 'medium', 'medium', 'low', 'low', 'low'])
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'priority'})
+
+        response = self.client.get(url, {'include_archived': 'true', 'q': 'antiga'})
+        self.assertEqual(response.json()['count'], 5)
+
+        response = self.client.get(url, {'include_archived': 'true', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_include_archived_query_count_is_constant(self):
+        """Testa se a listagem com as arquivadas (UNION ALL) não faz mais consultas com mais resultados"""
+        self.archive()
+        url = reverse('task-list-create')
+        small = self.client.get(url, {'include_archived': 'true'})
+
+        # O QueryCountGuardClient falha se a listagem maior fizer mais consultas
+        for i in range(5):
+            Task.objects.create(title=f'Nova {i}', user=self.user, category=self.category)
+        large = self.client.get(url, {'include_archived': 'true'})
+        self.assertGreater(len(large.data['results']), len(small.data['results']))
+
+    def test_restore_endpoint(self):
+        """Testa se a restauração devolve a tarefa com o mesmo id, contadores e sincronização"""
+        self.archive()
+        task = self.old_done[0]
+        since = timezone.now()
+        self.assertEqual(
+            self.client.get(reverse('task-detail', kwargs={'pk': task.pk})).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+        response = self.client.post(reverse('task-restore', kwargs={'pk': task.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], task.pk)
+        self.assertEqual(response.json()['title'], task.title)
+        self.assertFalse(ArchivedTask.objects.filter(pk=task.pk).exists())
+        restored = Task.objects.get(pk=task.pk)
+        self.assertEqual(restored.created_at, task.created_at)
+        self.assertGreater(restored.updated_at, since)
+        self.assertFalse(DeletionLog.objects.filter(model='task', object_id=task.pk).exists())
+        self.assertEqual(verify_counters(), {})
+        self.assertEqual(self.client.get(reverse('task-list-create')).json()['count'], 3)
+        self.assertEqual(self.client.get(reverse('task-list-create'), {'q': 'antiga'}).json()['count'], 1)
+
+        # Não restaura duas vezes nem tarefas de outro usuário
+        self.assertEqual(
+            self.client.post(reverse('task-restore', kwargs={'pk': task.pk})).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.post(reverse('task-restore', kwargs={'pk': self.other_done.pk})).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_command_restore(self):
+        """Testa --restore, que devolve todas as arquivadas (ou as de --user)"""
+        self.archive()
+        self.assertIn('Tarefas restauradas: 1', self.archive('--restore', '--user', 'other'))
+        self.assertIn('Tarefas restauradas: 5', self.archive('--restore'))
+        self.assertEqual(ArchivedTask.objects.count(), 0)
+        self.assertEqual(Task.objects.count(), 8)
+        self.assertEqual(verify_counters(), {})
+
+    def test_dashboard_counts_only_active_tasks(self):
+        """Testa se o dashboard deixa de contar as arquivadas e volta a contá-las após restaurar"""
+        self.assertEqual(self.client.get(reverse('dashboard-stats')).json()['total_tasks'], 7)
+        self.archive()
+        self.assertEqual(self.client.get(reverse('dashboard-stats')).json()['total_tasks'], 2)
+        self.archive('--restore')
+        self.assertEqual(self.client.get(reverse('dashboard-stats')).json()['total_tasks'], 7)
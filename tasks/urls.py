@@ -6,9 +6,15 @@ urlpatterns = [
     path('categories/<int:pk>/', views.CategoryDetailView.as_view(), name='category-detail'),
     
     path('tasks/', views.TaskListCreateView.as_view(), name='task-list-create'),
+    path('tasks/bulk/', views.bulk_tasks, name='task-bulk'),
+    path('tasks/export/', views.export_tasks, name='task-export'),
+    path('tasks/import/', views.import_tasks, name='task-import'),
     path('tasks/<int:pk>/', views.TaskDetailView.as_view(), name='task-detail'),
     path('tasks/<int:pk>/toggle-status/', views.toggle_task_status, name='toggle-task-status'),
+    path('tasks/<int:pk>/restore/', views.restore_task, name='task-restore'),
     
+    path('sync/', views.sync, name='sync'),
+
     path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
     path('dashboard/quote/', views.daily_quote, name='daily-quote'),
 ]
\ No newline at end of file
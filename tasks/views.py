@@ -1,12 +1,41 @@
 from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
-from django.db.models import Q, Count, Case, When, IntegerField
-from django.utils import timezone
-from datetime import date
-import requests
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.db.models.functions import Coalesce
+import csv
+import logging
 
-from .models import Task, Category
+from supertask.replicas import ReplicaReadMixin, use_replica
+
+from .archive import archived_tasks, include_archived, restore_tasks, with_archived
+from .bulk import apply_bulk_operations
+from .conditional import (
+    ConditionalGetMixin,
+    not_modified_response,
+    set_etag,
+    task_etag,
+    user_etag,
+)
+from .export import EXPORT_FIELDS, CSVRenderer, NDJSONRenderer, aexport_stream, export_stream
+from .fields import SparseFieldsMixin, only_category_columns, only_task_columns, requested_fields
+from .filters import filter_tasks, order_tasks, ordering_keys
+from .imports import ImportStreamParser, NDJSONImportStreamParser, TaskImporter, detect_format
+from .models import ArchivedTask, Task, Category
+from .pagination import TaskCursorPagination, uses_cursor_pagination
+from .quotes import get_quote_provider
+from .renderers import TaskJSONRenderer
+from .rows import task_values, tasks_data
+from .search import is_ranked, search_tasks
+from .stats import get_dashboard_stats
+from .sync import parse_since, sync_changes
 from .serializers import (
     TaskSerializer, 
     CategorySerializer, 
@@ -14,71 +43,121 @@ from .serializers import (
     TaskCreateUpdateSerializer
 )
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+logger = logging.getLogger(__name__)
+
+def user_categories(user, task_count=True):
+    """Categorias do usuário anotadas com o total de tarefas lido dos contadores"""
+    queryset = Category.objects.filter(user=user).order_by('name')
+    if not task_count:
+        return queryset
+    return queryset.annotate(task_total=Coalesce(Sum('taskcounter__count'), 0))
+
+
+def sparse_user_categories(user, fields):
+    """user_categories só com as colunas (e a contagem, se pedida) de ?fields=/?exclude="""
+    queryset = user_categories(user, task_count=fields is None or 'task_count' in fields)
+    return only_category_columns(queryset, fields)
+
+def user_tasks(user, params, rank=True):
+    """Tarefas do usuário com a busca, os filtros e a ordenação de /api/tasks/.
+
+    Com ?q= e sem ?ordering=, os resultados vêm por relevância (exceto com
+    rank=False, usado pela paginação por cursor, que precisa de chaves estáveis).
+    """
+    queryset = filter_tasks(Task.objects.filter(user=user), params)
+    query = params.get('q')
+    if query:
+        queryset = search_tasks(queryset, query)
+        if rank and 'ordering' not in params and is_ranked(queryset):
+            return queryset.order_by('-search_rank', '-created_at', '-id')
+    return order_tasks(queryset, params.get('ordering', '-created_at'))
+
+class CategoryListCreateView(ReplicaReadMixin, SparseFieldsMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    available_fields = CategorySerializer.Meta.fields
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user)
+        return sparse_user_categories(self.request.user, self.sparse_fields)
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    available_fields = CategorySerializer.Meta.fields
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user)
+        return sparse_user_categories(self.request.user, self.sparse_fields)
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(ReplicaReadMixin, SparseFieldsMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    available_fields = TaskSerializer.Meta.fields
+
+    def get_renderers(self):
+        # Os renderizadores de DEFAULT_RENDERER_CLASSES, com o JSON trocado pelo TaskJSONRenderer
+        return [
+            TaskJSONRenderer() if renderer_class is JSONRenderer else renderer_class()
+            for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES
+        ]
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return TaskCreateUpdateSerializer
         return TaskSerializer
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and uses_cursor_pagination(self.request):
+            self._paginator = TaskCursorPagination()
+        return super().paginator
+
     def get_queryset(self):
-        queryset = Task.objects.filter(user=self.request.user)
-        
-        priority = self.request.query_params.get('priority')
-        status_filter = self.request.query_params.get('status')
-        category = self.request.query_params.get('category')
-        due_date = self.request.query_params.get('due_date')
-        
-        if priority:
-            queryset = queryset.filter(priority=priority)
-        
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-            
-        if due_date:
-            if due_date == 'today':
-                queryset = queryset.filter(due_date=date.today())
-            elif due_date == 'overdue':
-                queryset = queryset.filter(due_date__lt=date.today(), status__ne='completed')
-        
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        if ordering == 'due_date':
-            queryset = queryset.order_by('due_date', '-created_at')
-        elif ordering == 'priority':
-            queryset = queryset.order_by(
-                Case(
-                    When(priority='high', then=1),
-                    When(priority='medium', then=2),
-                    When(priority='low', then=3),
-                    default=4,
-                    output_field=IntegerField(),
-                )
-            )
-        else:
-            queryset = queryset.order_by(ordering)
-        
-        return queryset
+        queryset = user_tasks(
+            self.request.user,
+            self.request.query_params,
+            # A relevância da busca não existe na tabela de arquivadas
+            rank=not uses_cursor_pagination(self.request) and not include_archived(self.request.query_params),
+        ).select_related('category')
+        return only_task_columns(queryset, self.sparse_fields)
+
+    def list(self, request, *args, **kwargs):
+        if include_archived(request.query_params):
+            return self.list_with_archived(request)
+        if not settings.TASK_LIST_FAST_PATH:
+            return super().list(request, *args, **kwargs)
+
+        # Só as colunas do TaskSerializer, sem instanciar models nem os campos do DRF
+        fields = self.sparse_fields
+        queryset = task_values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(tasks_data(queryset, fields=fields))
+        return self.get_paginated_response(tasks_data(page, fields=fields))
+
+    def list_with_archived(self, request):
+        """?include_archived=true: tarefas e arquivadas em uma consulta, sempre por .values()"""
+        if uses_cursor_pagination(request):
+            raise ValidationError({'include_archived': 'Archived tasks are not supported with cursor pagination.'})
+        ordering = request.query_params.get('ordering', '-created_at')
+        if ordering_keys(ordering) is None:
+            raise ValidationError({'ordering': f"Ordering '{ordering}' is not supported with include_archived."})
+
+        fields = self.sparse_fields
+        queryset = with_archived(
+            self.filter_queryset(self.get_queryset()),
+            archived_tasks(request.user, request.query_params),
+            fields,
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(tasks_data(queryset, fields=fields))
+        return self.get_paginated_response(tasks_data(page, fields=fields))
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(SparseFieldsMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    available_fields = TaskSerializer.Meta.fields
+
+    def get_etag(self, request, *args, **kwargs):
+        return task_etag(request, kwargs['pk'])
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -86,70 +165,132 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TaskSerializer
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        queryset = Task.objects.filter(user=self.request.user).select_related('category')
+        return only_task_columns(queryset, self.sparse_fields)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_tasks(request):
+    """Endpoint para criar, atualizar e excluir várias tarefas em uma requisição"""
+    operations = request.data.get('operations') if isinstance(request.data, dict) else None
+    if not isinstance(operations, list):
+        return Response(
+            {'operations': ['Expected a list of operations.']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    max_operations = settings.TASK_BULK_MAX_OPERATIONS
+    if len(operations) > max_operations:
+        return Response(
+            {'operations': [f'Ensure this list has no more than {max_operations} operations.']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = apply_bulk_operations(request.user, operations)
+    summary = {'created': 0, 'updated': 0, 'deleted': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] += 1
+
+    return Response({
+        'created': summary['created'],
+        'updated': summary['updated'],
+        'deleted': summary['deleted'],
+        'errors': summary['error'],
+        'results': results,
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+def export_tasks(request):
+    """Exporta as tarefas (?format=csv|ndjson) com os mesmos filtros de /api/tasks/, transmitidas em blocos"""
+    renderer = request.accepted_renderer
+    fields = requested_fields(request.query_params, EXPORT_FIELDS)
+    stream = export_stream(user_tasks(request.user, request.query_params), renderer.format, fields)
+    if isinstance(request._request, ASGIRequest):
+        stream = aexport_stream(stream)
+    response = StreamingHttpResponse(stream, content_type=f'{renderer.media_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="tasks.{renderer.format}"'
+    return response
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@parser_classes([ImportStreamParser, NDJSONImportStreamParser, MultiPartParser])
+def import_tasks(request):
+    """Importa tarefas de um CSV/NDJSON (corpo da requisição ou upload em 'file'), em lotes"""
+    upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+    if upload is not None:
+        stream = upload
+        import_format = detect_format(upload.content_type, upload.name)
+    else:
+        stream = request.data
+        import_format = detect_format(request.content_type)
+    if import_format is None or stream is None or isinstance(stream, dict):
+        return Response(
+            {'file': ['Send a CSV or NDJSON body, or a .csv/.ndjson file in "file".']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        start = max(int(request.query_params.get('start', 0)), 0)
+    except ValueError:
+        return Response({'start': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+    importer = TaskImporter(
+        request.user,
+        create_categories=request.query_params.get('create_categories', 'true').lower() != 'false',
+    )
+    try:
+        summary = importer.run(stream, import_format, start=start)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Os lotes anteriores já foram gravados: o cliente corrige o arquivo e retoma de next_row
+        return Response(
+            {'file': [f'Malformed file: {e}'], **importer.summary()},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        logger.exception("Erro na importação de tarefas")
+        return Response({
+            'error': 'Erro interno do servidor',
+            'detail': str(e),
+            **importer.summary(),
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response(summary)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def sync(request):
+    """Endpoint de sincronização incremental: alterações e exclusões desde ?since="""
+    state = parse_since(request.query_params.get('since'))
+    changes = sync_changes(request.user, state)
+
+    return Response({
+        'tasks': TaskSerializer(changes['tasks'], many=True).data,
+        'categories': CategorySerializer(changes['categories'], many=True).data,
+        'deleted': changes['deleted'],
+        'has_more': changes['has_more'],
+        'reset': changes['reset'],
+        'next_since': changes['next_since'],
+    })
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_stats(request):
     """Endpoint para estatísticas do dashboard"""
-    user = request.user
-    
     try:
-        tasks = Task.objects.filter(user=user)
-        today = date.today()
-        
-        completed = tasks.filter(status='completed').count()
-        in_progress = tasks.filter(status='in_progress').count()
-        overdue = tasks.filter(due_date__lt=today).exclude(status='completed').count()
-        high_priority = tasks.filter(priority='high').exclude(status='completed').count()
-        
-        due_today = tasks.filter(
-            due_date=today,
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        # ✅ CORREÇÃO: Definir total_tasks
-        total_tasks = tasks.count()
-        
-        due_today_tasks = tasks.filter(due_date=today)
-        print(f"🔍 Debug due_today:")
-        print(f"   - Total tarefas com due_date hoje: {due_today_tasks.count()}")
-        print(f"   - Data de hoje: {today}")
-        for task in due_today_tasks:
-            print(f"   - Task: {task.title} | Status: {task.status} | Due: {task.due_date}")
-        print(f"   - Due today count final: {due_today}")
-        
-        categories_stats = {}
-        try:
-            categories = Category.objects.filter(user=user)
-            for category in categories:
-                category_tasks = tasks.filter(category=category)
-                categories_stats[category.name] = {
-                    'total': category_tasks.count(),
-                    'completed': category_tasks.filter(status='completed').count(),
-                    'pending': category_tasks.exclude(status='completed').count(),
-                }
-        except Exception as e:
-            print(f"Erro ao processar categorias: {e}")
-            categories_stats = {}
-        
-        data = {
-            'completed': completed,
-            'in_progress': in_progress,
-            'overdue': overdue,
-            'high_priority': high_priority,
-            'due_today': due_today,
-            'total_tasks': total_tasks,  # ✅ Agora está definida
-            'categories_stats': categories_stats
-        }
-        
+        replica = use_replica(request)
+        etag = user_etag(request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = get_dashboard_stats(request.user, store=replica is None)
         serializer = DashboardStatsSerializer(data)
-        return Response(serializer.data)
+        return set_etag(Response(serializer.data), etag)
         
     except Exception as e:
-        print(f"Erro no dashboard_stats: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro no dashboard_stats")
         return Response({
             'error': 'Erro interno do servidor',
             'detail': str(e)
@@ -158,73 +299,15 @@ def dashboard_stats(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def daily_quote(request):
-    """Endpoint para buscar citação diária usando API quotable.io/quotes/random"""
-    
-    fallback_quotes = [
-        {
-            'quote': 'The only way to do great work is to love what you do.',
-            'author': 'Steve Jobs'
-        },
-        {
-            'quote': 'Success is not final, failure is not fatal: It is the courage to continue that counts.',
-            'author': 'Winston Churchill'
-        },
-        {
-            'quote': 'The future belongs to those who believe in the beauty of their dreams.',
-            'author': 'Eleanor Roosevelt'
-        }
-    ]
-    
-    try:
-        response = requests.get('http://api.quotable.io/quotes/random', timeout=10)
-        
-        if response.status_code == 200:
-            quote_data = response.json()
-            
-            if isinstance(quote_data, list) and len(quote_data) > 0:
-                quote_item = quote_data[0]
-                external_quote = {
-                    'quote': quote_item.get('content'),
-                    'author': quote_item.get('author'),
-                    'source': 'quotable_api'
-                }
-                
-                if external_quote['quote'] and external_quote['author']:
-                    return Response(external_quote)
-            
-            elif isinstance(quote_data, dict):
-                external_quote = {
-                    'quote': quote_data.get('content'),
-                    'author': quote_data.get('author'),
-                    'source': 'quotable_api'
-                }
-                
-                if external_quote['quote'] and external_quote['author']:
-                    return Response(external_quote)
-        
-        import random
-        selected_quote = random.choice(fallback_quotes)
-        selected_quote['source'] = 'fallback'
-        return Response(selected_quote)
-        
-    except requests.exceptions.Timeout:
-        import random
-        selected_quote = random.choice(fallback_quotes)
-        selected_quote['source'] = 'fallback_timeout'
-        return Response(selected_quote)
-        
-    except Exception as e:
-        import random
-        selected_quote = random.choice(fallback_quotes)
-        selected_quote['source'] = 'fallback_error'
-        return Response(selected_quote)
+    """Endpoint para a citação diária (quotable.io), servida do cache com atualização em segundo plano"""
+    return Response(get_quote_provider().get_quote())
 
 @api_view(['PATCH'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_task_status(request, pk):
     """Endpoint para alternar status da tarefa entre completed/pending"""
     try:
-        task = Task.objects.get(pk=pk, user=request.user)
+        task = Task.objects.select_related('category').get(pk=pk, user=request.user)
         
         if task.status == 'completed':
             task.status = 'pending'
@@ -239,4 +322,16 @@ def toggle_task_status(request, pk):
         return Response(
             {'error': 'Task not found'}, 
             status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+        )
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def restore_task(request, pk):
+    """Endpoint para devolver uma tarefa arquivada à lista de tarefas"""
+    if not restore_tasks(ArchivedTask.objects.filter(pk=pk, user=request.user)):
+        return Response(
+            {'error': 'Archived task not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    task = Task.objects.select_related('category').get(pk=pk)
+    return Response(TaskSerializer(task).data)